@@ -1,9 +1,18 @@
 import discord
 from discord.ext import commands
-import asyncio
 import logging
-from src.database.repositories import PlayerRepository, GuildRepository
+import time
+import io
+import json
+from src.database.repositories import PlayerRepository, GuildRepository, MatchRepository, SeasonRepository, rating_engine
 from src.services.matchmaker import MatchMaker
+from src.services.rating import RatingEngine
+from src.services.predictor import WinPredictor, win_predictor
+from src.services.simulator import ReplayDataset, SnapshotModel, FormulaModel, GlickoModel, formula_with, simulate
+from src.services.discord_http import http_budget
+from src.services.watchdog import loop_watchdog
+from src.services.tracing import tracer, WINDOWS
+from src.utils.views import BaseInteractiveView
 
 logger = logging.getLogger("admin")
 
@@ -82,9 +91,9 @@ class RecalcConfirmView(discord.ui.View):
         await interaction.response.edit_message(content="⏳ Recalculando MMR de todos os jogadores...", view=self)
 
         try:
-            updated, skipped = await self.admin_cog.execute_recalc_mmr()
+            changes, skipped = await self.admin_cog.execute_recalc_mmr()
             await interaction.message.edit(
-                content=f"✅ MMR recalculado! **{updated}** jogador(es) atualizados, **{skipped}** sem rank ignorados.",
+                content=f"✅ MMR recalculado! **{len(changes)}** jogador(es) atualizados, **{skipped}** sem rank ignorados.",
                 view=None
             )
         except Exception as e:
@@ -104,6 +113,162 @@ class RecalcConfirmView(discord.ui.View):
                 pass
 
 
+# --- VIEW DAS MÉTRICAS DE REST ---
+STATS_SORT = {'chamadas': 'calls', 'latencia': 'max_seconds', '429': 'rate_limited', 'erros': 'errors'}
+
+
+def build_http_stats_embed(sort_by: str = 'calls') -> discord.Embed:
+    """Top rotas do Discord por chamadas/latência/429 desde que o bot subiu."""
+    snapshot = http_budget.snapshot()
+    embed = discord.Embed(title="📡 Chamadas REST ao Discord", color=0x5865f2)
+    totals = {'calls': 0, 'attempts': 0, 'rate_limited': 0, 'errors': 0}
+    for stats in snapshot['routes'].values():
+        for key in totals:
+            totals[key] += stats[key]
+    prio = snapshot['by_priority']
+    embed.description = (
+        f"**{totals['calls']}** chamadas • **{totals['attempts']}** requisições • "
+        f"**{totals['rate_limited']}** 429 • **{totals['errors']}** erros\n"
+        f"Prioridade: 🔴 {prio['CRITICAL']} • ⚪ {prio['NORMAL']} • 🔵 {prio['LOW']} "
+        f"({snapshot['deferred_low']} adiadas)"
+    )
+    for key, stats in http_budget.top_routes(limit=10, sort_by=sort_by):
+        embed.add_field(
+            name=key[:256],
+            value=(
+                f"{stats.calls}x • méd `{stats.avg_seconds * 1000:.0f}ms` • máx `{stats.max_seconds * 1000:.0f}ms`"
+                + (f" • ⚠️ {stats.rate_limited} 429" if stats.rate_limited else "")
+                + (f" • ❌ {stats.errors}" if stats.errors else "")
+            ),
+            inline=False
+        )
+    embed.set_footer(text=f"Ativo há {snapshot['uptime_seconds'] // 60} min • ordem: {sort_by}")
+    return embed
+
+
+class HttpStatsView(BaseInteractiveView):
+    def __init__(self, sort_by: str):
+        super().__init__(timeout=300)
+        self.sort_by = sort_by
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.guild_permissions.administrator:
+            return True
+        await interaction.response.send_message("⛔ Apenas Administradores.", ephemeral=True)
+        return False
+
+    @discord.ui.button(label="Atualizar", style=discord.ButtonStyle.primary, emoji="🔄")
+    async def refresh(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(embed=build_http_stats_embed(self.sort_by), view=self)
+
+    @discord.ui.button(label="Dump JSON", style=discord.ButtonStyle.secondary, emoji="📄")
+    async def dump(self, interaction: discord.Interaction, button: discord.ui.Button):
+        data = json.dumps(http_budget.snapshot(), indent=2, ensure_ascii=False).encode()
+        await interaction.response.send_message(file=discord.File(io.BytesIO(data), filename="discord_http.json"), ephemeral=True)
+
+
+# --- VIEW DA VIGIA DO EVENT LOOP ---
+def build_lag_embed() -> discord.Embed:
+    """Lag do event loop e episódios de travamento por responsável (comando/listener/task)."""
+    wd = loop_watchdog
+    embed = discord.Embed(title="🐢 Event loop", color=0xe67e22)
+    status = f"limite `{wd.threshold * 1000:.0f}ms`" if wd.threshold > 0 else "**desligada** (`WATCHDOG_THRESHOLD_MS=0`)"
+    embed.description = (
+        f"Lag atual `{wd.last_lag * 1000:.0f}ms` • máx `{wd.max_lag * 1000:.0f}ms`\n"
+        f"**{sum(row[0] for row in wd.by_label.values())}** travamento(s) • vigia {status}"
+    )
+    top = wd.top_labels(limit=8)
+    if top:
+        embed.add_field(
+            name="Responsáveis (tempo total travado)",
+            value="\n".join(
+                f"`{label[:60]}` — {count}x • total `{seconds * 1000:.0f}ms` • pior `{worst * 1000:.0f}ms`"
+                for label, count, seconds, worst in top
+            )[:1024],
+            inline=False
+        )
+    recent = list(wd.recent)[-5:]
+    if recent:
+        embed.add_field(
+            name="Últimos episódios",
+            value="\n".join(
+                f"{e.at:%H:%M:%S} `{e.duration * 1000:.0f}ms` {e.label[:40]}\n└ `{e.culprit[:80]}`"
+                for e in reversed(recent)
+            )[:1024],
+            inline=False
+        )
+    embed.set_footer(text=f"Ativo há {int(time.time() - wd.started_at) // 60} min")
+    return embed
+
+
+class LagView(BaseInteractiveView):
+    def __init__(self):
+        super().__init__(timeout=300)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.guild_permissions.administrator:
+            return True
+        await interaction.response.send_message("⛔ Apenas Administradores.", ephemeral=True)
+        return False
+
+    @discord.ui.button(label="Atualizar", style=discord.ButtonStyle.primary, emoji="🔄")
+    async def refresh(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(embed=build_lag_embed(), view=self)
+
+    @discord.ui.button(label="Pilhas", style=discord.ButtonStyle.secondary, emoji="📄")
+    async def dump(self, interaction: discord.Interaction, button: discord.ui.Button):
+        text = "\n\n".join(e.format() for e in loop_watchdog.recent) or "Nenhum travamento registrado."
+        await interaction.response.send_message(file=discord.File(io.BytesIO(text.encode()), filename="slow_callbacks.txt"), ephemeral=True)
+
+
+# --- VIEW DA LATÊNCIA POR COMANDO ---
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 10 else f"{seconds:.1f}s"
+
+
+def build_slow_commands_embed(window: str = '5m') -> discord.Embed:
+    """Comandos/callbacks mais lentos (p95) na janela, com o tempo médio gasto em DB, Riot e REST do Discord."""
+    rows = tracer.summary(WINDOWS[window])
+    embed = discord.Embed(title=f"⏱️ Comandos mais lentos ({window})", color=0x9b59b6)
+    if not rows:
+        embed.description = "Nenhum comando executado na janela."
+    for row in rows[:10]:
+        kinds = " • ".join(f"{kind} {_ms(seconds)}" for kind, seconds in sorted(row['by_kind'].items()))
+        top_span = f"\n└ `{row['spans'][0][0][:70]}` {row['spans'][0][1]:.1f}x {_ms(row['spans'][0][2])}" if row['spans'] else ""
+        embed.add_field(
+            name=f"{row['name'][:200]} — {row['count']}x" + (f" • ❌ {row['errors']}" if row['errors'] else ""),
+            value=(
+                f"p50 `{_ms(row['p50'])}` • p95 `{_ms(row['p95'])}` • p99 `{_ms(row['p99'])}` • máx `{_ms(row['max'])}`\n"
+                f"méd {_ms(row['avg'])}: {kinds + ' • ' if kinds else ''}resto {_ms(row['other'])}"
+                + top_span
+            )[:1024],
+            inline=False
+        )
+    embed.set_footer(text="Tempos por chamada do comando • spans paralelos podem somar mais que o total")
+    return embed
+
+
+class SlowCommandsView(BaseInteractiveView):
+    def __init__(self, window: str):
+        super().__init__(timeout=300)
+        self.window = window
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.guild_permissions.administrator:
+            return True
+        await interaction.response.send_message("⛔ Apenas Administradores.", ephemeral=True)
+        return False
+
+    @discord.ui.button(label="Atualizar", style=discord.ButtonStyle.primary, emoji="🔄")
+    async def refresh(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.edit_message(embed=build_slow_commands_embed(self.window), view=self)
+
+    @discord.ui.button(label="Dump JSON", style=discord.ButtonStyle.secondary, emoji="📄")
+    async def dump(self, interaction: discord.Interaction, button: discord.ui.Button):
+        data = json.dumps(tracer.snapshot(), indent=2, ensure_ascii=False).encode()
+        await interaction.response.send_message(file=discord.File(io.BytesIO(data), filename="command_latency.json"), ephemeral=True)
+
+
 class Admin(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -125,42 +290,35 @@ class Admin(commands.Cog):
             logger.critical(f"Erro no purge: {e}")
             raise e
 
-    async def execute_recalc_mmr(self) -> tuple:
+    async def execute_recalc_mmr(self, dry_run: bool = False) -> tuple:
         """
         Recalcula o MMR de todos os jogadores registrados com base no rank cached.
-        Retorna (updated_count, skipped_count).
+        Carrega só as colunas de rank, calcula tudo em memória e grava numa única transação.
+        Retorna (changes, skipped); com dry_run=True nada é gravado.
         """
-        players = await PlayerRepository.get_all_players()
-        updated = skipped = 0
-
-        for player in players:
-            try:
-                # Prioriza SoloQ, fallback Flex
-                if player.solo_tier and player.solo_tier.upper() not in ('UNRANKED', ''):
-                    new_mmr = MatchMaker.calculate_adjusted_mmr(
-                        player.solo_tier, player.solo_rank, player.solo_lp,
-                        player.solo_wins, player.solo_losses, 'RANKED_SOLO_5x5'
-                    )
-                elif player.flex_tier and player.flex_tier.upper() not in ('UNRANKED', ''):
-                    new_mmr = MatchMaker.calculate_adjusted_mmr(
-                        player.flex_tier, player.flex_rank, player.flex_lp,
-                        player.flex_wins, player.flex_losses, 'RANKED_FLEX_SR'
-                    )
-                else:
-                    skipped += 1
-                    continue
-
-                await PlayerRepository.update_mmr_direct(player.discord_id, new_mmr)
-                updated += 1
-
-                # Pequena pausa para não sobrecarregar o banco
-                await asyncio.sleep(0.05)
-
-            except Exception as e:
-                logger.error(f"Erro ao recalcular MMR de {player.discord_id}: {e}")
-                skipped += 1
-
-        return updated, skipped
+        rows = await PlayerRepository.get_rank_columns()
+        changes, skipped = MatchMaker.bulk_mmr(rows)
+
+        if not dry_run:
+            await PlayerRepository.bulk_update_mmr({discord_id: new for discord_id, _, _, new in changes})
+        return changes, skipped
+
+    def build_recalc_diff_embed(self, changes: list, skipped: int, limit: int = 15) -> discord.Embed:
+        """Embed com as maiores variações de MMR de um recálculo (simulação)."""
+        embed = discord.Embed(title="🧪 Simulação de Recálculo de MMR", color=0x3498db)
+        if not changes:
+            embed.description = f"Nenhum MMR mudaria. ({skipped} jogador(es) sem rank ignorados)"
+            return embed
+
+        biggest = sorted(changes, key=lambda c: abs(c[3] - c[2]), reverse=True)[:limit]
+        lines = [f"**{name or discord_id}**: `{old}` → `{new}` ({new - old:+d})" for discord_id, name, old, new in biggest]
+        embed.description = (
+            f"**{len(changes)}** jogador(es) mudariam de MMR • **{skipped}** sem rank ignorados\n\n"
+            + "\n".join(lines)
+        )
+        if len(changes) > limit:
+            embed.set_footer(text=f"Mostrando as {limit} maiores variações. Use .recalcular_mmr para aplicar.")
+        return embed
 
     @commands.command(name="clear")
     @commands.has_permissions(administrator=True)
@@ -192,13 +350,17 @@ class Admin(commands.Cog):
 
     @commands.command(name="recalcular_mmr", aliases=["recalc_mmr", "resetar_mmr"])
     @commands.has_permissions(administrator=True)
-    async def recalcular_mmr(self, ctx: commands.Context):
+    async def recalcular_mmr(self, ctx: commands.Context, modo: str = None):
         """
         Recalcula o MMR de TODOS os jogadores registrados com base no rank cached.
         Útil após ajustar a fórmula ou forçar sincronização.
+        Uso: .recalcular_mmr [simular] — 'simular' mostra o diff sem gravar nada.
         """
-        players = await PlayerRepository.get_all_players()
-        total = len(players)
+        if modo and modo.lower() in ('simular', 'dry', 'diff'):
+            changes, skipped = await self.execute_recalc_mmr(dry_run=True)
+            return await ctx.reply(embed=self.build_recalc_diff_embed(changes, skipped))
+
+        total = len(await PlayerRepository.get_rank_columns())
 
         if total == 0:
             return await ctx.reply("📭 Nenhum jogador registrado para recalcular.")
@@ -220,6 +382,194 @@ class Admin(commands.Cog):
         view.message = msg
 
 
+    @commands.command(name="recalcular_rating", aliases=["recalc_rating"])
+    @commands.has_permissions(administrator=True)
+    async def recalcular_rating(self, ctx: commands.Context):
+        """
+        Reprocessa todo o histórico de partidas finalizadas e recalcula o rating Glicko-2
+        de todos os jogadores (e os snapshots de cada partida) numa única transação.
+        """
+        started = time.perf_counter()
+        matches, seeds, mp_ids = await MatchRepository.get_rating_history()
+        if not matches:
+            return await ctx.reply("📭 Nenhuma partida finalizada para reprocessar.")
+
+        ratings, snapshots = rating_engine.replay(matches, seeds)
+        await MatchRepository.apply_rating_replay(ratings, snapshots, mp_ids)
+        elapsed = time.perf_counter() - started
+
+        logger.info(f"Replay de rating: {len(matches)} partidas, {len(ratings)} jogadores em {elapsed:.2f}s")
+        await ctx.reply(
+            f"✅ Rating recalculado: **{len(matches)}** partida(s), **{len(ratings)}** jogador(es) em `{elapsed:.2f}s`."
+        )
+
+    def parse_simulation_params(self, params: tuple) -> tuple:
+        """
+        Converte 'chave=valor' do .simular em (overrides da fórmula, kwargs do RatingEngine).
+        Chaves: flex=0.9 | k=20,12,8,4,2 | tier.GOLD=1250 | tau=0.3 | rd=250
+        """
+        overrides, engine_kwargs = {}, {}
+        for param in params:
+            if '=' not in param:
+                continue
+            key, value = param.split('=', 1)
+            key = key.lower()
+            if key == 'flex':
+                overrides['FLEX_MULTIPLIER'] = float(value)
+            elif key == 'k':
+                ks = [int(v) for v in value.split(',')]
+                limits = [limit for limit, _ in MatchMaker.K_FACTOR_LADDER]
+                overrides['K_FACTOR_LADDER'] = tuple(zip(limits, ks[:len(limits)]))
+                if len(ks) > len(limits):
+                    overrides['K_FACTOR_MIN'] = ks[len(limits)]
+            elif key.startswith('tier.'):
+                tiers = dict(overrides.get('TIER_VALUES', MatchMaker.TIER_VALUES))
+                tiers[key.split('.', 1)[1].upper()] = int(value)
+                overrides['TIER_VALUES'] = tiers
+            elif key == 'tau':
+                engine_kwargs['tau'] = float(value)
+            elif key == 'rd':
+                engine_kwargs['seed_rd'] = float(value)
+            else:
+                raise ValueError(f"parâmetro desconhecido: {key}")
+        return overrides, engine_kwargs
+
+    @commands.command(name="simular", aliases=["whatif"])
+    @commands.has_permissions(administrator=True)
+    async def simular(self, ctx: commands.Context, *params: str):
+        """
+        Replay offline do histórico: compara a capacidade preditiva do MMR gravado, do
+        rating Glicko-2 e (se houver overrides) de uma fórmula de MMR alternativa.
+        Uso: .simular [flex=0.9] [k=20,12,8,4,2] [tier.GOLD=1250] [tau=0.3] [rd=250] [@jogador]
+        Nada é gravado no banco.
+        """
+        try:
+            overrides, engine_kwargs = self.parse_simulation_params(params)
+        except ValueError as e:
+            return await ctx.reply(f"❌ Parâmetro inválido ({e}).")
+
+        async with ctx.typing():
+            started = time.perf_counter()
+            dataset = await ReplayDataset.from_stream(MatchRepository.stream_match_history())
+            if not len(dataset):
+                return await ctx.reply("📭 Nenhuma partida finalizada para simular.")
+            loaded = time.perf_counter() - started
+
+            track = {m.id for m in ctx.message.mentions}
+            models = [SnapshotModel(), GlickoModel(RatingEngine(**engine_kwargs))]
+            if overrides:
+                models.append(FormulaModel(formula_with(**overrides), await PlayerRepository.get_rank_columns()))
+            reports = [simulate(dataset, model, track=track) for model in models]
+            elapsed = time.perf_counter() - started
+
+        embed = discord.Embed(title="🧪 Simulação sobre o Histórico", color=0x3498db)
+        embed.description = f"**{len(dataset)}** partidas • carga `{loaded:.2f}s` • total `{elapsed:.2f}s`"
+        for report in reports:
+            embed.add_field(
+                name=report.model_name,
+                value=(
+                    f"Log-loss: `{report.log_loss:.4f}`\n"
+                    f"Brier: `{report.brier:.4f}`\n"
+                    f"Acerto: `{report.accuracy * 100:.1f}%`"
+                ),
+                inline=True
+            )
+        for member in ctx.message.mentions[:3]:
+            points = reports[1].trajectories.get(member.id, [])
+            if points:
+                path = " → ".join(f"{rating:.0f}" for _, rating in points[-8:])
+                embed.add_field(name=f"📈 {member.display_name} (Glicko-2)", value=path, inline=False)
+        embed.set_footer(text="Menor log-loss/Brier = previsões melhores. A fórmula what-if usa o rank atual como proxy.")
+        await ctx.reply(embed=embed)
+
+    @commands.command(name="recalcular_duplas", aliases=["backfill_duplas"])
+    @commands.has_permissions(administrator=True)
+    async def recalcular_duplas(self, ctx: commands.Context):
+        """Reconstrói a tabela de estatísticas por dupla (h2h, duplas, nêmesis) a partir do histórico."""
+        started = time.perf_counter()
+        total = await MatchRepository.rebuild_pair_stats()
+        await ctx.reply(f"✅ Estatísticas de **{total}** dupla(s) reconstruídas em `{time.perf_counter() - started:.2f}s`.")
+
+    @commands.command(name="temporada", aliases=["season"])
+    @commands.has_permissions(administrator=True)
+    async def temporada(self, ctx: commands.Context, acao: str = None, *, nome: str = None):
+        """Mostra a temporada ativa ou, com `nova <nome>`, encerra a atual e abre outra."""
+        if acao and acao.lower() in ("nova", "new"):
+            if not nome:
+                return await ctx.reply("❌ Use: `.temporada nova <nome>`")
+            previous = await SeasonRepository.get_active_season(ctx.guild.id)
+            season = await SeasonRepository.start_season(ctx.guild.id, nome)
+            logger.info(f"Temporada '{season.name}' (#{season.id}) aberta por {ctx.author}")
+            closed = f" **{previous.name}** encerrada." if previous else ""
+            return await ctx.reply(f"✅ Temporada **{season.name}** iniciada!{closed}")
+
+        seasons = await SeasonRepository.get_seasons(ctx.guild.id)
+        if not seasons:
+            return await ctx.reply("📭 Nenhuma temporada criada. Use `.temporada nova <nome>`.")
+
+        lines = []
+        for season in reversed(seasons[-10:]):
+            end = season.ends_at.strftime('%d/%m/%Y') if season.ends_at else "atual"
+            lines.append(f"`#{season.id}` **{season.name}** — {season.starts_at.strftime('%d/%m/%Y')} → {end}")
+        embed = discord.Embed(title="📆 Temporadas", description="\n".join(lines), color=0x3498db)
+        await ctx.reply(embed=embed)
+
+    @commands.command(name="recalcular_temporadas", aliases=["backfill_temporadas"])
+    @commands.has_permissions(administrator=True)
+    async def recalcular_temporadas(self, ctx: commands.Context):
+        """Reconstrói os agregados por temporada/semana a partir do histórico (MVPs já contados são mantidos)."""
+        started = time.perf_counter()
+        total = await SeasonRepository.rebuild_period_stats()
+        await ctx.reply(f"✅ **{total}** agregado(s) de temporada/semana reconstruídos em `{time.perf_counter() - started:.2f}s`.")
+
+    @commands.command(name="recarregar_preditor", aliases=["reload_preditor"])
+    @commands.has_permissions(administrator=True)
+    async def recarregar_preditor(self, ctx: commands.Context):
+        """Recarrega o modelo de chance de vitória gerado por train_predictor.py (sem reiniciar o bot)."""
+        win_predictor.update_from(WinPredictor.load())
+        if not win_predictor.trained_on:
+            return await ctx.reply("⚠️ Nenhum modelo treinado encontrado — usando apenas a diferença de rating.")
+        loss = f" • log-loss `{win_predictor.log_loss:.4f}`" if win_predictor.log_loss is not None else ""
+        await ctx.reply(
+            f"✅ Preditor recarregado: **{win_predictor.trained_on}** partidas, "
+            f"**{len(win_predictor.pairs)}** duplas{loss}."
+        )
+
+    @commands.command(name="stats", aliases=["http_stats"])
+    @commands.has_permissions(administrator=True)
+    async def stats(self, ctx: commands.Context, ordem: str = "chamadas"):
+        """
+        Chamadas REST ao Discord por rota: contagem, latência, 429s e prioridade.
+        Uso: .stats [chamadas|latencia|429|erros]
+        """
+        sort_by = STATS_SORT.get(ordem.lower())
+        if not sort_by:
+            return await ctx.reply(f"❌ Ordem inválida. Use: {', '.join(f'`{o}`' for o in STATS_SORT)}.")
+        view = HttpStatsView(sort_by)
+        view.message = await ctx.reply(embed=build_http_stats_embed(sort_by), view=view)
+
+    @commands.command(name="lag", aliases=["watchdog"])
+    @commands.has_permissions(administrator=True)
+    async def lag(self, ctx: commands.Context):
+        """
+        Lag do event loop e travamentos (> WATCHDOG_THRESHOLD_MS) atribuídos ao comando/listener/cog.
+        O botão "Pilhas" envia as pilhas amostradas dos últimos episódios.
+        """
+        view = LagView()
+        view.message = await ctx.reply(embed=build_lag_embed(), view=view)
+
+    @commands.command(name="lentos", aliases=["tracing"])
+    @commands.has_permissions(administrator=True)
+    async def lentos(self, ctx: commands.Context, janela: str = "5m"):
+        """
+        Comandos e botões mais lentos: p50/p95/p99 e quebra por DB, Riot e REST do Discord.
+        Uso: .lentos [5m|1h]
+        """
+        if janela not in WINDOWS:
+            return await ctx.reply(f"❌ Janela inválida. Use: {', '.join(f'`{w}`' for w in WINDOWS)}.")
+        view = SlowCommandsView(janela)
+        view.message = await ctx.reply(embed=build_slow_commands_embed(janela), view=view)
+
     @commands.command(name="config_cargo")
     @commands.has_permissions(administrator=True)
     async def config_cargo(self, ctx: commands.Context, tipo: str, cargo: discord.Role):
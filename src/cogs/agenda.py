@@ -1,13 +1,18 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from datetime import datetime, timedelta, timezone
 import logging
 from src.database.repositories import EventRepository
+from src.services.scheduler import scheduler
 
 logger = logging.getLogger("agenda")
 
 BRT = timezone(timedelta(hours=-3))
 
+# Lembretes: antecedência de cada tipo e tolerância para atraso (ex.: bot fora do ar)
+REMINDER_OFFSETS = {'24h': timedelta(hours=24), '30min': timedelta(minutes=30)}
+REMINDER_GRACE = timedelta(minutes=30)
+
 
 def parse_brazil_dt(date_str: str, time_str: str) -> datetime:
     """Converte DD/MM/YYYY e HH:MM (Brasília, UTC-3) para datetime UTC naive."""
@@ -129,6 +134,7 @@ class AgendaView(discord.ui.View):
 class Agenda(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        scheduler.register("agenda_reminder", self._reminder_job)
 
     async def cog_load(self):
         # Re-registra views de eventos abertos para sobreviver a restarts
@@ -148,41 +154,49 @@ class Agenda(commands.Cog):
         except Exception as ex:
             logger.warning(f"Agenda: erro ao recarregar eventos: {ex}")
 
-        self.check_notifications.start()
-
-    async def cog_unload(self):
-        self.check_notifications.cancel()
-
-    # --- TASK DE NOTIFICAÇÕES ---
-    @tasks.loop(minutes=5)
-    async def check_notifications(self):
+        # Garante os lembretes de eventos abertos no agendador (eventos criados antes dele existir)
         try:
-            events = await EventRepository.get_events_needing_notification()
-            now = datetime.utcnow()
-
-            for event in events:
-                dt   = event['scheduled_for']
-                diff = dt - now
+            for event in await EventRepository.get_events_needing_notification():
+                await self._schedule_reminders(event, ensure=True)
+        except Exception as ex:
+            logger.warning(f"Agenda: erro ao agendar lembretes: {ex}")
 
-                if diff.total_seconds() < 0:
-                    continue  # Evento já passou
+    # --- LEMBRETES (agendador persistente) ---
+    async def _schedule_reminders(self, event: dict, ensure: bool = False):
+        """
+        Agenda os lembretes de 24h e 30min do evento (ignora os que já passaram ou já foram enviados).
+        `ensure` (inicialização): não mexe em lembretes que já existem, nem reabre os que esgotaram as tentativas.
+        """
+        now = datetime.utcnow()
+        for reminder_type, offset in REMINDER_OFFSETS.items():
+            if event.get(f'notified_{reminder_type}'):
+                continue
+            run_at = event['scheduled_for'] - offset
+            if run_at + REMINDER_GRACE < now:
+                continue
+            await scheduler.schedule(
+                "agenda_reminder", f"agenda:{event['id']}:{reminder_type}", run_at,
+                {'event_id': event['id'], 'type': reminder_type}, ensure=ensure
+            )
 
-                if (not event['notified_24h']
-                        and timedelta(hours=23, minutes=29) <= diff <= timedelta(hours=24, minutes=31)):
-                    await self._send_reminder(event, '24h')
-                    await EventRepository.mark_notified(event['id'], '24h')
+    async def _cancel_reminders(self, event_id: int):
+        for reminder_type in REMINDER_OFFSETS:
+            await scheduler.cancel(f"agenda:{event_id}:{reminder_type}")
 
-                elif (not event['notified_30min']
-                        and timedelta(minutes=10) <= diff <= timedelta(minutes=45)):
-                    await self._send_reminder(event, '30min')
-                    await EventRepository.mark_notified(event['id'], '30min')
+    async def _reminder_job(self, payload: dict):
+        """Handler do agendador. Idempotente: checa status e a flag notified_* antes de enviar."""
+        reminder_type = payload['type']
+        event = await EventRepository.get_event(payload['event_id'])
+        if not event or event['status'] != 'open' or event.get(f'notified_{reminder_type}'):
+            return
 
-        except Exception as e:
-            logger.error(f"Erro no check_notifications da Agenda: {e}")
+        late = datetime.utcnow() - (event['scheduled_for'] - REMINDER_OFFSETS[reminder_type])
+        if late > REMINDER_GRACE:
+            logger.info(f"Agenda: lembrete {reminder_type} do evento #{event['id']} expirou ({late} de atraso).")
+            return
 
-    @check_notifications.before_loop
-    async def before_check(self):
-        await self.bot.wait_until_ready()
+        await self._send_reminder(event, reminder_type)
+        await EventRepository.mark_notified(event['id'], reminder_type)
 
     async def _send_reminder(self, event: dict, reminder_type: str):
         ts = int(event['scheduled_for'].replace(tzinfo=timezone.utc).timestamp())
@@ -273,6 +287,7 @@ class Agenda(commands.Cog):
         embed = build_embed(event, ctx.guild)
         msg   = await ctx.send(embed=embed, view=view)
         await EventRepository.set_message(event_id, ctx.channel.id, msg.id)
+        await self._schedule_reminders(event)
 
         try:
             await ctx.message.delete()
@@ -355,6 +370,7 @@ class Agenda(commands.Cog):
             return
 
         await EventRepository.cancel_event(event_id)
+        await self._cancel_reminders(event_id)
 
         if event.get('channel_id') and event.get('message_id'):
             try:
@@ -382,6 +398,7 @@ class Agenda(commands.Cog):
             return
 
         await EventRepository.cancel_event(event_id)
+        await self._cancel_reminders(event_id)
 
         # Atualiza o embed original
         if event.get('channel_id') and event.get('message_id'):
@@ -465,6 +482,7 @@ class Agenda(commands.Cog):
             return await ctx.reply(f"❌ Evento #{event_id} não tem nenhum confirmado.")
 
         await EventRepository.start_event(event_id)
+        await self._cancel_reminders(event_id)
 
         # Desabilita botões no embed original (silencioso se não encontrar a mensagem)
         await self._refresh_event_message(ctx.guild, event_id, await EventRepository.get_event(event_id))
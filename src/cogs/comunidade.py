@@ -1,10 +1,14 @@
 import discord
+import logging
 import random
 from discord.ext import commands
 from datetime import datetime, timedelta
 from src.database.repositories import CommunityRepository
+from src.services.discord_http import http_priority, Priority
 from src.utils.views import BaseInteractiveView
 
+logger = logging.getLogger("comunidade")
+
 
 class Community(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -36,7 +40,7 @@ class Community(commands.Cog):
             if minutes >= 1:
                 xp_earned = minutes * 10
                 await CommunityRepository.add_xp(member.id, xp_earned, has_media=False, voice_minutes=minutes)
-                print(f"[Voice] {member.name} ganhou {xp_earned} XP (sessão finalizada).")
+                logger.info("Voz: %s ganhou %s XP (sessão finalizada)", member.name, xp_earned, extra={'minutes': minutes})
             return True
         return False
 
@@ -57,7 +61,8 @@ class Community(commands.Cog):
         self.xp_cooldown[message.author.id] = datetime.utcnow()
 
         if leveled_up:
-            await message.add_reaction("🆙")
+            with http_priority(Priority.LOW):
+                await message.add_reaction("🆙")
             xp_next = int(new_level * 100 * 1.2)
             embed = discord.Embed(
                 title="⬆️ LEVEL UP!",
@@ -89,7 +94,7 @@ class Community(commands.Cog):
                     for remaining in valid_members:
                         if remaining.id in self.voice_sessions:
                             await self._finish_voice_session(remaining)
-                            print(f"[Voice] Contagem parada para {remaining.name} (ficou sozinho).")
+                            logger.debug("Voz: contagem parada para %s (ficou sozinho)", remaining.name)
 
         # Lógica de entrada / desmute / troca de canal
         if (after.channel is not None and before.channel is None) or \
@@ -107,14 +112,14 @@ class Community(commands.Cog):
             if len(valid_members) >= 2:
                 if member.id not in self.voice_sessions:
                     self.voice_sessions[member.id] = datetime.utcnow()
-                    print(f"[Voice] {member.name} começou a ganhar XP ({len(valid_members)} pessoas).")
+                    logger.debug("Voz: %s começou a ganhar XP (%s pessoas)", member.name, len(valid_members))
 
                 for existing in valid_members:
                     if existing.id != member.id:
                         if not existing.voice.self_mute and not existing.voice.self_deaf:
                             if existing.id not in self.voice_sessions:
                                 self.voice_sessions[existing.id] = datetime.utcnow()
-                                print(f"[Voice] {existing.name} começou a ganhar XP (chegou companhia).")
+                                logger.debug("Voz: %s começou a ganhar XP (chegou companhia)", existing.name)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -129,7 +134,9 @@ class Community(commands.Cog):
                     for member in valid_members:
                         if member.voice and not member.voice.self_mute and not member.voice.self_deaf:
                             self.voice_sessions[member.id] = datetime.utcnow()
-                            print(f"[Voice Restore] Sessão recuperada para {member.name}")
+
+        if self.voice_sessions:
+            logger.info("Voz: %s sessão(ões) recuperada(s)", len(self.voice_sessions))
 
     @commands.command(name="social", aliases=["perfil_social", "rank", "comunidade"])
     async def social_profile(self, ctx, member: discord.Member = None):
@@ -1,28 +1,55 @@
 import discord
+import logging
 import random
 from discord.ext import commands
-from src.database.repositories import PlayerRepository, MatchRepository, LobbyRepository, GuildRepository
+from src.database.repositories import PlayerRepository, MatchRepository, LobbyRepository, GuildRepository, PollRepository, JobRepository, SetupRepository, DraftRepository
 from src.services.matchmaker import MatchMaker
+from src.services.balancer import LaneAwareObjective, PoolSelector
+from src.services.queue_manager import QueueManager
+from src.services.predictor import win_predictor
+from src.services.scheduler import scheduler
+from src.services.voting import PollTally
+from src.services.role_sync import RoleSync
+from src.services.pipeline import Pipeline, Stage
+from src.services.draft import DraftState, DraftPhase, DraftError
+from src.services.discord_http import http_priority, Priority
+from src.services.metrics import registry
 import asyncio
+from datetime import datetime, timedelta
 from src.utils.views import BaseInteractiveView
 
 from sqlalchemy import select, func
 from src.database.config import get_session
 from src.database.models import Match as MatchModel, MatchStatus
 
+logger = logging.getLogger("lobby")
 
 # Marcos de sequência que merecem anúncio
 STREAK_MILESTONES = {3, 5, 7, 10, 15, 20}
+# Novas tentativas para os membros cuja troca de cargo falhou (exceto Forbidden)
+ROLE_SYNC_RETRIES = 2
+
+
+def format_team_line(p: dict) -> str:
+    """Linha do jogador nos embeds de time (inclui a rota atribuída pelo balanceador, se houver)."""
+    lane = f" · {p['assigned_lane'].title()}" if p.get('assigned_lane') else ""
+    return f"• {p['name']} ({p['mmr']}){lane}"
+
+
+def format_win_chance(blue: list, red: list) -> str:
+    """Chance de vitória prevista (🔵 x% • y% 🔴) para os embeds de formação de times."""
+    p_blue = win_predictor.predict(blue, red)
+    return f"🔵 **{p_blue * 100:.0f}%** • **{(1 - p_blue) * 100:.0f}%** 🔴"
 
 
 # --- COMPONENTE DE SELEÇÃO DE JOGADOR ---
 class PlayerSelect(discord.ui.Select):
-    def __init__(self, players, placeholder):
+    def __init__(self, players, placeholder, **kwargs):
         options = [
             discord.SelectOption(label=p['name'], value=str(p['id']), description=f"MMR: {p['mmr']}")
             for p in players[:25]
         ]
-        super().__init__(placeholder=placeholder, min_values=1, max_values=1, options=options)
+        super().__init__(placeholder=placeholder, min_values=1, max_values=1, options=options, **kwargs)
 
     async def callback(self, interaction: discord.Interaction):
         await self.view.process_pick(interaction, self.values[0])
@@ -85,26 +112,23 @@ class ManualCaptainView(BaseInteractiveView):
         self.stop()
 
 
-# --- VIEW DO DRAFT ---
-class DraftView(BaseInteractiveView):
-    def __init__(self, lobby_cog, guild_id, cap_blue, cap_red, pool, first_pick_side):
-        super().__init__(timeout=900)
+# --- VIEW DO DRAFT (persistente) ---
+class DraftView(discord.ui.View):
+    """
+    Draft por capitães. Persistente: os custom_ids são fixos e o objeto não guarda estado;
+    cada escolha reconstrói o DraftState do banco, aplica a transição e grava só o pick,
+    então um restart no meio do draft não perde os picks já feitos.
+    """
+    STAGE = 'draft'
+
+    def __init__(self, lobby_cog, draft: DraftState = None):
+        super().__init__(timeout=None)
         self.lobby_cog = lobby_cog
-        self.guild_id = guild_id
-        self.cap_blue = cap_blue
-        self.cap_red = cap_red
-        self.pool = pool
-        self.turn = first_pick_side
-        self.team_blue = [cap_blue]
-        self.team_red = [cap_red]
-        self.update_components()
-
-    def update_components(self):
-        self.clear_items()
-        if self.pool:
-            picker_name = self.cap_blue['name'] if self.turn == 'BLUE' else self.cap_red['name']
-            self.add_item(PlayerSelect(self.pool, placeholder=f"Vez de {picker_name} escolher..."))
-        cancel_btn = discord.ui.Button(label="Cancelar Draft (Admin)", style=discord.ButtonStyle.secondary, row=2, emoji="✖️")
+        # Sem estado: instância registrada no bot.add_view (só os custom_ids importam)
+        if draft is None or draft.phase is DraftPhase.PICKING:
+            placeholder = f"Vez de {draft.picker['name']} escolher..." if draft else "Escolha um jogador..."
+            self.add_item(PlayerSelect(draft.pool if draft else [], placeholder=placeholder, custom_id="setup_draft_pick"))
+        cancel_btn = discord.ui.Button(label="Cancelar Draft (Admin)", style=discord.ButtonStyle.secondary, row=2, emoji="✖️", custom_id="setup_draft_cancel")
         cancel_btn.callback = self.cancel_callback
         self.add_item(cancel_btn)
 
@@ -112,48 +136,40 @@ class DraftView(BaseInteractiveView):
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("⛔ Apenas Administradores podem cancelar o draft!", ephemeral=True)
             return
-        embed = discord.Embed(title="❌ Draft Cancelado", description=f"Cancelado por {interaction.user.mention}. Fila reaberta.", color=0xff0000)
-        await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
-        await self.lobby_cog.reset_lobby_state()
-
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        picker_id = self.cap_blue['id'] if self.turn == 'BLUE' else self.cap_red['id']
-        if interaction.user.guild_permissions.administrator: return True
-        if picker_id < 0: return True
-        if interaction.user.id == picker_id: return True
-        await interaction.response.send_message(f"✋ Espere sua vez! Agora é a vez do Capitão {self.turn}.", ephemeral=True)
-        return False
+        async with self.lobby_cog.setup_lock:
+            if await self.lobby_cog.load_setup(interaction, self.STAGE) is None:
+                return
+            embed = discord.Embed(title="❌ Draft Cancelado", description=f"Cancelado por {interaction.user.mention}. Fila reaberta.", color=0xff0000)
+            await interaction.response.edit_message(embed=embed, view=None)
+            await self.lobby_cog.reset_lobby_state(guild_id=interaction.guild.id)
 
     async def process_pick(self, interaction: discord.Interaction, picked_id: str):
-        picked_player = next((p for p in self.pool if str(p['id']) == picked_id), None)
-        if not picked_player: return
-
-        if self.turn == 'BLUE':
-            self.team_blue.append(picked_player)
-            self.turn = 'RED'
-        else:
-            self.team_red.append(picked_player)
-            self.turn = 'BLUE'
-
-        self.pool.remove(picked_player)
-
-        if not self.pool:
-            await self.finish_draft(interaction)
-        else:
-            self.update_components()
-            await interaction.response.edit_message(embed=self.get_embed(), view=self)
+        async with self.lobby_cog.setup_lock:
+            if await self.lobby_cog.load_setup(interaction, self.STAGE) is None:
+                return
+            draft = await DraftRepository.get(interaction.guild.id)
+            if draft is None or draft.phase is DraftPhase.COMPLETE:
+                return await interaction.response.send_message("⌛ Este draft não está mais ativo.", ephemeral=True)
 
-    async def finish_draft(self, interaction: discord.Interaction):
-        real_blue = [p for p in self.team_blue if p['id'] > 0]
-        real_red = [p for p in self.team_red if p['id'] > 0]
+            picker_id = draft.picker['id']
+            if not (interaction.user.guild_permissions.administrator or picker_id < 0 or interaction.user.id == picker_id):
+                return await interaction.response.send_message(f"✋ Espere sua vez! Agora é a vez do Capitão {draft.turn}.", ephemeral=True)
 
-        match_id = await MatchRepository.create_match(
-            guild_id=self.guild_id,
-            blue_team=real_blue,
-            red_team=real_red
-        )
+            try:
+                draft.pick(int(picked_id))
+            except DraftError:
+                return await interaction.response.send_message("⚠️ Esse jogador já foi escolhido.", ephemeral=True)
+
+            status, match_id = await DraftRepository.record_pick(interaction.guild.id, draft)
+            if status == "STALE":
+                return await interaction.response.send_message("⚠️ O draft mudou enquanto você escolhia. Tente de novo.", ephemeral=True)
+            if status == "COMPLETE":
+                await self.finish_draft(interaction, draft, match_id)
+            else:
+                await interaction.response.edit_message(embed=self.get_embed(draft), view=DraftView(self.lobby_cog, draft))
 
+    async def finish_draft(self, interaction: discord.Interaction, draft: DraftState, match_id: int):
+        """Partida já criada junto com o último pick: anuncia os times e trava o lobby."""
         embed = discord.Embed(title=f"⚔️ PARTIDA #{match_id} (Draft Finalizado)", color=0x2ecc71)
 
         def fmt(team):
@@ -162,130 +178,202 @@ class DraftView(BaseInteractiveView):
             names = "\n".join([f"• {p['name']} ({p['mmr']})" for p in team])
             return f"{names}\n\n📊 **Média:** {avg}"
 
-        embed.add_field(name=f"🔵 Time Azul (Cap. {self.cap_blue['name']})", value=fmt(self.team_blue), inline=True)
-        embed.add_field(name=f"🔴 Time Vermelho (Cap. {self.cap_red['name']})", value=fmt(self.team_red), inline=True)
-        embed.add_field(name="\u200b", value="\u200b", inline=False)
+        embed.add_field(name=f"🔵 Time Azul (Cap. {draft.cap_blue['name']})", value=fmt(draft.team_blue), inline=True)
+        embed.add_field(name=f"🔴 Time Vermelho (Cap. {draft.cap_red['name']})", value=fmt(draft.team_red), inline=True)
+        embed.add_field(name="🎯 Chance de Vitória", value=format_win_chance(draft.team_blue, draft.team_red), inline=False)
         embed.add_field(name="📢 Instruções", value=f"ID: **{match_id}**\n`.resultado {match_id} Blue/Red`", inline=False)
 
         await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
         self.lobby_cog.current_match_id = 0
         await self.lobby_cog.update_lobby_message(locked=True)
         # Limpa a fila persistida, pois a partida já foi criada
-        if interaction.guild:
-            await LobbyRepository.clear_state(interaction.guild.id)
-
-    def get_embed(self):
-        color = 0x3498db if self.turn == 'BLUE' else 0xe74c3c
-        picker = self.cap_blue['name'] if self.turn == 'BLUE' else self.cap_red['name']
-        embed = discord.Embed(title="👑 Draft em Andamento", description=f"**Vez de:** {picker} escolher!", color=color)
-        b_str = "\n".join([p['name'] for p in self.team_blue])
-        r_str = "\n".join([p['name'] for p in self.team_red])
-        p_str = ", ".join([f"`{p['name']}`" for p in self.pool])
+        await self.lobby_cog.clear_persisted_queue(interaction.guild.id)
+
+    @staticmethod
+    def get_embed(draft: DraftState):
+        color = 0x3498db if draft.turn == 'BLUE' else 0xe74c3c
+        embed = discord.Embed(title="👑 Draft em Andamento", description=f"**Vez de:** {draft.picker['name']} escolher!", color=color)
+        b_str = "\n".join([p['name'] for p in draft.team_blue])
+        r_str = "\n".join([p['name'] for p in draft.team_red])
+        p_str = ", ".join([f"`{p['name']}`" for p in draft.pool])
         embed.add_field(name="🔵 Time Azul", value=b_str, inline=True)
         embed.add_field(name="🔴 Time Vermelho", value=r_str, inline=True)
         if p_str: embed.add_field(name="📋 Disponíveis", value=p_str, inline=False)
+        embed.set_footer(text=f"Pick {len(draft.picks) + 1}/{len(draft.picks) + len(draft.pool)}")
         return embed
 
 
-# --- VIEW DE ESCOLHA DE LADO (COINFLIP) ---
-class SideSelectView(BaseInteractiveView):
-    def __init__(self, lobby_cog, cap_priority, cap_secondary, pool):
-        super().__init__(timeout=900)
-        self.lobby_cog = lobby_cog
-        self.cap_priority = cap_priority
-        self.cap_secondary = cap_secondary
-        self.pool = pool
+# --- VIEW DE ESCOLHA DE LADO (COINFLIP, persistente) ---
+class SideSelectView(discord.ui.View):
+    """Capitão secundário escolhe o lado; estado (capitães e pool) lido do banco a cada clique."""
+    STAGE = 'side_select'
 
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.guild_permissions.administrator: return True
-        if interaction.user.id == self.cap_secondary['id'] and self.cap_secondary['id'] > 0: return True
-        await interaction.response.send_message(f"✋ Apenas {self.cap_secondary['name']} pode escolher o lado!", ephemeral=True)
-        return False
+    def __init__(self, lobby_cog):
+        super().__init__(timeout=None)
+        self.lobby_cog = lobby_cog
 
-    async def start_draft_phase(self, interaction, cap_blue, cap_red, first_pick_side):
+    async def start_draft_phase(self, interaction, state, cap_blue, cap_red, first_pick_side):
         try: await interaction.message.edit(view=None)
         except: pass
-        view = DraftView(self.lobby_cog, interaction.guild.id, cap_blue, cap_red, self.pool, first_pick_side)
-        await interaction.response.send_message(embed=view.get_embed(), view=view)
+        draft = DraftState([cap_blue, cap_red] + state['pool'], cap_blue['id'], cap_red['id'], first_pick_side)
+        await DraftRepository.start(interaction.guild.id, draft)
+        # O estado do draft fica em draft_sessions/draft_players; a etapa só guarda a mensagem
+        await self.lobby_cog.send_setup_stage(interaction, DraftView.STAGE, {},
+                                              embed=DraftView.get_embed(draft), view=DraftView(self.lobby_cog, draft))
+
+    async def choose_side(self, interaction: discord.Interaction, side: str):
+        async with self.lobby_cog.setup_lock:
+            state = await self.lobby_cog.load_setup(interaction, self.STAGE)
+            if state is None:
+                return
+
+            cap_priority, cap_secondary = state['cap_priority'], state['cap_secondary']
+            if not (interaction.user.guild_permissions.administrator
+                    or (interaction.user.id == cap_secondary['id'] and cap_secondary['id'] > 0)):
+                return await interaction.response.send_message(f"✋ Apenas {cap_secondary['name']} pode escolher o lado!", ephemeral=True)
+
+            if side == 'BLUE':
+                await self.start_draft_phase(interaction, state, cap_blue=cap_secondary, cap_red=cap_priority, first_pick_side='RED')
+            else:
+                await self.start_draft_phase(interaction, state, cap_blue=cap_priority, cap_red=cap_secondary, first_pick_side='BLUE')
 
-    @discord.ui.button(label="Quero Lado Azul", style=discord.ButtonStyle.primary, emoji="🔵")
+    @discord.ui.button(label="Quero Lado Azul", style=discord.ButtonStyle.primary, emoji="🔵", custom_id="setup_side_blue")
     async def blue_side(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.start_draft_phase(interaction, cap_blue=self.cap_secondary, cap_red=self.cap_priority, first_pick_side='RED')
+        await self.choose_side(interaction, 'BLUE')
 
-    @discord.ui.button(label="Quero Lado Vermelho", style=discord.ButtonStyle.secondary, emoji="🔴")
+    @discord.ui.button(label="Quero Lado Vermelho", style=discord.ButtonStyle.secondary, emoji="🔴", custom_id="setup_side_red")
     async def red_side(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.start_draft_phase(interaction, cap_blue=self.cap_priority, cap_red=self.cap_secondary, first_pick_side='BLUE')
+        await self.choose_side(interaction, 'RED')
 
-    @discord.ui.button(label="Cancelar (Admin)", style=discord.ButtonStyle.secondary, emoji="✖️", row=2)
+    @discord.ui.button(label="Cancelar (Admin)", style=discord.ButtonStyle.secondary, emoji="✖️", row=2, custom_id="setup_side_cancel")
     async def cancel_side(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not interaction.user.guild_permissions.administrator:
             return await interaction.response.send_message("⛔ Apenas Admins.", ephemeral=True)
-        await self.lobby_cog.reset_lobby_state()
-        await interaction.response.edit_message(content="❌ Processo cancelado. Fila reaberta.", embed=None, view=None)
-        self.stop()
+        async with self.lobby_cog.setup_lock:
+            if await self.lobby_cog.load_setup(interaction, self.STAGE) is None:
+                return
+            await self.lobby_cog.reset_lobby_state(guild_id=interaction.guild.id)
+            await interaction.response.edit_message(content="❌ Processo cancelado. Fila reaberta.", embed=None, view=None)
 
 
-# --- VIEW DE ESCOLHA DE LADO (BALANCEADO) ---
-class BalancedSideSelectView(BaseInteractiveView):
-    def __init__(self, lobby_cog, guild_id, winning_cap, winning_team, losing_cap, losing_team):
-        super().__init__(timeout=900)
+# --- VIEW DE ESCOLHA DE LADO (BALANCEADO, persistente) ---
+class BalancedSideSelectView(discord.ui.View):
+    """Escolha de lado das divisões balanceadas; opções e opção atual lidas do banco a cada clique."""
+    STAGE = 'balanced'
+
+    def __init__(self, lobby_cog, state: dict = None):
+        super().__init__(timeout=None)
         self.lobby_cog = lobby_cog
-        self.guild_id = guild_id
-        self.winning_cap = winning_cap
-        self.winning_team = winning_team
-        self.losing_cap = losing_cap
-        self.losing_team = losing_team
+        if state is not None and len(state['options']) <= 1:
+            self.remove_item(self.next_option)
 
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.guild_permissions.administrator: return True
-        if interaction.user.id == self.winning_cap['id'] and self.winning_cap['id'] > 0: return True
-        await interaction.response.send_message(f"✋ Apenas {self.winning_cap['name']} pode escolher o lado!", ephemeral=True)
-        return False
+    @staticmethod
+    def sides(state: dict) -> tuple:
+        """Divisão selecionada: (capitão vencedor do sorteio, time dele, outro capitão, outro time)."""
+        option = state['options'][state['option_index']]
+        team_a, team_b = option['blue'], option['red']
+
+        real_a = [p for p in team_a if p['id'] > 0]
+        real_b = [p for p in team_b if p['id'] > 0]
+        cap_a = max(real_a, key=lambda x: x['mmr']) if real_a else team_a[0]
+        cap_b = max(real_b, key=lambda x: x['mmr']) if real_b else team_b[0]
+
+        if state['first_team_wins_coinflip']:
+            return cap_a, team_a, cap_b, team_b
+        return cap_b, team_b, cap_a, team_a
+
+    @classmethod
+    def get_embed(cls, state: dict):
+        option = state['options'][state['option_index']]
+        winning_cap, winning_team, losing_cap, losing_team = cls.sides(state)
+
+        def fmt(team):
+            real_players = [p for p in team if p['id'] > 0]
+            avg = sum(p['mmr'] for p in real_players) // len(real_players) if real_players else 0
+            return "\n".join([format_team_line(p) for p in team]) + f"\n\n📊 **Média:** {avg}"
+
+        embed = discord.Embed(title="⚖️ Times Balanceados! (Sorteio)", color=0xff9900)
+        embed.description = f"**{winning_cap['name']}** venceu o cara-ou-coroa e escolhe o **LADO**."
+        embed.add_field(name=f"🅰️ Time de {winning_cap['name']}", value=fmt(winning_team), inline=True)
+        embed.add_field(name=f"🅱️ Time de {losing_cap['name']}", value=fmt(losing_team), inline=True)
+        p_win = win_predictor.predict(winning_team, losing_team)
+        embed.add_field(name="🎯 Chance de Vitória", value=f"🅰️ **{p_win * 100:.0f}%** • **{(1 - p_win) * 100:.0f}%** 🅱️", inline=False)
+        embed.set_footer(text=f"Opção {state['option_index'] + 1}/{len(state['options'])} • Diferença de média: {option['avg_diff']} MMR")
+        return embed
 
     async def finalize_match(self, interaction, blue_team, red_team):
         try: await interaction.message.edit(view=None)
         except: pass
 
+        guild_id = interaction.guild.id
         real_blue = [p for p in blue_team if p['id'] > 0]
         real_red = [p for p in red_team if p['id'] > 0]
 
-        match_id = await MatchRepository.create_match(self.guild_id, real_blue, real_red)
+        match_id = await MatchRepository.create_match(guild_id, real_blue, real_red)
+        await SetupRepository.clear(guild_id)
         embed = discord.Embed(title=f"⚔️ PARTIDA #{match_id} (Balanceada)", color=0x2ecc71)
 
         def fmt(team):
             real_players = [p for p in team if p['id'] > 0]
             avg = sum(p['mmr'] for p in real_players) // len(real_players) if real_players else 0
-            return "\n".join([f"• {p['name']} ({p['mmr']})" for p in team]) + f"\n\n📊 **Média:** {avg}"
+            return "\n".join([format_team_line(p) for p in team]) + f"\n\n📊 **Média:** {avg}"
 
         cap_blue_name = max(blue_team, key=lambda x: x['mmr'])['name']
         cap_red_name = max(red_team, key=lambda x: x['mmr'])['name']
 
         embed.add_field(name=f"🔵 Time Azul (Cap. {cap_blue_name})", value=fmt(blue_team), inline=True)
         embed.add_field(name=f"🔴 Time Vermelho (Cap. {cap_red_name})", value=fmt(red_team), inline=True)
-        embed.add_field(name="\u200b", value="\u200b", inline=False)
+        embed.add_field(name="🎯 Chance de Vitória", value=format_win_chance(blue_team, red_team), inline=False)
         embed.add_field(name="📢 Instruções", value=f"ID: **{match_id}**\n`.resultado {match_id} Blue/Red`", inline=False)
 
         await interaction.response.send_message(embed=embed)
-        await self.lobby_cog.reset_lobby_state(match_id)
         # Limpa a fila persistida
-        await LobbyRepository.clear_state(self.guild_id)
+        await self.lobby_cog.clear_persisted_queue(guild_id)
+        await self.lobby_cog.reset_lobby_state(match_id)
 
-    @discord.ui.button(label="Escolher BLUE", style=discord.ButtonStyle.primary, emoji="🔵")
+    async def choose_side(self, interaction: discord.Interaction, side: str):
+        async with self.lobby_cog.setup_lock:
+            state = await self.lobby_cog.load_setup(interaction, self.STAGE)
+            if state is None:
+                return
+            winning_cap, winning_team, _, losing_team = self.sides(state)
+            if not (interaction.user.guild_permissions.administrator
+                    or (interaction.user.id == winning_cap['id'] and winning_cap['id'] > 0)):
+                return await interaction.response.send_message(f"✋ Apenas {winning_cap['name']} pode escolher o lado!", ephemeral=True)
+            if side == 'BLUE':
+                await self.finalize_match(interaction, blue_team=winning_team, red_team=losing_team)
+            else:
+                await self.finalize_match(interaction, blue_team=losing_team, red_team=winning_team)
+
+    @discord.ui.button(label="Escolher BLUE", style=discord.ButtonStyle.primary, emoji="🔵", custom_id="setup_bal_blue")
     async def choose_blue(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.finalize_match(interaction, blue_team=self.winning_team, red_team=self.losing_team)
+        await self.choose_side(interaction, 'BLUE')
 
-    @discord.ui.button(label="Escolher RED", style=discord.ButtonStyle.secondary, emoji="🔴")
+    @discord.ui.button(label="Escolher RED", style=discord.ButtonStyle.secondary, emoji="🔴", custom_id="setup_bal_red")
     async def choose_red(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await self.finalize_match(interaction, blue_team=self.losing_team, red_team=self.winning_team)
+        await self.choose_side(interaction, 'RED')
 
-    @discord.ui.button(label="Cancelar (Admin)", style=discord.ButtonStyle.secondary, emoji="✖️", row=2)
+    @discord.ui.button(label="Outra Opção (Admin)", style=discord.ButtonStyle.secondary, emoji="🔄", row=2, custom_id="setup_bal_next")
+    async def next_option(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message("⛔ Apenas Admins.", ephemeral=True)
+        async with self.lobby_cog.setup_lock:
+            state = await self.lobby_cog.load_setup(interaction, self.STAGE)
+            if state is None:
+                return
+            state['option_index'] = (state['option_index'] + 1) % len(state['options'])
+            await SetupRepository.save(interaction.guild.id, self.STAGE, state)
+            await interaction.response.edit_message(embed=self.get_embed(state), view=BalancedSideSelectView(self.lobby_cog, state))
+
+    @discord.ui.button(label="Cancelar (Admin)", style=discord.ButtonStyle.secondary, emoji="✖️", row=2, custom_id="setup_bal_cancel")
     async def cancel_bal(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not interaction.user.guild_permissions.administrator:
             return await interaction.response.send_message("⛔ Apenas Admins.", ephemeral=True)
-        await self.lobby_cog.reset_lobby_state()
-        await interaction.response.edit_message(content="❌ Criação cancelada. Fila reaberta.", embed=None, view=None)
-        self.stop()
+        async with self.lobby_cog.setup_lock:
+            if await self.lobby_cog.load_setup(interaction, self.STAGE) is None:
+                return
+            await self.lobby_cog.reset_lobby_state(guild_id=interaction.guild.id)
+            await interaction.response.edit_message(content="❌ Criação cancelada. Fila reaberta.", embed=None, view=None)
 
 
 # --- VIEW DO LOBBY ---
@@ -296,6 +384,12 @@ class LobbyView(BaseInteractiveView):
         if disabled:
             self.clear_items()
 
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Após um restart a referência à mensagem do lobby se perde: o primeiro clique a recupera
+        if self.lobby_cog.lobby_message is None:
+            self.lobby_cog.lobby_message = interaction.message
+        return True
+
     @discord.ui.button(label="Entrar", style=discord.ButtonStyle.success, emoji="⚔️", custom_id="lobby_join")
     async def join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.lobby_cog.process_join(interaction)
@@ -312,14 +406,14 @@ class LobbyView(BaseInteractiveView):
     async def cancel_queue_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not interaction.user.guild_permissions.administrator:
             return await interaction.response.send_message("⛔ Apenas Administradores podem cancelar a fila.", ephemeral=True)
-        await self.lobby_cog.reset_lobby_state()
+        await self.lobby_cog.reset_lobby_state(clear_queue=True, guild_id=interaction.guild.id)
         await interaction.response.send_message("❌ Fila cancelada e lobby reaberto.", ephemeral=True)
 
     @discord.ui.button(label="Resetar Fila (Admin)", style=discord.ButtonStyle.secondary, emoji="🗑️", custom_id="lobby_reset", row=1)
     async def reset_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not interaction.user.guild_permissions.administrator:
             return await interaction.response.send_message("⛔ Apenas Administradores podem resetar a fila.", ephemeral=True)
-        await self.lobby_cog.reset_lobby_state()
+        await self.lobby_cog.reset_lobby_state(clear_queue=True, guild_id=interaction.guild.id)
         await interaction.response.send_message("✅ Fila resetada. Lobby reaberto.", ephemeral=True)
 
 
@@ -380,11 +474,39 @@ class ModeSelectView(BaseInteractiveView):
         self.stop()
 
 
+# --- VIEW DA ENQUETE MVP/iMVP (persistente) ---
+class PollView(discord.ui.View):
+    """
+    Um botão por candidato, com custom_id fixo por partida/enquete/jogador; re-registrada
+    com bot.add_view no cog_load para continuar funcionando após restart.
+    """
+    def __init__(self, lobby_cog, match_id: int, poll_type: str, team: list):
+        super().__init__(timeout=None)
+        self.lobby_cog = lobby_cog
+        self.match_id = match_id
+        self.poll_type = poll_type
+
+        for i, p in enumerate(team):
+            button = discord.ui.Button(
+                label=p['name'][:80],
+                style=discord.ButtonStyle.secondary,
+                emoji=lobby_cog.VOTE_EMOJIS[i],
+                custom_id=f"poll_{poll_type}_{match_id}_{p['id']}",
+            )
+            button.callback = self._make_callback(p['id'])
+            self.add_item(button)
+
+    def _make_callback(self, candidate_id: int):
+        async def callback(interaction: discord.Interaction):
+            await self.lobby_cog.cast_poll_vote(interaction, self.match_id, self.poll_type, candidate_id)
+        return callback
+
+
 # --- LOBBY COG ---
 class Lobby(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.queue = []
+        self.queue_manager = QueueManager()
         self.lobby_message: discord.Message = None
 
         self.current_match_id = 0
@@ -394,19 +516,85 @@ class Lobby(commands.Cog):
         self.DEBUG_FILL_ENABLE = False
         self.QUEUE_LIMIT = self.DEBUG_QUEUE_LIMIT
 
+        # Modo pool: fila de até POOL_LIMIT jogadores, os 10 mais equilibrados jogam
+        self.MATCH_SIZE = 10
+        self.POOL_LIMIT = 20
+        self.pool_mode = False
+        self.pool_match_pending = False  # True após .montar: a fila contém o banco de espera
+
         self.VOTE_EMOJIS = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣']
+        self.POLL_DURATION_MINUTES = 30
+
+        # Enquetes abertas: match_id -> dados da enquete (apuração em memória, votos no banco)
+        self.polls = {}
+        self.vote_lock = asyncio.Lock()
+
+        # Serializa os cliques da montagem de times (o estado de cada etapa fica no banco)
+        self.setup_lock = asyncio.Lock()
+
+        # Efeitos do .resultado após o commit (etapas paralelas com retry e tempos)
+        self.post_match = Pipeline("Pós-partida")
+        registry.add_collector(self.post_match.collect)
+        registry.gauge("lobby_queue_size", "Jogadores na fila do lobby").set_function(lambda: len(self.queue))
+
+        # Encerramento das enquetes roda pelo agendador persistente (sobrevive a restarts)
+        scheduler.register("mvp_poll", self._finalize_poll_job)
 
         # Recupera estado ao iniciar
         self.bot.loop.create_task(self.initialize_state())
 
+    @property
+    def queue(self) -> list:
+        return self.queue_manager.players
+
+    @property
+    def QUEUE_LIMIT(self) -> int:
+        return self.queue_manager.limit
+
+    @QUEUE_LIMIT.setter
+    def QUEUE_LIMIT(self, value: int):
+        self.queue_manager.limit = value
+
+    async def cog_unload(self):
+        registry.remove_collector(self.post_match.collect)
+        self.queue_manager.writer.close()
+
+    async def cog_load(self):
+        # Views persistentes do lobby e da montagem de times: custom_ids fixos, estado lido
+        # do banco a cada clique, então os botões continuam valendo após um restart
+        self.bot.add_view(LobbyView(self))
+        self.bot.add_view(SideSelectView(self))
+        self.bot.add_view(BalancedSideSelectView(self))
+        self.bot.add_view(DraftView(self))
+
+        # Reabre as enquetes ainda não encerradas (votos vêm do banco; a contagem volta para a memória)
+        try:
+            jobs = await JobRepository.get_pending("mvp_poll")
+            votes = await PollRepository.get_votes([job['payload']['match_id'] for job in jobs])
+            for job in jobs:
+                poll = self._register_poll(job['payload'], votes)
+                for poll_type in ('mvp', 'imvp'):
+                    self.bot.add_view(poll['views'][poll_type], message_id=job['payload'][f'{poll_type}_msg_id'])
+            if jobs:
+                logger.info("%s enquete(s) MVP/iMVP reaberta(s)", len(jobs))
+        except Exception as e:
+            logger.exception("Erro ao reabrir enquetes: %s", e)
+
     # --- INICIALIZAÇÃO DE ESTADO ---
     async def initialize_state(self):
         """
         Recupera o estado do lobby ao iniciar o bot:
         - Verifica partidas IN_PROGRESS para travar o lobby corretamente
         - Restaura a fila persistida se não houver partida ativa
+        - Aquece o cache de jogadores (entrar na fila não precisa ir ao banco)
         """
         await self.bot.wait_until_ready()
+        try:
+            cached = await PlayerRepository.prime_cache()
+            logger.info("Cache de jogadores carregado (%s jogador(es))", cached)
+        except Exception as e:
+            logger.exception("Erro ao carregar cache de jogadores: %s", e)
+
         try:
             async with get_session() as session:
                 stmt = select(func.max(MatchModel.id))
@@ -424,20 +612,20 @@ class Lobby(commands.Cog):
                     if active_match:
                         self.current_match_id = last_id
                         self.lobby_locked = True
-                        print(f"✅ [Lobby] Partida #{last_id} EM ANDAMENTO. Lobby travado.")
+                        logger.info("Partida #%s em andamento, lobby travado", last_id)
                         return  # Não restaura fila pois já tem partida ativa
                     else:
                         self.current_match_id = last_id + 1
-                        print(f"✅ [Lobby] Próxima partida: #{self.current_match_id}")
+                        logger.info("Próxima partida: #%s", self.current_match_id)
                 else:
                     self.current_match_id = 1
-                    print("✅ [Lobby] Nenhuma partida anterior. Início em #1.")
+                    logger.info("Nenhuma partida anterior, início em #1")
 
             # Restaura fila se não há partida ativa
             await self._restore_queue_from_db()
 
         except Exception as e:
-            print(f"❌ [Lobby] Erro ao recuperar estado: {e}")
+            logger.exception("Erro ao recuperar estado: %s", e)
             self.current_match_id = 1
 
     async def _restore_queue_from_db(self):
@@ -446,10 +634,20 @@ class Lobby(commands.Cog):
             try:
                 state = await LobbyRepository.get_state(guild.id)
                 if state and state['queue']:
-                    self.queue = state['queue']
-                    print(f"✅ [Lobby] Fila restaurada com {len(self.queue)} jogador(es) no servidor {guild.name}.")
+                    await self.queue_manager.restore(state['queue'])
+                    if len(state['queue']) > self.MATCH_SIZE:
+                        # Fila maior que uma partida só existe no modo pool
+                        self.pool_mode = True
+                        self.QUEUE_LIMIT = self.POOL_LIMIT
+                    logger.info("Fila restaurada com %s jogador(es)", len(self.queue), extra={'guild_id': guild.id})
+
+                # Montagem de times interrompida pelo restart: a fila continua travada até ela terminar
+                setup = await SetupRepository.get(guild.id)
+                if setup:
+                    self.lobby_locked = True
+                    logger.info("Montagem de partida em andamento (%s)", setup['stage'], extra={'guild_id': guild.id})
             except Exception as e:
-                print(f"❌ [Lobby] Erro ao restaurar fila do servidor {guild.id}: {e}")
+                logger.exception("Erro ao restaurar fila: %s", e, extra={'guild_id': guild.id})
 
     # --- EMBED DO LOBBY ---
     def get_queue_embed(self, locked=False, finished_match_id: int = 0):
@@ -472,22 +670,29 @@ class Lobby(commands.Cog):
                 if count == 0:
                     desc = "A fila está vazia."
                 else:
-                    lines = [f"`{i+1}.` **{p['name']}** ({p['mmr']}) - {p.get('main_lane','?').title()}" for i, p in enumerate(self.queue)]
-                    desc = "\n".join(lines)
+                    desc = "\n".join(self._queue_lines())
         else:
             color = 0x3498db
             title = f"🏆 Fila para Partida #1 ({count}/{limit})"
             if count == 0:
                 desc = "A fila está vazia."
             else:
-                lines = [f"`{i+1}.` **{p['name']}** ({p['mmr']}) - {p.get('main_lane','?').title()}" for i, p in enumerate(self.queue)]
-                desc = "\n".join(lines)
+                desc = "\n".join(self._queue_lines())
 
         embed = discord.Embed(title=title, description=desc, color=color)
         if finished_match_id == 0:
-            embed.set_footer(text="Clique para entrar • Requer registro (.registrar)")
+            if self.pool_mode:
+                embed.set_footer(text="Modo Pool • .montar escolhe os 10 mais equilibrados • ⭐ = prioridade")
+            else:
+                embed.set_footer(text="Clique para entrar • Requer registro (.registrar)")
         return embed
 
+    def _queue_lines(self) -> list:
+        return [
+            f"`{i+1}.` {'⭐ ' if p.get('priority') else ''}**{p['name']}** ({p['mmr']}) - {p.get('main_lane','?').title()}"
+            for i, p in enumerate(self.queue)
+        ]
+
     async def update_lobby_message(self, interaction: discord.Interaction = None, locked=False, finished_match_id: int = 0):
         if locked:
             self.lobby_locked = True
@@ -500,13 +705,24 @@ class Lobby(commands.Cog):
             if interaction and not interaction.response.is_done():
                 await interaction.response.edit_message(embed=embed, view=view)
             elif self.lobby_message:
-                await self.lobby_message.edit(embed=embed, view=view)
+                # Re-render do lobby é cosmético: não disputa com o resultado/criação de partida
+                with http_priority(Priority.LOW):
+                    await self.lobby_message.edit(embed=embed, view=view)
         except:
             pass
 
-    async def reset_lobby_state(self, finished_match_id: int = 0):
-        """Reinicia o estado da fila."""
-        self.queue = []
+    async def reset_lobby_state(self, finished_match_id: int = 0, clear_queue: bool = False, guild_id: int = None):
+        """
+        Reinicia o estado da fila.
+        No modo pool, após .montar a fila contém apenas o banco de espera (com prioridade),
+        que é mantido para a próxima partida, a menos que `clear_queue` seja True.
+        Com `guild_id`, descarta também a montagem de times em andamento do servidor.
+        """
+        if guild_id:
+            await SetupRepository.clear(guild_id)
+        if clear_queue or not self.pool_match_pending:
+            await self.queue_manager.clear()
+        self.pool_match_pending = False
         self.lobby_locked = False
 
         if finished_match_id > 0:
@@ -517,40 +733,70 @@ class Lobby(commands.Cog):
 
     # --- ENTRAR/SAIR DA FILA ---
     async def process_join(self, interaction: discord.Interaction):
-        if len(self.queue) >= self.QUEUE_LIMIT:
-            return await interaction.response.send_message("Fila cheia!", ephemeral=True)
         user = interaction.user
-        if any(p['id'] == user.id for p in self.queue):
+
+        # Checagens rápidas (revalidadas atomicamente dentro do QueueManager)
+        if self.queue_manager.is_full():
+            return await interaction.response.send_message("Fila cheia!", ephemeral=True)
+        if self.queue_manager.contains(user.id):
             return await interaction.response.send_message("Já está na fila.", ephemeral=True)
+
+        # Servido pelo cache de jogadores (fora da seção crítica)
         player = await PlayerRepository.get_player_by_discord_id(user.id)
         if not player:
             return await interaction.response.send_message("🛑 Use `.registrar` primeiro.", ephemeral=True)
 
-        self.queue.append({
+        entry = {
             'id': user.id,
             'name': user.display_name,
             'mmr': player.mmr,
-            'main_lane': player.main_lane.value if player.main_lane else "FILL"
-        })
+            'main_lane': player.main_lane.value if player.main_lane else "FILL",
+            'secondary_lane': player.secondary_lane.value if player.secondary_lane else None,
+            'rating': player.rating,
+            'streak': player.current_win_streak or 0
+        }
+
+        # Insere e persiste a fila no banco sob o lock do lobby
+        status = await self.queue_manager.join(entry, persist=self._queue_persister(interaction))
 
-        # Persiste a fila no banco
-        await LobbyRepository.save_state(interaction.guild.id, self.queue, interaction.channel.id)
+        if status == "FULL":
+            return await interaction.response.send_message("Fila cheia!", ephemeral=True)
+        if status == "ALREADY_IN":
+            return await interaction.response.send_message("Já está na fila.", ephemeral=True)
 
-        if len(self.queue) >= self.QUEUE_LIMIT:
+        if status == "FILLED" and self.pool_mode:
+            await self.update_lobby_message(interaction)
+            await self.start_pool_selection(interaction.channel, interaction.guild.id)
+        elif status == "FILLED":
             await self.update_lobby_message(interaction, locked=True)
             await self.prompt_game_mode(interaction.channel)
         else:
             await self.update_lobby_message(interaction)
 
     async def process_leave(self, interaction: discord.Interaction):
-        user = interaction.user
-        self.queue = [p for p in self.queue if p['id'] != user.id]
-        # Persiste a fila atualizada
-        await LobbyRepository.save_state(interaction.guild.id, self.queue, interaction.channel.id)
+        # Remove e persiste a fila atualizada sob o lock do lobby
+        await self.queue_manager.leave(interaction.user.id, persist=self._queue_persister(interaction))
         await self.update_lobby_message(interaction)
 
-    async def prompt_game_mode(self, channel):
-        players_snapshot = self.queue.copy()
+    def _queue_persister(self, interaction: discord.Interaction):
+        """Retorna a função que salva o snapshot da fila (executada pelo SnapshotWriter, fora do lock)."""
+        guild_id, channel_id = interaction.guild.id, interaction.channel.id
+
+        async def persist(queue_snapshot: list):
+            await LobbyRepository.save_state(guild_id, queue_snapshot, channel_id)
+
+        return persist
+
+    async def clear_persisted_queue(self, guild_id: int):
+        """Limpa a fila salva após criar a partida (no modo pool o banco de espera continua salvo)."""
+        if self.pool_match_pending:
+            return
+        # Um save ainda na fila do writer não pode recriar a fila depois da limpeza
+        await self.queue_manager.flush()
+        await LobbyRepository.clear_state(guild_id)
+
+    async def prompt_game_mode(self, channel, players: list = None, bench: list = None):
+        players_snapshot = players if players is not None else self.queue.copy()
         player_names = ", ".join([f"**{p['name']}**" for p in players_snapshot])
         embed = discord.Embed(
             title=f"⚡ Painel de Controle | Partida #{self.current_match_id}",
@@ -558,9 +804,35 @@ class Lobby(commands.Cog):
             color=0xffd700
         )
         embed.add_field(name="Jogadores", value=player_names, inline=False)
+        if bench:
+            bench_names = ", ".join([f"**{p['name']}**" for p in bench])
+            embed.add_field(name="⭐ Prioridade na próxima", value=bench_names, inline=False)
         view = ModeSelectView(self, players_snapshot)
         await channel.send(content="||@here|| 🔔 **Lobby Pronto!**", embed=embed, view=view)
 
+    # --- MODO POOL ---
+    async def start_pool_selection(self, channel, guild_id: int):
+        """
+        Seleciona os 10 jogadores da fila que geram a partida mais justa (MMR, dispersão e rotas).
+        Quem fica de fora permanece na fila com prioridade para a próxima partida.
+        """
+        selector = PoolSelector(LaneAwareObjective(), match_size=self.MATCH_SIZE)
+
+        def choose(players):
+            selected, bench = selector.select(players)
+            selected = [{k: v for k, v in p.items() if k != 'priority'} for p in selected]
+            bench = [dict(p, priority=True) for p in bench]
+            return selected, bench
+
+        async def persist(queue_snapshot: list):
+            await LobbyRepository.save_state(guild_id, queue_snapshot, channel.id)
+
+        selected = await self.queue_manager.extract(choose, persist=persist)
+        self.pool_match_pending = True
+
+        await self.update_lobby_message(locked=True)
+        await self.prompt_game_mode(channel, selected, self.queue_manager.snapshot())
+
     # --- MODOS DE CRIAÇÃO DE TIMES ---
     async def start_match_balanced(self, interaction, players):
         all_participants = players.copy()
@@ -568,23 +840,13 @@ class Lobby(commands.Cog):
             for i in range(10 - len(all_participants)):
                 all_participants.append({'id': -1*(i+500), 'name': f'Bot Bal {i}', 'mmr': random.randint(800, 1500), 'main_lane': 'FILL'})
 
-        team_blue, team_red = MatchMaker.balance_teams(all_participants)
-
-        real_blue = [p for p in team_blue if p['id'] > 0]
-        real_red = [p for p in team_red if p['id'] > 0]
-
-        cap_blue = max(real_blue, key=lambda x: x['mmr']) if real_blue else team_blue[0]
-        cap_red = max(real_red, key=lambda x: x['mmr']) if real_red else team_red[0]
+        # Top 3 divisões mais justas (MMR + rotas): o admin pode alternar entre elas antes da escolha de lado
+        options = MatchMaker.balance_options(all_participants, top_k=3, objective=LaneAwareObjective())
 
-        if random.choice([True, False]):
-            win, lose, w_team, l_team = cap_blue, cap_red, team_blue, team_red
-        else:
-            win, lose, w_team, l_team = cap_red, cap_blue, team_red, team_blue
-
-        embed = discord.Embed(title="⚖️ Times Balanceados! (Sorteio)", color=0xff9900)
-        embed.description = f"**{win['name']}** venceu o cara-ou-coroa e escolhe o **LADO**."
-        view = BalancedSideSelectView(self, interaction.guild.id, win, w_team, lose, l_team)
-        await interaction.followup.send(embed=embed, view=view)
+        state = {'options': options, 'first_team_wins_coinflip': random.choice([True, False]), 'option_index': 0}
+        async with self.setup_lock:
+            await self.send_setup_stage(interaction, BalancedSideSelectView.STAGE, state,
+                                        embed=BalancedSideSelectView.get_embed(state), view=BalancedSideSelectView(self, state))
 
     async def setup_captains_phase(self, interaction, players, mode="mmr"):
         all_participants = players.copy()
@@ -627,180 +889,220 @@ class Lobby(commands.Cog):
         embed.description = f"**{cap_priority['name']}** tem prioridade de Pick (First Pick).\n**{cap_secondary['name']}** escolhe o **Lado**."
         embed.set_footer(text=f"Aguardando {cap_secondary['name']} escolher o lado...")
 
-        view = SideSelectView(self, cap_priority, cap_secondary, pool)
+        state = {'cap_priority': cap_priority, 'cap_secondary': cap_secondary, 'pool': pool}
+        async with self.setup_lock:
+            await self.send_setup_stage(interaction, SideSelectView.STAGE, state, embed=embed, view=SideSelectView(self))
 
+    # --- MONTAGEM DE TIMES (estado no banco) ---
+    async def send_setup_stage(self, interaction: discord.Interaction, stage: str, state: dict, embed, view):
+        """Envia a mensagem da etapa e grava o estado junto com o id dela (chamar com setup_lock)."""
         if interaction.response.is_done():
-            sent_message = await interaction.followup.send(embed=embed, view=view)
+            message_id = (await interaction.followup.send(embed=embed, view=view)).id
         else:
-            sent_message = await interaction.response.send_message(embed=embed, view=view)
+            message_id = (await interaction.response.send_message(embed=embed, view=view)).message_id
+        await SetupRepository.save(interaction.guild.id, stage, state, interaction.channel.id, message_id)
 
-        view.message = sent_message
+    async def load_setup(self, interaction: discord.Interaction, stage: str):
+        """
+        Estado da etapa para um clique nas views de montagem, ou None (já respondido) se a
+        mensagem não for a da etapa atual — ex.: botões de um draft já cancelado.
+        """
+        setup = await SetupRepository.get(interaction.guild.id)
+        if not setup or setup['stage'] != stage or setup['message_id'] != interaction.message.id:
+            await interaction.response.send_message("⌛ Esta etapa não está mais ativa.", ephemeral=True)
+            return None
+        return setup['state']
 
     # --- MVP / iMVP ---
+    def _poll_embed(self, match_id: int, poll_type: str, winner_side: str, team: list, footer: str) -> discord.Embed:
+        loser_side = 'BLUE' if winner_side == 'RED' else 'RED'
+        side = winner_side if poll_type == 'mvp' else loser_side
+        players_list = "\n".join(f"{self.VOTE_EMOJIS[i]} {p['name']} ({p['mmr']})" for i, p in enumerate(team))
+        if poll_type == 'mvp':
+            title = f"⭐ ENQUETE MVP | Partida #{match_id} (Time {side})"
+            desc = "**Vote no Jogador Mais Valioso (MVP)** do time vencedor:\n\n"
+        else:
+            title = f"👎 ENQUETE iMVP | Partida #{match_id} (Time {side})"
+            desc = "**Vote no Jogador Inverso (iMVP)** do time perdedor:\n\n"
+        embed = discord.Embed(title=title, description=desc + players_list,
+                              color=0x3498db if side == 'BLUE' else 0xe74c3c)
+        embed.set_footer(text=footer)
+        return embed
+
+    def _register_poll(self, payload: dict, votes: list = ()):
+        """Abre a apuração em memória de uma enquete (payload da tarefa do agendador)."""
+        match_id = payload['match_id']
+        teams = {'mvp': payload['winning_team'], 'imvp': payload['losing_team']}
+        poll = {
+            'payload': payload,
+            'teams': teams,
+            'tallies': {poll_type: PollTally([p['id'] for p in team]) for poll_type, team in teams.items()},
+            'views': {poll_type: PollView(self, match_id, poll_type, team) for poll_type, team in teams.items()},
+        }
+        for vote_match_id, poll_type, voter_id, candidate_id in votes:
+            if vote_match_id == match_id and candidate_id in poll['tallies'][poll_type].counts:
+                poll['tallies'][poll_type].cast(voter_id, candidate_id)
+
+        self.polls[match_id] = poll
+        return poll
+
+    def _close_poll(self, match_id: int):
+        poll = self.polls.pop(match_id, None)
+        if poll:
+            for view in poll['views'].values():
+                view.stop()
+
     async def _start_mvp_polls(self, channel: discord.TextChannel, match_id: int, winner_side: str, match_details: dict):
         if winner_side == 'BLUE':
             winning_team = match_details['blue_team']
             losing_team = match_details['red_team']
-            winning_color = 0x3498db
-            losing_color = 0xe74c3c
         else:
             winning_team = match_details['red_team']
             losing_team = match_details['blue_team']
-            winning_color = 0xe74c3c
-            losing_color = 0x3498db
 
         real_winning_team = [p for p in winning_team if p['id'] > 0]
         real_losing_team = [p for p in losing_team if p['id'] > 0]
 
-        if not real_winning_team or not real_losing_team:
+        if not real_winning_team or not real_losing_team or match_id in self.polls:
             return
 
-        loser_side = 'BLUE' if winner_side == 'RED' else 'RED'
-
-        mvp_desc = "**Vote no Jogador Mais Valioso (MVP)** do time vencedor:\n\n"
-        mvp_players_list = [f"{self.VOTE_EMOJIS[i]} {p['name']} ({p['mmr']})" for i, p in enumerate(real_winning_team)]
-        mvp_embed = discord.Embed(
-            title=f"⭐ ENQUETE MVP | Partida #{match_id} (Time {winner_side})",
-            description=mvp_desc + "\n".join(mvp_players_list),
-            color=winning_color
-        )
-        mvp_embed.set_footer(text="A votação dura 30 minutos.")
-        mvp_message = await channel.send(content="||@here||", embed=mvp_embed)
-        for i in range(len(real_winning_team)):
-            await mvp_message.add_reaction(self.VOTE_EMOJIS[i])
-
-        imvp_desc = "**Vote no Jogador Inverso (iMVP)** do time perdedor:\n\n"
-        imvp_players_list = [f"{self.VOTE_EMOJIS[i]} {p['name']} ({p['mmr']})" for i, p in enumerate(real_losing_team)]
-        imvp_embed = discord.Embed(
-            title=f"👎 ENQUETE iMVP | Partida #{match_id} (Time {loser_side})",
-            description=imvp_desc + "\n".join(imvp_players_list),
-            color=losing_color
+        payload = {
+            'channel_id': channel.id, 'match_id': match_id, 'winner_side': winner_side,
+            'winning_team': real_winning_team, 'losing_team': real_losing_team,
+        }
+        # Os botões já funcionam no instante em que a mensagem aparece (sem reações a adicionar)
+        poll = self._register_poll(payload)
+        footer = f"A votação dura {self.POLL_DURATION_MINUTES} minutos. Um voto por pessoa (clique de novo para retirar)."
+        try:
+            mvp_message = await channel.send(
+                content="||@here||", embed=self._poll_embed(match_id, 'mvp', winner_side, real_winning_team, footer),
+                view=poll['views']['mvp']
+            )
+            imvp_message = await channel.send(
+                embed=self._poll_embed(match_id, 'imvp', winner_side, real_losing_team, footer),
+                view=poll['views']['imvp']
+            )
+        except Exception:
+            self._close_poll(match_id)
+            raise
+
+        payload['mvp_msg_id'] = mvp_message.id
+        payload['imvp_msg_id'] = imvp_message.id
+        await scheduler.schedule(
+            "mvp_poll", f"mvp_poll:{match_id}",
+            datetime.utcnow() + timedelta(minutes=self.POLL_DURATION_MINUTES),
+            payload
         )
-        imvp_embed.set_footer(text="A votação dura 30 minutos.")
-        imvp_message = await channel.send(embed=imvp_embed)
-        for i in range(len(real_losing_team)):
-            await imvp_message.add_reaction(self.VOTE_EMOJIS[i])
-
-        self.bot.loop.create_task(self._finalize_poll_after_delay(
-            channel, match_id,
-            mvp_message.id, imvp_message.id,
-            real_winning_team, real_losing_team
-        ))
-
-    async def _calculate_poll_result(self, message: discord.Message, team: list) -> tuple:
+
+    async def cast_poll_vote(self, interaction: discord.Interaction, match_id: int, poll_type: str, candidate_id: int):
+        """Callback dos botões da enquete: um voto por usuário, guardado no servidor."""
+        poll = self.polls.get(match_id)
+        if not poll:
+            return await interaction.response.send_message("🔒 Esta votação já foi encerrada.", ephemeral=True)
+        if interaction.user.bot:
+            return await interaction.response.send_message("🤖 Bots não votam.", ephemeral=True)
+
+        tally = poll['tallies'][poll_type]
+        names = {p['id']: p['name'] for p in poll['teams'][poll_type]}
+        voter_id = interaction.user.id
+
+        async with self.vote_lock:
+            if tally.votes.get(voter_id) == candidate_id:
+                tally.retract(voter_id, candidate_id)
+                await PollRepository.set_vote(match_id, poll_type, voter_id, None)
+                message = f"↩️ Voto em **{names[candidate_id]}** retirado."
+            else:
+                previous = tally.cast(voter_id, candidate_id)
+                await PollRepository.set_vote(match_id, poll_type, voter_id, candidate_id)
+                moved = f" (antes: {names[previous]})" if previous is not None else ""
+                message = f"✅ Voto registrado em **{names[candidate_id]}**{moved}."
+
+        await interaction.response.send_message(message, ephemeral=True)
+
+    def _poll_result(self, tally: PollTally, team: list) -> tuple:
         """
-        Conta votos reais (exclui bots) usando iteração assíncrona sobre usuários.
+        Resultado a partir da apuração em memória (sem chamadas à API).
         Retorna (texto_resultado: str, winner_ids: list[int]) onde winner_ids são
         os discord_ids dos vencedores (pode ser empate com mais de um).
         """
-        # Re-busca a mensagem para ter as reações atualizadas
-        try:
-            message = await message.channel.fetch_message(message.id)
-        except:
-            pass
-
-        max_votes = -1
-        winner_names = "Ninguém votou!"
-        winner_ids = []
-
-        for reaction in message.reactions:
-            try:
-                emoji_index = self.VOTE_EMOJIS.index(str(reaction.emoji))
-            except ValueError:
-                continue
-
-            if emoji_index >= len(team):
-                continue
-
-            # Conta apenas usuários não-bot
-            vote_count = 0
-            async for user in reaction.users():
-                if not user.bot:
-                    vote_count += 1
-
-            player = team[emoji_index]
-            player_name = player['name']
-
-            if vote_count > max_votes:
-                max_votes = vote_count
-                winner_names = f"**{player_name}** com {vote_count} voto(s)."
-                winner_ids = [player['id']]
-            elif vote_count == max_votes and max_votes > 0:
-                winner_names += f" e **{player_name}** (Empate)"
-                winner_ids.append(player['id'])
-
-        if max_votes <= 0:
+        votes, winner_ids = tally.leaders()
+        if not winner_ids:
             return "Ninguém votou!", []
-        return winner_names, winner_ids
-
-    async def _finalize_poll_after_delay(self, channel, match_id, mvp_msg_id, imvp_msg_id, winning_team, losing_team, delay_minutes=30):
-        await asyncio.sleep(delay_minutes * 60)
-        try:
-            mvp_msg = await channel.fetch_message(mvp_msg_id)
-            imvp_msg = await channel.fetch_message(imvp_msg_id)
-
-            mvp_result, mvp_ids = await self._calculate_poll_result(mvp_msg, winning_team)
-            imvp_result, imvp_ids = await self._calculate_poll_result(imvp_msg, losing_team)
-
-            # Salva MVP/iMVP no banco (apenas o primeiro em caso de empate)
-            for pid in mvp_ids[:1]:
-                if pid > 0:
-                    await PlayerRepository.increment_mvp(pid)
-            for pid in imvp_ids[:1]:
-                if pid > 0:
-                    await PlayerRepository.increment_imvp(pid)
-
-            final_embed = discord.Embed(
-                title=f"🗳️ RESULTADO FINAL | Partida #{match_id}",
-                description=f"Votação encerrada após **{delay_minutes} minutos**.",
-                color=0x2ecc71
-            )
-            final_embed.add_field(name="🏆 MVP do Time Vencedor", value=mvp_result, inline=False)
-            final_embed.add_field(name="💀 iMVP do Time Perdedor", value=imvp_result, inline=False)
-            await channel.send(embed=final_embed)
-
-            await mvp_msg.edit(embed=mvp_msg.embeds[0].set_footer(text="Votação ENCERRADA."), view=None)
-            await imvp_msg.edit(embed=imvp_msg.embeds[0].set_footer(text="Votação ENCERRADA."), view=None)
+        names = {p['id']: p['name'] for p in team}
+        text = f"**{names[winner_ids[0]]}** com {votes} voto(s)."
+        for pid in winner_ids[1:]:
+            text += f" e **{names[pid]}** (Empate)"
+        return text, winner_ids
+
+    async def _finalize_poll_job(self, payload: dict):
+        """Handler do agendador: encerra as enquetes de uma partida (pode rodar mais de uma vez)."""
+        poll = self.polls.get(payload['match_id'])
+        if poll is None:
+            votes = await PollRepository.get_votes([payload['match_id']])
+            poll = self._register_poll(payload, votes)
+
+        channel = self.bot.get_channel(payload['channel_id'])
+        if channel is None:
+            try:
+                channel = await self.bot.fetch_channel(payload['channel_id'])
+            except (discord.NotFound, discord.Forbidden):
+                logger.warning("Canal da enquete #%s não existe mais", payload['match_id'])
+                channel = None
+        await self._finalize_poll(channel, poll)
 
-        except discord.NotFound:
-            await channel.send(f"❌ Mensagens da enquete da Partida #{match_id} não encontradas.")
-        except Exception as e:
-            print(f"Erro ao finalizar enquete #{match_id}: {e}")
-
-    # --- ATUALIZAÇÃO DE MMR PÓS-PARTIDA ---
-    async def _update_players_mmr_after_match(self, match_details: dict):
-        """Recalcula e atualiza o MMR de todos os participantes com base no rank cached."""
-        all_players = match_details['blue_team'] + match_details['red_team']
-        updated = 0
-        for player_data in all_players:
-            if player_data['id'] <= 0:
-                continue
-            player = await PlayerRepository.get_player_by_discord_id(player_data['id'])
-            if not player:
-                continue
-
-            # Prioriza SoloQ, fallback Flex
-            if player.solo_tier and player.solo_tier.upper() not in ('UNRANKED', ''):
-                new_mmr = MatchMaker.calculate_adjusted_mmr(
-                    player.solo_tier, player.solo_rank, player.solo_lp,
-                    player.solo_wins, player.solo_losses, 'RANKED_SOLO_5x5'
-                )
-            elif player.flex_tier and player.flex_tier.upper() not in ('UNRANKED', ''):
-                new_mmr = MatchMaker.calculate_adjusted_mmr(
-                    player.flex_tier, player.flex_rank, player.flex_lp,
-                    player.flex_wins, player.flex_losses, 'RANKED_FLEX_SR'
-                )
-            else:
-                continue
+    async def _finalize_poll(self, channel, poll: dict):
+        """
+        Apura e anuncia o resultado. Idempotente: record_awards encerra a votação uma
+        única vez e, se ela já estava encerrada, nada é anunciado de novo.
+        Erros transitórios sobem para o agendador tentar outra vez.
+        """
+        payload = poll['payload']
+        match_id = payload['match_id']
+        mvp_result, mvp_ids = self._poll_result(poll['tallies']['mvp'], poll['teams']['mvp'])
+        imvp_result, imvp_ids = self._poll_result(poll['tallies']['imvp'], poll['teams']['imvp'])
+
+        # Salva MVP/iMVP no banco (apenas o primeiro em caso de empate)
+        closed_now = await MatchRepository.record_awards(
+            match_id, mvp_ids[0] if mvp_ids else None, imvp_ids[0] if imvp_ids else None
+        )
+        self._close_poll(match_id)
+        if not closed_now or channel is None:
+            return
 
-            await PlayerRepository.update_mmr_direct(player_data['id'], new_mmr)
-            updated += 1
+        final_embed = discord.Embed(
+            title=f"🗳️ RESULTADO FINAL | Partida #{match_id}",
+            description=f"Votação encerrada após **{self.POLL_DURATION_MINUTES} minutos**.",
+            color=0x2ecc71
+        )
+        final_embed.add_field(name="🏆 MVP do Time Vencedor", value=mvp_result, inline=False)
+        final_embed.add_field(name="💀 iMVP do Time Perdedor", value=imvp_result, inline=False)
+        await channel.send(embed=final_embed)
 
-        print(f"[Lobby] MMR atualizado para {updated} jogador(es) após resultado.")
+        winner_side = payload.get('winner_side', 'BLUE')
+        for poll_type in ('mvp', 'imvp'):
+            embed = self._poll_embed(match_id, poll_type, winner_side, poll['teams'][poll_type], "Votação ENCERRADA.")
+            try:
+                await channel.get_partial_message(payload[f'{poll_type}_msg_id']).edit(embed=embed, view=None)
+            except discord.NotFound:
+                pass
+
+    @commands.command(name="votos", aliases=["parcial"])
+    async def votos(self, ctx, match_id: int):
+        """Parcial da votação MVP/iMVP de uma partida (apuração em memória)."""
+        poll = self.polls.get(match_id)
+        if not poll:
+            return await ctx.reply(f"❌ Não há votação aberta para a Partida #{match_id}.")
+
+        embed = discord.Embed(title=f"🗳️ Parcial | Partida #{match_id}", color=0xf1c40f)
+        for poll_type, label in (('mvp', "⭐ MVP"), ('imvp', "👎 iMVP")):
+            tally = poll['tallies'][poll_type]
+            lines = [f"{p['name']} — **{tally.counts[p['id']]}**" for p in poll['teams'][poll_type]]
+            embed.add_field(name=f"{label} ({len(tally.votes)} voto(s))", value="\n".join(lines), inline=True)
+        await ctx.reply(embed=embed)
 
     # --- CARGOS ---
     async def _assign_match_roles(self, guild: discord.Guild, match_details: dict, winner_side: str):
-        """Remove cargos anteriores dos 10 jogadores e reatribui conforme resultado.
+        """Troca os cargos de vencedor/perdedor dos 10 jogadores (uma edição por membro, em paralelo).
         Retorna (winner_role, loser_role, winner_members, loser_members)."""
         winner_role_id, loser_role_id = await GuildRepository.get_match_roles(guild.id)
         if not winner_role_id and not loser_role_id:
@@ -811,54 +1113,50 @@ class Lobby(commands.Cog):
 
         winning_team = match_details['blue_team'] if winner_side == 'BLUE' else match_details['red_team']
         losing_team  = match_details['red_team']  if winner_side == 'BLUE' else match_details['blue_team']
+        winner_ids = {p['id'] for p in winning_team}
 
-        all_players = winning_team + losing_team
-        roles_to_clear = [r for r in (winner_role, loser_role) if r]
-
-        winner_members = []
-        loser_members  = []
-
-        for p in all_players:
+        assignments = {}
+        for p in winning_team + losing_team:
             member = guild.get_member(p['id'])
-            if not member:
-                continue
-            try:
-                if roles_to_clear:
-                    await member.remove_roles(*roles_to_clear, reason="Liga Interna — resultado da partida")
-                if p in winning_team and winner_role:
-                    await member.add_roles(winner_role, reason="Liga Interna — vencedor")
-                    winner_members.append(member)
-                elif p in losing_team and loser_role:
-                    await member.add_roles(loser_role, reason="Liga Interna — perdedor")
-                    loser_members.append(member)
-            except discord.Forbidden:
-                print(f"[Roles] Sem permissão para atribuir cargo a {p['name']}")
-            except Exception as e:
-                print(f"[Roles] Erro ao atribuir cargo a {p['name']}: {e}")
+            if member:
+                assignments[member] = winner_role if p['id'] in winner_ids else loser_role
+
+        sync = RoleSync([winner_role, loser_role])
+        reason = "Liga Interna — resultado da partida"
+        ok, failed = await sync.apply(assignments, reason=reason)
+        # RoleSync.apply não levanta: as falhas voltam em `failed`. Repete só os membros que
+        # falharam por erro transitório; sem permissão (Forbidden) não adianta tentar de novo.
+        for attempt in range(ROLE_SYNC_RETRIES):
+            retry = [member for member, error in failed if not isinstance(error, discord.Forbidden)]
+            if not retry:
+                break
+            await asyncio.sleep(attempt + 1)
+            retried_ok, retried_failed = await sync.apply({m: assignments[m] for m in retry}, reason=reason)
+            ok += retried_ok
+            failed = [(m, e) for m, e in failed if isinstance(e, discord.Forbidden)] + retried_failed
+        for member, error in failed:
+            if isinstance(error, discord.Forbidden):
+                logger.warning("Sem permissão para atribuir cargo a %s", member.display_name)
+            else:
+                logger.warning("Erro ao atribuir cargo a %s: %s", member.display_name, error)
+
+        winner_members = [m for m in ok if winner_role and m.id in winner_ids]
+        loser_members  = [m for m in ok if loser_role and m.id not in winner_ids]
 
-        print(f"[Roles] Cargos atualizados para {len(all_players)} jogador(es).")
+        logger.info("Cargos atualizados para %s jogador(es)", len(ok), extra={'failed': len(failed)})
         return winner_role, loser_role, winner_members, loser_members
 
     # --- STREAKS ---
-    async def _update_and_announce_streaks(self, channel: discord.TextChannel, match_details: dict, winner_side: str):
-        """Atualiza streaks e anuncia marcos alcançados."""
+    async def _announce_streaks(self, channel: discord.TextChannel, match_details: dict, winner_side: str, streaks: dict):
+        """Anuncia marcos de sequência (as sequências já foram gravadas pelo finish_match)."""
         winning_team = match_details['blue_team'] if winner_side == 'BLUE' else match_details['red_team']
-        losing_team = match_details['red_team'] if winner_side == 'BLUE' else match_details['blue_team']
 
         announcements = []
-
         for p in winning_team:
-            if p['id'] <= 0:
-                continue
-            streak, best = await PlayerRepository.update_streak(p['id'], won=True)
-            if streak in STREAK_MILESTONES:
+            streak = streaks.get(p['id'], 0)
+            if p['id'] > 0 and streak in STREAK_MILESTONES:
                 announcements.append((p['name'], streak, True))
 
-        for p in losing_team:
-            if p['id'] <= 0:
-                continue
-            await PlayerRepository.update_streak(p['id'], won=False)
-
         if announcements:
             for name, streak, is_win in announcements:
                 if streak >= 10:
@@ -874,6 +1172,16 @@ class Lobby(commands.Cog):
                 embed.set_footer(text=f"Use .perfil para ver o histórico de conquistas")
                 await channel.send(embed=embed)
 
+    async def _announce_match_roles(self, channel: discord.TextChannel, match_details: dict, winner_side: str):
+        """Atribui cargos de vencedor/perdedor e anuncia."""
+        winner_role, loser_role, winner_members, loser_members = await self._assign_match_roles(channel.guild, match_details, winner_side)
+        if winner_members and winner_role:
+            mentions = " ".join(m.mention for m in winner_members)
+            await channel.send(f"🏆 {mentions} agora vocês são {winner_role.mention}!")
+        if loser_members and loser_role:
+            mentions = " ".join(m.mention for m in loser_members)
+            await channel.send(f"💀 {mentions} agora vocês são {loser_role.mention}!")
+
     # --- COMANDOS ---
     @commands.command(name="fila")
     async def fila(self, ctx):
@@ -894,14 +1202,76 @@ class Lobby(commands.Cog):
         view = LobbyView(self)
         self.lobby_message = await ctx.send(embed=embed, view=view)
 
-        # Persiste canal da fila
+        # Persiste canal da fila (depois dos saves pendentes do writer, para não ser sobrescrito)
+        await self.queue_manager.flush()
         await LobbyRepository.save_state(ctx.guild.id, self.queue, ctx.channel.id)
 
+    @commands.command(name="modo_pool", aliases=["pool"])
+    async def modo_pool(self, ctx, limite: int = None):
+        """Liga/desliga o modo pool (fila de 12–20 jogadores; os 10 mais equilibrados jogam)."""
+        if not ctx.author.guild_permissions.administrator:
+            return await ctx.reply("⛔ Apenas Administradores.")
+        if self.lobby_locked:
+            return await ctx.reply("⚠️ Um lobby já está sendo configurado. Aguarde ou cancele o atual.")
+
+        if self.pool_mode and limite is None:
+            if len(self.queue) > self.MATCH_SIZE:
+                return await ctx.reply(f"⚠️ A fila tem {len(self.queue)} jogadores. Use `.montar` ou reduza para {self.MATCH_SIZE} antes de desligar o modo pool.")
+            self.pool_mode = False
+            self.QUEUE_LIMIT = self.MATCH_SIZE
+            await ctx.reply(f"✅ Modo pool **desligado**. Limite: **{self.QUEUE_LIMIT}**.")
+        else:
+            limite = limite or self.POOL_LIMIT
+            if not (self.MATCH_SIZE + 2 <= limite <= self.POOL_LIMIT):
+                return await ctx.reply(f"❌ O limite do pool deve ficar entre {self.MATCH_SIZE + 2} e {self.POOL_LIMIT}.")
+            self.pool_mode = True
+            self.QUEUE_LIMIT = limite
+            await ctx.reply(f"✅ Modo pool **ligado**. Limite: **{limite}**. Use `.montar` para escolher os 10 mais equilibrados.")
+
+        await self.update_lobby_message()
+
+    @commands.command(name="montar")
+    async def montar(self, ctx):
+        """Modo pool: escolhe os 10 jogadores da fila que geram a partida mais justa."""
+        if not ctx.author.guild_permissions.administrator:
+            return await ctx.reply("⛔ Apenas Administradores.")
+        if not self.pool_mode:
+            return await ctx.reply("❌ O modo pool está desligado. Use `.modo_pool`.")
+        if self.lobby_locked:
+            return await ctx.reply("⚠️ Um lobby já está sendo configurado. Aguarde ou cancele o atual.")
+        if len(self.queue) < self.MATCH_SIZE:
+            return await ctx.reply(f"❌ São necessários pelo menos {self.MATCH_SIZE} jogadores na fila ({len(self.queue)}/{self.MATCH_SIZE}).")
+
+        await self.start_pool_selection(ctx.channel, ctx.guild.id)
+
+    @commands.command(name="draft", aliases=["retomar_draft"])
+    async def retomar_draft(self, ctx):
+        """Reposta o draft em andamento (ex.: mensagem apagada ou perdida no chat) a partir do banco."""
+        if not ctx.author.guild_permissions.administrator:
+            return await ctx.reply("⛔ Apenas Administradores.")
+
+        async with self.setup_lock:
+            setup = await SetupRepository.get(ctx.guild.id)
+            draft = await DraftRepository.get(ctx.guild.id) if setup and setup['stage'] == DraftView.STAGE else None
+            if draft is None:
+                return await ctx.reply("❌ Nenhum draft em andamento.")
+
+            # A mensagem antiga deixa de ser a etapa atual; tira os componentes dela
+            old_channel = self.bot.get_channel(setup['channel_id']) if setup['channel_id'] else None
+            if old_channel and setup['message_id']:
+                try: await old_channel.get_partial_message(setup['message_id']).edit(view=None)
+                except discord.HTTPException: pass
+
+            message = await ctx.send(embed=DraftView.get_embed(draft), view=DraftView(self, draft))
+            await SetupRepository.save(ctx.guild.id, DraftView.STAGE, {}, ctx.channel.id, message.id)
+
     @commands.command(name="resetar")
     async def resetar(self, ctx):
         if not ctx.author.guild_permissions.administrator:
             return await ctx.reply("⛔ Apenas Administradores.")
 
+        self.pool_mode = False
+
         if self.QUEUE_LIMIT == 10:
             self.QUEUE_LIMIT = self.DEBUG_QUEUE_LIMIT
             await ctx.reply(f"✅ Modo DEBUG ativado. Limite: **{self.QUEUE_LIMIT}**.")
@@ -909,7 +1279,7 @@ class Lobby(commands.Cog):
             self.QUEUE_LIMIT = 10
             await ctx.reply(f"✅ Modo PRODUÇÃO ativado. Limite: **{self.QUEUE_LIMIT}**.")
 
-        await self.reset_lobby_state()
+        await self.reset_lobby_state(clear_queue=True, guild_id=ctx.guild.id)
 
     @commands.command(name="resultado")
     async def resultado(self, ctx, match_id: int = None, winner: str = None):
@@ -928,7 +1298,8 @@ class Lobby(commands.Cog):
         if not match_details:
             return await ctx.reply(f"❌ Partida #{match_id} não encontrada ou já finalizada/anulada.")
 
-        status = await MatchRepository.finish_match(match_id, winner)
+        # 1. Commit: V/D, sequências, MMR, rating, duplas e temporada numa única transação
+        status, streaks = await MatchRepository.finish_match(match_id, winner)
 
         if status == "SUCCESS":
             embed = discord.Embed(
@@ -936,28 +1307,20 @@ class Lobby(commands.Cog):
                 description=f"Vencedor: **TIME {winner}**",
                 color=0x2ecc71
             )
-            await ctx.reply(embed=embed)
-
-            # 1. Atualiza MMR de todos os participantes
-            await self._update_players_mmr_after_match(match_details)
-
-            # 2. Atualiza e anuncia streaks
-            await self._update_and_announce_streaks(ctx.channel, match_details, winner)
-
-            # 3. Atribui cargos de vencedor/perdedor e anuncia
-            winner_role, loser_role, winner_members, loser_members = await self._assign_match_roles(ctx.guild, match_details, winner)
-            if winner_members and winner_role:
-                mentions = " ".join(m.mention for m in winner_members)
-                await ctx.channel.send(f"🏆 {mentions} agora vocês são {winner_role.mention}!")
-            if loser_members and loser_role:
-                mentions = " ".join(m.mention for m in loser_members)
-                await ctx.channel.send(f"💀 {mentions} agora vocês são {loser_role.mention}!")
-
-            # 4. Inicia votações MVP/iMVP
-            await self._start_mvp_polls(ctx.channel, match_id, winner, match_details)
-
-            # 5. Reseta o lobby
-            await self.reset_lobby_state(match_id)
+            with http_priority(Priority.CRITICAL):
+                await ctx.reply(embed=embed)
+
+            # 2. Efeitos independentes em paralelo (cada um com retry próprio)
+            channel = ctx.channel
+            await self.post_match.run([
+                Stage("reset", lambda: self.reset_lobby_state(match_id), retries=1),
+                Stage("streaks", lambda: self._announce_streaks(channel, match_details, winner, streaks), retries=0),
+                # A sincronização de cargos repete sozinha os membros que falharam; repetir a etapa
+                # inteira postaria o anúncio de novo
+                Stage("cargos", lambda: self._announce_match_roles(channel, match_details, winner), retries=0),
+                # Enquetes não repetem: uma nova tentativa postaria mensagens duplicadas
+                Stage("enquetes", lambda: self._start_mvp_polls(channel, match_id, winner, match_details), retries=0),
+            ])
 
         elif status == "ALREADY_FINISHED":
             await ctx.reply(f"🔒 Partida #{match_id} já foi finalizada.")
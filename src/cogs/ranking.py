@@ -1,12 +1,16 @@
 import discord
 import asyncio
+import logging
 import urllib.parse
+from datetime import datetime
 from discord.ext import commands
-from src.database.repositories import PlayerRepository, MatchRepository
+from src.database.repositories import PlayerRepository, MatchRepository, SeasonRepository
 from src.services.riot_api import RiotAPI
 from src.services.matchmaker import MatchMaker
 from src.utils.views import BaseInteractiveView
 
+logger = logging.getLogger("ranking")
+
 
 # --- VIEW DE PAGINAÇÃO ---
 class RankingPaginationView(BaseInteractiveView):
@@ -86,45 +90,56 @@ class RankingPaginationView(BaseInteractiveView):
 
 
 class HistoryPaginationView(BaseInteractiveView):
+    """
+    Histórico interno paginado sob demanda: guarda só a página atual e os cursores
+    (finished_at, match_id) de cada página visitada; os totais vêm do Player.
+    """
     PER_PAGE = 10
 
-    def __init__(self, history: list, player_name: str, ctx):
+    def __init__(self, player_id: int, player_name: str, ctx, total_wins: int, total_losses: int,
+                 first_page: list, next_cursor: tuple):
         super().__init__(timeout=120)
-        self.history = history
+        self.player_id = player_id
         self.player_name = player_name
         self.ctx = ctx
         self.current_page = 0
-        self.total_pages = max(1, (len(history) + self.PER_PAGE - 1) // self.PER_PAGE)
-        self.total_wins = sum(1 for h in history if h['won'] is True)
-        self.total_losses = sum(1 for h in history if h['won'] is False)
+        self.total_wins = total_wins
+        self.total_losses = total_losses
+        self.total = total_wins + total_losses
+        self.total_pages = max(1, (self.total + self.PER_PAGE - 1) // self.PER_PAGE)
+        self.page = first_page
+        self.cursors = [None]          # cursor de entrada de cada página visitada
+        self.next_cursor = next_cursor
         self.update_buttons()
 
     def update_buttons(self):
         self.prev_button.disabled = (self.current_page == 0)
-        self.next_button.disabled = (self.current_page == self.total_pages - 1)
-        self.counter_button.label = f"{self.current_page + 1}/{self.total_pages}"
-        if self.total_pages == 1:
-            self.prev_button.disabled = True
-            self.next_button.disabled = True
+        self.next_button.disabled = self.next_cursor is None
+        self.counter_button.label = f"{self.current_page + 1}/{max(self.total_pages, self.current_page + 1)}"
+
+    async def load_page(self, page: int):
+        if page == len(self.cursors):
+            self.cursors.append(self.next_cursor)
+        self.page, self.next_cursor = await MatchRepository.get_player_history_page(
+            self.player_id, before=self.cursors[page], limit=self.PER_PAGE
+        )
+        self.current_page = page
+        self.update_buttons()
 
     def create_embed(self):
-        total = len(self.history)
-        wr = (self.total_wins / total * 100) if total > 0 else 0
+        wr = (self.total_wins / self.total * 100) if self.total > 0 else 0
 
         embed = discord.Embed(
             title=f"📜 Histórico Interno — {self.player_name}",
             color=0x3498db
         )
         embed.description = (
-            f"**{total}** partida(s) registradas\n"
+            f"**{self.total}** partida(s) registradas\n"
             f"`{self.total_wins}V` `{self.total_losses}D` • **{wr:.0f}%** WR"
         )
 
-        start = self.current_page * self.PER_PAGE
-        batch = self.history[start:start + self.PER_PAGE]
-
         lines = []
-        for h in batch:
+        for h in self.page:
             if h['won'] is True:
                 result_icon, result_label = "🟦", "Vitória"
             elif h['won'] is False:
@@ -136,7 +151,7 @@ class HistoryPaginationView(BaseInteractiveView):
             ts = f"<t:{int(h['finished_at'].timestamp())}:R>" if h.get('finished_at') else "N/A"
             lines.append(f"{result_icon} **#{h['match_id']}** — {result_label} {side_str}\n└ {ts}")
 
-        embed.add_field(name="\u200b", value="\n".join(lines), inline=False)
+        embed.add_field(name="\u200b", value="\n".join(lines) or "Nenhuma partida nesta página.", inline=False)
         embed.set_footer(text="Use .partida <ID> para detalhes · 10 por página")
         return embed
 
@@ -148,8 +163,7 @@ class HistoryPaginationView(BaseInteractiveView):
 
     @discord.ui.button(label="◀️", style=discord.ButtonStyle.secondary)
     async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page -= 1
-        self.update_buttons()
+        await self.load_page(self.current_page - 1)
         await interaction.response.edit_message(embed=self.create_embed(), view=self)
 
     @discord.ui.button(label="1/1", style=discord.ButtonStyle.gray, disabled=True)
@@ -158,8 +172,7 @@ class HistoryPaginationView(BaseInteractiveView):
 
     @discord.ui.button(label="▶️", style=discord.ButtonStyle.secondary)
     async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page += 1
-        self.update_buttons()
+        await self.load_page(self.current_page + 1)
         await interaction.response.edit_message(embed=self.create_embed(), view=self)
 
 
@@ -167,6 +180,8 @@ class Ranking(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.riot_service = RiotAPI()
+        # Nível, ícone e maestrias do último .perfil por PUUID (não ficam no banco)
+        self.profile_extras = {}
 
     def get_tier_emoji(self, tier: str) -> str:
         tier = tier.upper()
@@ -196,160 +211,215 @@ class Ranking(commands.Cog):
         sent_message = await ctx.reply(embed=view.create_embed(), view=view)
         view.message = sent_message
 
+    # --- RANKING POR PERÍODO (TEMPORADA / SEMANA) ---
+    def build_period_embed(self, title: str, rows: list, footer: str) -> discord.Embed:
+        embed = discord.Embed(title=title, color=0x3498db)
+        if not rows:
+            embed.description = "Nenhuma partida finalizada neste período."
+            return embed
+
+        medals = {0: "🥇", 1: "🥈", 2: "🥉"}
+        lines = []
+        for i, (stats, name) in enumerate(rows):
+            total = stats.wins + stats.losses
+            wr = stats.wins / total * 100 if total else 0
+            delta = stats.rating_delta or 0.0
+            extras = f" • ⭐ {stats.mvps}" if stats.mvps else ""
+            lines.append(
+                f"{medals.get(i, f'`{i+1}.`')} **{name or stats.player_id}** — "
+                f"`{stats.wins}V` `{stats.losses}D` ({wr:.0f}%) • Rating `{delta:+.0f}`{extras}"
+            )
+        embed.description = "\n".join(lines)
+        embed.set_footer(text=footer)
+        return embed
+
+    @commands.command(name="ranking_temporada", aliases=["temporada_top", "top_temporada"])
+    async def ranking_temporada(self, ctx):
+        """Top 10 da temporada ativa do servidor."""
+        season = await SeasonRepository.get_active_season(ctx.guild.id)
+        if not season:
+            return await ctx.reply("📭 Nenhuma temporada ativa. Um admin pode abrir uma com `.temporada nova <nome>`.")
+
+        rows = await SeasonRepository.get_period_ranking("season", str(season.id), limit=10)
+        footer = f"Desde {season.starts_at.strftime('%d/%m/%Y')}"
+        await ctx.reply(embed=self.build_period_embed(f"🏆 Ranking • {season.name}", rows, footer))
+
+    @commands.command(name="ranking_semana", aliases=["top_semana"])
+    async def ranking_semana(self, ctx):
+        """Top 10 da semana atual (semana ISO, segunda a domingo, UTC)."""
+        now = datetime.utcnow()
+        rows = await SeasonRepository.get_period_ranking("week", SeasonRepository.week_key(ctx.guild.id, now), limit=10)
+        await ctx.reply(embed=self.build_period_embed("📅 Ranking da Semana", rows, f"Semana {SeasonRepository.week_label(now)}"))
+
     # --- PERFIL ---
-    @commands.command(name="perfil")
-    async def perfil(self, ctx, jogador: discord.Member = None):
-        async with ctx.typing():
-            target_user = jogador or ctx.author
+    def build_profile_embed(self, target_user, player, summoner_level, live_icon_id, mastery_lines: list) -> discord.Embed:
+        embed_color = 0x2b2d31
+        solo_data = {'tier': player.solo_tier, 'rank': player.solo_rank, 'lp': player.solo_lp, 'wins': player.solo_wins, 'losses': player.solo_losses}
+        flex_data = {'tier': player.flex_tier, 'rank': player.flex_rank, 'lp': player.flex_lp, 'wins': player.flex_wins, 'losses': player.flex_losses}
 
-            player = await PlayerRepository.get_player_by_discord_id(target_user.id)
-            if not player:
-                await ctx.reply(f"❌ {target_user.mention} não está registrado. Use `.registrar`.")
-                return
+        if player.solo_tier != "UNRANKED":
+            tier_colors = {
+                'IRON': 0x564b49, 'BRONZE': 0x8c5133, 'SILVER': 0xc0c0c0, 'GOLD': 0xffd700,
+                'PLATINUM': 0x2ecc71, 'EMERALD': 0x009475, 'DIAMOND': 0x3498db,
+                'MASTER': 0x9b59b6, 'GRANDMASTER': 0xe74c3c, 'CHALLENGER': 0xf1c40f
+            }
+            embed_color = tier_colors.get(player.solo_tier, 0x2b2d31)
 
-            riot_ranks = []
-            top_mastery = []
-            summoner_level = "N/A"
-            live_icon_id = player.riot_icon_id
+        embed = discord.Embed(color=embed_color)
 
-            try:
-                summoner_data = await self.riot_service.get_summoner_by_puuid(player.riot_puuid)
-                if summoner_data:
-                    summoner_level = summoner_data.get('summonerLevel', 'N/A')
-                    live_icon_id = summoner_data.get('profileIconId')
-
-                riot_ranks = await self.riot_service.get_rank_by_puuid(player.riot_puuid)
-                top_mastery = await self.riot_service.get_top_mastery(player.riot_puuid)
-
-                mmr_source = next((r for r in (riot_ranks or []) if r['queueType'] == 'RANKED_SOLO_5x5'), None)
-                if not mmr_source:
-                    mmr_source = next((r for r in (riot_ranks or []) if r['queueType'] == 'RANKED_FLEX_SR'), None)
-
-                if mmr_source:
-                    new_mmr = MatchMaker.calculate_adjusted_mmr(
-                        tier=mmr_source['tier'],
-                        rank=mmr_source['rank'],
-                        lp=mmr_source['leaguePoints'],
-                        wins=mmr_source['wins'],
-                        losses=mmr_source['losses'],
-                        queue_type=mmr_source['queueType']
-                    )
-
-                    if solo_rank_data := next((r for r in (riot_ranks or []) if r['queueType'] == 'RANKED_SOLO_5x5'), None):
-                        await PlayerRepository.update_riot_rank(
-                            discord_id=player.discord_id,
-                            tier=solo_rank_data['tier'],
-                            rank=solo_rank_data['rank'],
-                            lp=solo_rank_data['leaguePoints'],
-                            wins=solo_rank_data['wins'],
-                            losses=solo_rank_data['losses'],
-                            calculated_mmr=new_mmr,
-                            queue_type='RANKED_SOLO_5x5'
-                        )
-
-                    if flex_rank_data := next((r for r in (riot_ranks or []) if r['queueType'] == 'RANKED_FLEX_SR'), None):
-                        await PlayerRepository.update_riot_rank(
-                            discord_id=player.discord_id,
-                            tier=flex_rank_data['tier'],
-                            rank=flex_rank_data['rank'],
-                            lp=flex_rank_data['leaguePoints'],
-                            wins=flex_rank_data['wins'],
-                            losses=flex_rank_data['losses'],
-                            queue_type='RANKED_FLEX_SR'
-                        )
-
-                player = await PlayerRepository.get_player_by_discord_id(target_user.id)
-
-            except Exception as e:
-                print(f"Erro API Riot durante perfil/update: {e}")
-
-            embed_color = 0x2b2d31
-            solo_data = {'tier': player.solo_tier, 'rank': player.solo_rank, 'lp': player.solo_lp, 'wins': player.solo_wins, 'losses': player.solo_losses}
-            flex_data = {'tier': player.flex_tier, 'rank': player.flex_rank, 'lp': player.flex_lp, 'wins': player.flex_wins, 'losses': player.flex_losses}
-
-            if player.solo_tier != "UNRANKED":
-                tier_colors = {
-                    'IRON': 0x564b49, 'BRONZE': 0x8c5133, 'SILVER': 0xc0c0c0, 'GOLD': 0xffd700,
-                    'PLATINUM': 0x2ecc71, 'EMERALD': 0x009475, 'DIAMOND': 0x3498db,
-                    'MASTER': 0x9b59b6, 'GRANDMASTER': 0xe74c3c, 'CHALLENGER': 0xf1c40f
-                }
-                embed_color = tier_colors.get(player.solo_tier, 0x2b2d31)
-
-            embed = discord.Embed(color=embed_color)
-
-            url_friendly_name = player.riot_name.replace(' ', '-').replace('#', '-')
-            riot_link = f"[{player.riot_name}](https://www.op.gg/summoners/br/{url_friendly_name})"
-
-            embed.set_author(name=f"{target_user.display_name} • Nível {summoner_level}", icon_url=target_user.display_avatar.url)
-            if live_icon_id:
-                embed.set_thumbnail(url=f"http://ddragon.leagueoflegends.com/cdn/14.1.1/img/profileicon/{live_icon_id}.png")
-
-            main_lane = player.main_lane.value.capitalize() if player.main_lane else "N/A"
-            sec_lane = player.secondary_lane.value.capitalize() if player.secondary_lane else "N/A"
-
-            streak = getattr(player, 'current_win_streak', 0) or 0
-            best_streak = getattr(player, 'best_win_streak', 0) or 0
-
-            embed.description = f"🆔 **Conta:** {riot_link}\n🗺️ **Rotas:** {main_lane} / {sec_lane}"
-            embed.add_field(name="\u200b", value="\u200b", inline=False)
+        url_friendly_name = player.riot_name.replace(' ', '-').replace('#', '-')
+        riot_link = f"[{player.riot_name}](https://www.op.gg/summoners/br/{url_friendly_name})"
 
-            def format_rank_detailed(data):
-                if data['tier'] == "UNRANKED": return "```st\nUnranked\n```"
-                wins, losses = data['wins'], data['losses']
-                total = wins + losses
-                wr = (wins / total * 100) if total > 0 else 0
-                return (f"{self.get_tier_emoji(data['tier'])} **{data['tier']} {data['rank']}**\n"
-                        f"Info: `{data['lp']} PDL` • `{wr:.0f}% WR`\n"
-                        f"Score: `{wins}V` - `{losses}D`")
-
-            embed.add_field(name="🛡️ Solo/Duo", value=format_rank_detailed(solo_data), inline=True)
-            embed.add_field(name="⚔️ Flex 5v5", value=format_rank_detailed(flex_data), inline=True)
-            embed.add_field(name="\u200b", value="\u200b", inline=False)
+        embed.set_author(name=f"{target_user.display_name} • Nível {summoner_level}", icon_url=target_user.display_avatar.url)
+        if live_icon_id:
+            embed.set_thumbnail(url=f"http://ddragon.leagueoflegends.com/cdn/14.1.1/img/profileicon/{live_icon_id}.png")
 
-            if top_mastery:
-                m_list = []
-                for i, c in enumerate(top_mastery):
-                    name = await self.riot_service.get_champion_name(c['championId'])
-                    points = int(c['championPoints'])
-                    pts_str = f"{points/1000:.1f}k" if points > 1000 else str(points)
-                    m_list.append(f"`#{i+1}` **{name}** (M{c['championLevel']}) • {pts_str}")
-                embed.add_field(name="🔥 Top Maestrias", value="\n".join(m_list), inline=False)
+        main_lane = player.main_lane.value.capitalize() if player.main_lane else "N/A"
+        sec_lane = player.secondary_lane.value.capitalize() if player.secondary_lane else "N/A"
 
-            embed.add_field(name="\u200b", value="⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯", inline=False)
+        streak = getattr(player, 'current_win_streak', 0) or 0
+        best_streak = getattr(player, 'best_win_streak', 0) or 0
 
-            total_ih = player.wins + player.losses
-            wr_ih = (player.wins / total_ih * 100) if total_ih > 0 else 0.0
+        embed.description = f"🆔 **Conta:** {riot_link}\n🗺️ **Rotas:** {main_lane} / {sec_lane}"
+        embed.add_field(name="\u200b", value="\u200b", inline=False)
 
-            mvp_count = getattr(player, 'mvp_count', 0) or 0
-            imvp_count = getattr(player, 'imvp_count', 0) or 0
+        def format_rank_detailed(data):
+            if data['tier'] == "UNRANKED": return "```st\nUnranked\n```"
+            wins, losses = data['wins'], data['losses']
+            total = wins + losses
+            wr = (wins / total * 100) if total > 0 else 0
+            return (f"{self.get_tier_emoji(data['tier'])} **{data['tier']} {data['rank']}**\n"
+                    f"Info: `{data['lp']} PDL` • `{wr:.0f}% WR`\n"
+                    f"Score: `{wins}V` - `{losses}D`")
+
+        embed.add_field(name="🛡️ Solo/Duo", value=format_rank_detailed(solo_data), inline=True)
+        embed.add_field(name="⚔️ Flex 5v5", value=format_rank_detailed(flex_data), inline=True)
+        embed.add_field(name="\u200b", value="\u200b", inline=False)
 
-            stats_block = (
-                f"```yaml\n"
-                f"MMR:   {player.mmr}\n"
-                f"Jogos: {total_ih}\n"
-                f"V/D:   {player.wins} - {player.losses}\n"
-                f"Win%:  {wr_ih:.1f}%\n"
-                f"```"
+        if mastery_lines:
+            embed.add_field(name="🔥 Top Maestrias", value="\n".join(mastery_lines), inline=False)
+
+        embed.add_field(name="\u200b", value="⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯", inline=False)
+
+        total_ih = player.wins + player.losses
+        wr_ih = (player.wins / total_ih * 100) if total_ih > 0 else 0.0
+
+        mvp_count = getattr(player, 'mvp_count', 0) or 0
+        imvp_count = getattr(player, 'imvp_count', 0) or 0
+
+        rating = getattr(player, 'rating', None)
+        rating_line = f"Rating: {rating:.0f} ±{player.rating_rd:.0f}\n" if rating is not None else ""
+
+        stats_block = (
+            f"```yaml\n"
+            f"MMR:   {player.mmr}\n"
+            f"{rating_line}"
+            f"Jogos: {total_ih}\n"
+            f"V/D:   {player.wins} - {player.losses}\n"
+            f"Win%:  {wr_ih:.1f}%\n"
+            f"```"
+        )
+        embed.add_field(name="🏆 Liga Interna", value=stats_block, inline=True)
+
+        awards_lines = []
+        if mvp_count > 0:
+            awards_lines.append(f"⭐ MVP — **{mvp_count}x**")
+        if imvp_count > 0:
+            awards_lines.append(f"💀 iMVP — **{imvp_count}x**")
+        if streak >= 3:
+            awards_lines.append(f"🔥 Sequência — **{streak} seguidas**")
+        if best_streak > 0:
+            awards_lines.append(f"🏅 Recorde — **{best_streak} seguidas**")
+
+        if awards_lines:
+            embed.add_field(name="🎖️ Conquistas", value="\n".join(awards_lines), inline=True)
+        else:
+            embed.add_field(name="\u200b", value="\u200b", inline=True)
+        embed.set_footer(text=f"System ID: {player.discord_id}")
+
+        return embed
+
+    async def refresh_profile(self, player):
+        """
+        Busca summoner, rank e maestrias em paralelo e grava Solo/Flex numa única sessão.
+        Retorna (player_atualizado, dados_ao_vivo); o player é None se a Riot não devolveu ranks.
+        """
+        summoner_data, riot_ranks, top_mastery = await asyncio.gather(
+            self.riot_service.get_summoner_by_puuid(player.riot_puuid),
+            self.riot_service.get_rank_by_puuid(player.riot_puuid),
+            self.riot_service.get_top_mastery(player.riot_puuid),
+            return_exceptions=True
+        )
+
+        live = self.profile_extras.get(player.riot_puuid, {}).copy()
+        if isinstance(summoner_data, dict):
+            live['level'] = summoner_data.get('summonerLevel', 'N/A')
+            live['icon'] = summoner_data.get('profileIconId')
+        if isinstance(top_mastery, list):
+            m_list = []
+            for i, c in enumerate(top_mastery):
+                name = await self.riot_service.get_champion_name(c['championId'])
+                points = int(c['championPoints'])
+                pts_str = f"{points/1000:.1f}k" if points > 1000 else str(points)
+                m_list.append(f"`#{i+1}` **{name}** (M{c['championLevel']}) • {pts_str}")
+            live['mastery'] = m_list
+        self.profile_extras[player.riot_puuid] = live
+
+        if not isinstance(riot_ranks, list) or not riot_ranks:
+            return None, live
+
+        mmr_source = next((r for r in riot_ranks if r['queueType'] == 'RANKED_SOLO_5x5'), None)
+        if not mmr_source:
+            mmr_source = next((r for r in riot_ranks if r['queueType'] == 'RANKED_FLEX_SR'), None)
+
+        new_mmr = None
+        if mmr_source:
+            new_mmr = MatchMaker.calculate_adjusted_mmr(
+                tier=mmr_source['tier'],
+                rank=mmr_source['rank'],
+                lp=mmr_source['leaguePoints'],
+                wins=mmr_source['wins'],
+                losses=mmr_source['losses'],
+                queue_type=mmr_source['queueType']
             )
-            embed.add_field(name="🏆 Liga Interna", value=stats_block, inline=True)
 
-            awards_lines = []
-            if mvp_count > 0:
-                awards_lines.append(f"⭐ MVP — **{mvp_count}x**")
-            if imvp_count > 0:
-                awards_lines.append(f"💀 iMVP — **{imvp_count}x**")
-            if streak >= 3:
-                awards_lines.append(f"🔥 Sequência — **{streak} seguidas**")
-            if best_streak > 0:
-                awards_lines.append(f"🏅 Recorde — **{best_streak} seguidas**")
+        updated = await PlayerRepository.update_riot_ranks(player.discord_id, riot_ranks, calculated_mmr=new_mmr)
+        return updated, live
 
-            if awards_lines:
-                embed.add_field(name="🎖️ Conquistas", value="\n".join(awards_lines), inline=True)
-            else:
-                embed.add_field(name="\u200b", value="\u200b", inline=True)
-            embed.set_footer(text=f"System ID: {player.discord_id}")
+    @commands.command(name="perfil")
+    async def perfil(self, ctx, jogador: discord.Member = None):
+        target_user = jogador or ctx.author
 
-            await ctx.reply(embed=embed)
+        player = await PlayerRepository.get_player_by_discord_id(target_user.id)
+        if not player:
+            await ctx.reply(f"❌ {target_user.mention} não está registrado. Use `.registrar`.")
+            return
+
+        # Dispara a atualização da Riot antes de responder: o embed sai na hora com os dados do cache
+        refresh_task = asyncio.create_task(self.refresh_profile(player))
+
+        extras = self.profile_extras.get(player.riot_puuid, {})
+        embed = self.build_profile_embed(
+            target_user, player,
+            extras.get('level', 'N/A'), extras.get('icon', player.riot_icon_id), extras.get('mastery', [])
+        )
+        message = await ctx.reply(embed=embed)
+
+        try:
+            updated, live = await refresh_task
+        except Exception as e:
+            logger.warning("Erro API Riot durante perfil/update: %s", e)
+            return
+
+        fresh_embed = self.build_profile_embed(
+            target_user, updated or player,
+            live.get('level', 'N/A'), live.get('icon', player.riot_icon_id), live.get('mastery', [])
+        )
+        if fresh_embed.to_dict() != embed.to_dict():
+            try:
+                await message.edit(embed=fresh_embed)
+            except discord.HTTPException:
+                pass
 
     # --- MMR ---
     @commands.command(name="mmr")
@@ -581,11 +651,17 @@ class Ranking(commands.Cog):
         if not player:
             return await ctx.reply(f"❌ {target_user.mention} não está registrado.")
 
-        history = await MatchRepository.get_player_internal_history(player.discord_id)
-        if not history:
+        first_page, next_cursor = await MatchRepository.get_player_history_page(
+            player.discord_id, limit=HistoryPaginationView.PER_PAGE
+        )
+        if not first_page:
             return await ctx.reply(f"📭 **{player.riot_name}** ainda não jogou nenhuma partida na Liga.")
 
-        view = HistoryPaginationView(history, player.riot_name, ctx)
+        # Totais já mantidos pelo finish_match (Player.wins/losses): sem contar o histórico inteiro
+        view = HistoryPaginationView(
+            player.discord_id, player.riot_name, ctx,
+            player.wins or 0, player.losses or 0, first_page, next_cursor
+        )
         msg = await ctx.reply(embed=view.create_embed(), view=view)
         view.message = msg
 
@@ -693,5 +769,56 @@ class Ranking(commands.Cog):
         await ctx.reply(embed=embed)
 
 
+    # --- MELHORES DUPLAS / NÊMESIS ---
+    async def _player_name(self, discord_id: int) -> str:
+        player = await PlayerRepository.get_player_by_discord_id(discord_id)
+        return player.riot_name if player else str(discord_id)
+
+    @commands.command(name="duplas", aliases=["duos"])
+    async def duplas(self, ctx, min_jogos: int = 3):
+        """Duplas com melhor aproveitamento jogando juntas."""
+        duos = await MatchRepository.get_best_duos(min_games=max(1, min_jogos), limit=10)
+        if not duos:
+            return await ctx.reply(f"📭 Nenhuma dupla com pelo menos {min_jogos} jogo(s) juntos ainda.")
+
+        lines = []
+        for i, d in enumerate(duos):
+            wr = d.wins_together / d.games_together * 100
+            name_a, name_b = await self._player_name(d.player_a), await self._player_name(d.player_b)
+            lines.append(f"`{i+1}.` **{name_a}** + **{name_b}**\n└ `{d.wins_together}V` - `{d.games_together - d.wins_together}D` ({wr:.0f}%)")
+
+        embed = discord.Embed(title="🤝 Melhores Duplas da Liga", description="\n".join(lines), color=0x2ecc71)
+        embed.set_footer(text=f"Mínimo de {min_jogos} jogo(s) juntos • ordenado por winrate suavizado")
+        await ctx.reply(embed=embed)
+
+    @commands.command(name="nemesis", aliases=["nemese", "carrasco"])
+    async def nemesis(self, ctx, jogador: discord.Member = None):
+        """Contra quem o jogador mais perde (nêmesis) e contra quem mais ganha (freguês)."""
+        target_user = jogador or ctx.author
+        player = await PlayerRepository.get_player_by_discord_id(target_user.id)
+        if not player:
+            return await ctx.reply(f"❌ {target_user.mention} não está registrado.")
+
+        rivals = await MatchRepository.get_rivals(target_user.id)
+        if not rivals:
+            return await ctx.reply(f"📭 **{player.riot_name}** ainda não enfrentou ninguém pelo menos 2 vezes.")
+
+        def fmt(entries):
+            out = []
+            for rival_id, games, wins, losses, name in entries:
+                out.append(f"**{name}** — `{wins}V` `{losses}D` ({games} jogo(s))")
+            return "\n".join(out)
+
+        named = [(r[0], r[1], r[2], r[3], await self._player_name(r[0])) for r in rivals]
+        embed = discord.Embed(title=f"😈 Rivais de {player.riot_name}", color=0xe74c3c)
+        # Metades disjuntas da lista (pior -> melhor retrospecto): ninguém aparece nas duas
+        half = (len(named) + 1) // 2
+        nemeses, fregueses = named[:min(3, half)], list(reversed(named[half:]))[:3]
+        embed.add_field(name="💀 Nêmesis", value=fmt(nemeses), inline=False)
+        if fregueses:
+            embed.add_field(name="🍗 Fregueses", value=fmt(fregueses), inline=False)
+        await ctx.reply(embed=embed)
+
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Ranking(bot))
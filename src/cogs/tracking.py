@@ -1,11 +1,20 @@
 import discord
 import asyncio
+import logging
 import random
 from discord.ext import commands, tasks
 from src.services.riot_api import RiotAPI
 from src.database.repositories import PlayerRepository, GuildRepository
 # NOVO: Importar o MatchMaker para recalcular o MMR no loop
 from src.services.matchmaker import MatchMaker 
+from src.services.metrics import registry
+
+logger = logging.getLogger("tracking")
+
+TRACKER_SWEEP_SECONDS = registry.histogram(
+    "tracker_sweep_seconds", "Duração de uma varredura completa de elos (todos os servidores)",
+    buckets=(10, 30, 60, 120, 300, 600, 1200))
+TRACKER_ERRORS = registry.counter("tracker_player_errors_total", "Jogadores que falharam na varredura de elos")
 
 class RankingTracking(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -49,7 +58,10 @@ class RankingTracking(commands.Cog):
     @tasks.loop(minutes=10)
     async def check_ranks_loop(self):
         await self.bot.wait_until_ready()
-        
+        with TRACKER_SWEEP_SECONDS.time():
+            await self._sweep()
+
+    async def _sweep(self):
         for guild in self.bot.guilds:
             channel_id = await GuildRepository.get_tracking_channel(guild.id)
             # Mesmo se não tiver canal configurado, queremos atualizar o MMR no banco
@@ -149,7 +161,8 @@ class RankingTracking(commands.Cog):
                         )
 
                 except Exception as e:
-                    print(f"Erro check loop player {p.riot_name}: {e}")
+                    TRACKER_ERRORS.inc()
+                    logger.warning("Erro na varredura do jogador %s: %s", p.riot_name, e)
 
     # --- COMANDOS DE CONFIGURAÇÃO E TESTE ---
 
@@ -1,8 +1,11 @@
 import discord
+import logging
 from discord.ext import commands
 from src.services.riot_api import RiotAPI
 import difflib
 
+logger = logging.getLogger("utility")
+
 class Utility(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -26,7 +29,7 @@ class Utility(commands.Cog):
             
             # Removidas as linhas de apelido que causaram o bug do caractere e eram redundantes/mal formatadas.
             
-            print(f"[Utility] Cache de campeões carregado: {len(self.champions_cache)//2} campeões.")
+            logger.info("Cache de campeões carregado: %s campeões", len(self.champions_cache) // 2)
 
 
     async def find_champion_key(self, search: str):
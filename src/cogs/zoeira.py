@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 import random
 import logging
+from src.services.discord_http import http_priority, Priority
 
 log = logging.getLogger(__name__)
 
@@ -30,21 +31,23 @@ class Zoeira(commands.Cog):
     async def on_message(self, message: discord.Message):
         if message.author.bot:
             return
-        if random.random() < 0.10:  # ~1 em cada 10 msgs
-            try:
-                await message.add_reaction("<:marocosbot1:1484889563192234044>")
-                log.info(f"[Zoeira] Reagiu com marocosbot1 na msg de {message.author} em #{message.channel}")
-            except Exception as e:
-                log.warning(f"[Zoeira] Falhou ao reagir com marocosbot1: {e}")
-
-        if self.torres_tomate_ativo and message.author.id == self.TORRES_ID:
-            torres_reacoes = ["🍅", "🤡", "💀", "🗑️", "🤢", "😬", "🦆", "🪣", "🥴", "👎", "🐸"]
-            for emoji in torres_reacoes:
+        # Reações são cosméticas: cedem a vez para chamadas importantes e seguram após um 429
+        with http_priority(Priority.LOW):
+            if random.random() < 0.10:  # ~1 em cada 10 msgs
                 try:
-                    await message.add_reaction(emoji)
+                    await message.add_reaction("<:marocosbot1:1484889563192234044>")
+                    log.info(f"[Zoeira] Reagiu com marocosbot1 na msg de {message.author} em #{message.channel}")
                 except Exception as e:
-                    log.warning(f"[Zoeira] Falhou ao reagir com {emoji} no Torres: {e}")
-            log.info(f"[Zoeira] Bombardeou msg do Torres com {len(torres_reacoes)} reações em #{message.channel}")
+                    log.warning(f"[Zoeira] Falhou ao reagir com marocosbot1: {e}")
+
+            if self.torres_tomate_ativo and message.author.id == self.TORRES_ID:
+                torres_reacoes = ["🍅", "🤡", "💀", "🗑️", "🤢", "😬", "🦆", "🪣", "🥴", "👎", "🐸"]
+                for emoji in torres_reacoes:
+                    try:
+                        await message.add_reaction(emoji)
+                    except Exception as e:
+                        log.warning(f"[Zoeira] Falhou ao reagir com {emoji} no Torres: {e}")
+                log.info(f"[Zoeira] Bombardeou msg do Torres com {len(torres_reacoes)} reações em #{message.channel}")
 
     @commands.command(name="fdp")
     async def fdp_command(self, ctx: commands.Context):
@@ -0,0 +1,55 @@
+import time
+
+
+class PlayerCache:
+    """
+    Cache read-through de snapshots de Player, indexado por discord_id.
+
+    Os objetos guardados são instâncias desanexadas da sessão (expire_on_commit=False),
+    então podem ser lidas livremente, mas nunca devem ser alteradas por quem as recebe.
+    Toda escrita do PlayerRepository chama invalidate() APÓS o commit. Cada chave tem
+    uma "geração": uma leitura que começou antes de uma escrita não consegue recolocar
+    o snapshot antigo no cache, porque a geração mudou no meio do caminho.
+    """
+
+    def __init__(self, ttl_seconds: int = 600):
+        # TTL de segurança para escritas feitas fora do bot (scripts de manutenção)
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}       # discord_id -> (expira_em, player)
+        self._generations = {}   # discord_id -> int
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, discord_id: int):
+        entry = self._entries.get(discord_id)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        if entry:
+            del self._entries[discord_id]
+        self.misses += 1
+        return None
+
+    def generation(self, discord_id: int) -> int:
+        return self._generations.get(discord_id, 0)
+
+    def generations_snapshot(self) -> dict:
+        """Cópia das gerações atuais (para cargas em massa via put)."""
+        return dict(self._generations)
+
+    def put(self, discord_id: int, player, generation: int):
+        """Armazena o snapshot, a menos que a chave tenha sido invalidada desde `generation`."""
+        if self._generations.get(discord_id, 0) != generation:
+            return
+        self._entries[discord_id] = (time.monotonic() + self.ttl_seconds, player)
+
+    def invalidate(self, discord_id: int):
+        self._entries.pop(discord_id, None)
+        self._generations[discord_id] = self._generations.get(discord_id, 0) + 1
+
+    def clear(self):
+        for discord_id in list(self._entries):
+            self.invalidate(discord_id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, BigInteger, Boolean, DateTime, ForeignKey, Enum as SAEnum
+from sqlalchemy import desc, Column, Integer, String, BigInteger, Boolean, DateTime, Float, ForeignKey, Index, Enum as SAEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -70,6 +70,11 @@ class Player(Base):
     losses = Column(Integer, default=0)
     mmr = Column(Integer, default=1200)
 
+    # Rating Glicko-2 das partidas internas (None até a primeira partida finalizada)
+    rating = Column(Float, nullable=True)
+    rating_rd = Column(Float, nullable=True)
+    rating_vol = Column(Float, nullable=True)
+
     # Streaks (Liga Interna)
     current_win_streak = Column(Integer, default=0)
     best_win_streak = Column(Integer, default=0)
@@ -97,6 +102,14 @@ class Match(Base):
     status = Column(SAEnum(MatchStatus), default=MatchStatus.OPEN)
     winning_side = Column(SAEnum(TeamSide), nullable=True)
 
+    # Resultado da votação MVP/iMVP (gravado uma única vez ao encerrar a enquete)
+    mvp_id = Column(BigInteger, nullable=True)
+    imvp_id = Column(BigInteger, nullable=True)
+    poll_closed_at = Column(DateTime, nullable=True)
+
+    # Histórico paginado por (finished_at, id)
+    __table_args__ = (Index("ix_matches_finished_at_id", "finished_at", "id"),)
+
     players = relationship("MatchPlayer", back_populates="match", cascade="all, delete-orphan")
 
 
@@ -105,18 +118,84 @@ class MatchPlayer(Base):
     __tablename__ = "match_players"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    match_id = Column(Integer, ForeignKey("matches.id"))
-    player_id = Column(BigInteger, ForeignKey("players.discord_id"))
+    match_id = Column(Integer, ForeignKey("matches.id"), index=True)
+    player_id = Column(BigInteger, ForeignKey("players.discord_id"), index=True)
 
     side = Column(SAEnum(TeamSide), nullable=True)
     is_captain = Column(Boolean, default=False)
     picked_lane = Column(SAEnum(Lane), nullable=True)
     mmr_before = Column(Integer, nullable=True)  # Snapshot do MMR no momento da partida
+    rating_before = Column(Float, nullable=True)     # Rating Glicko-2 antes do resultado
+    rating_rd_before = Column(Float, nullable=True)  # Incerteza (rd) antes do resultado
+    rating_after = Column(Float, nullable=True)      # Rating Glicko-2 após o resultado
 
     match = relationship("Match", back_populates="players")
     player = relationship("Player", back_populates="matches")
 
 
+class PlayerPairStats(Base):
+    """
+    Estatísticas de cada dupla de jogadores (player_a < player_b), mantidas a cada
+    resultado: jogos/vitórias como parceiros e jogos/vitórias de cada um como adversários.
+    """
+    __tablename__ = "player_pair_stats"
+
+    player_a = Column(BigInteger, primary_key=True)
+    player_b = Column(BigInteger, primary_key=True)
+
+    games_together = Column(Integer, default=0)
+    wins_together = Column(Integer, default=0)
+    games_against = Column(Integer, default=0)
+    wins_a_against = Column(Integer, default=0)  # Vitórias de player_a sobre player_b
+    wins_b_against = Column(Integer, default=0)  # Vitórias de player_b sobre player_a
+
+    # Últimas partidas em comum: [[match_id, mesmo_time, player_a_venceu, finished_at_iso], ...]
+    recent_json = Column(String, default="[]")
+
+
+class Season(Base):
+    """Temporada da liga interna (a ativa é a que não tem ends_at)"""
+    __tablename__ = "seasons"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    guild_id = Column(BigInteger, nullable=False, index=True)
+    name = Column(String, nullable=False)
+    starts_at = Column(DateTime, default=datetime.utcnow)
+    ends_at = Column(DateTime, nullable=True)
+
+
+class PlayerPeriodStats(Base):
+    """
+    Agregados por jogador em um período, mantidos a cada resultado:
+    period_type 'season' (period_key = id da temporada) ou 'week' (period_key = '<guild_id>:AAAA-Wss', semana ISO do servidor).
+    """
+    __tablename__ = "player_period_stats"
+
+    period_type = Column(String, primary_key=True)
+    period_key = Column(String, primary_key=True)
+    player_id = Column(BigInteger, primary_key=True)
+
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    mvps = Column(Integer, default=0)
+    imvps = Column(Integer, default=0)
+    rating_delta = Column(Float, default=0.0)  # Soma de (rating_after - rating_before) no período
+
+    # Ranking do período lido direto do índice (mesma ordem do .ranking geral)
+    __table_args__ = (Index("ix_period_stats_ranking", "period_type", "period_key", desc("wins"), "losses"),)
+
+
+class PollVote(Base):
+    """Voto de um usuário numa enquete MVP/iMVP (um voto por usuário por enquete)"""
+    __tablename__ = "poll_votes"
+
+    match_id = Column(Integer, primary_key=True)
+    poll_type = Column(String, primary_key=True)   # 'mvp' | 'imvp'
+    voter_id = Column(BigInteger, primary_key=True)
+    candidate_id = Column(BigInteger, nullable=False)
+    voted_at = Column(DateTime, default=datetime.utcnow)
+
+
 class CommunityProfile(Base):
     """Perfil Social e de Gamificação do Usuário"""
     __tablename__ = "community_profiles"
@@ -143,6 +222,54 @@ class LobbyState(Base):
     updated_at = Column(DateTime, default=datetime.utcnow)
 
 
+class MatchSetupState(Base):
+    """
+    Etapa em andamento da montagem dos times (escolha de lado, opção balanceada ou draft).
+    As views dessa fase são persistentes e leem o estado daqui a cada clique.
+    """
+    __tablename__ = "match_setup_states"
+
+    guild_id = Column(BigInteger, primary_key=True)
+    stage = Column(String, nullable=False)          # 'side_select' | 'balanced' | 'draft'
+    state_json = Column(String, default="{}")       # Dados da etapa (capitães, pool, times...)
+    channel_id = Column(BigInteger, nullable=True)
+    message_id = Column(BigInteger, nullable=True)  # Mensagem com os botões da etapa atual
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DraftSession(Base):
+    """
+    Draft por capitães em andamento (um por servidor). Só guarda o que não muda durante
+    o draft; cada pick é gravado no DraftPlayer correspondente (pick_no), e o estado
+    completo (vez, pool, times) é reconstruído pela máquina de estados em services/draft.py.
+    """
+    __tablename__ = "draft_sessions"
+
+    guild_id = Column(BigInteger, primary_key=True)
+    cap_blue_id = Column(BigInteger, nullable=False)
+    cap_red_id = Column(BigInteger, nullable=False)
+    first_pick_side = Column(String, nullable=False)   # 'BLUE' | 'RED'
+    pick_count = Column(Integer, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DraftPlayer(Base):
+    """Participante do draft (capitães incluídos): snapshot do jogador na fila + ordem do pick."""
+    __tablename__ = "draft_players"
+
+    guild_id = Column(BigInteger, primary_key=True)
+    discord_id = Column(BigInteger, primary_key=True)
+    slot = Column(Integer, nullable=False)             # Ordem original (capitães primeiro, depois o pool)
+    name = Column(String, nullable=False)
+    mmr = Column(Integer, default=0)
+    main_lane = Column(String, nullable=True)
+    secondary_lane = Column(String, nullable=True)
+    rating = Column(Float, nullable=True)
+    streak = Column(Integer, default=0)
+    pick_no = Column(Integer, nullable=True)           # None = ainda no pool (ou capitão)
+
+
 class EventStatus(enum.Enum):
     OPEN = "open"
     CANCELLED = "cancelled"
@@ -180,3 +307,27 @@ class ScheduledEventPlayer(Base):
     confirmed_at = Column(DateTime, default=datetime.utcnow)
 
     event = relationship("ScheduledEvent", back_populates="players")
+
+
+class JobStatus(enum.Enum):
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ScheduledJob(Base):
+    """Tarefa agendada (fim de enquete, lembrete de evento) que sobrevive a reinicializações"""
+    __tablename__ = "scheduled_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)                 # Handler registrado no JobScheduler
+    key = Column(String, nullable=False, unique=True)     # Identidade lógica (ex.: 'mvp_poll:42')
+    run_at = Column(DateTime, nullable=False)
+    payload_json = Column(String, default="{}")
+    status = Column(SAEnum(JobStatus), default=JobStatus.PENDING)
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_scheduled_jobs_status_run_at", "status", "run_at"),)
@@ -1,13 +1,43 @@
 import json
-from sqlalchemy import select, desc
-from sqlalchemy.orm import aliased
-from src.database.models import Player, Match, MatchPlayer, MatchStatus, TeamSide, GuildConfig, CommunityProfile, LobbyState, ScheduledEvent, ScheduledEventPlayer, EventStatus
+from sqlalchemy import select, desc, update, delete, or_, and_
+from src.database.models import Player, Match, MatchPlayer, MatchStatus, TeamSide, Lane, GuildConfig, CommunityProfile, PlayerPairStats, PollVote, Season, PlayerPeriodStats, LobbyState, MatchSetupState, DraftSession, DraftPlayer, ScheduledEvent, ScheduledEventPlayer, EventStatus, ScheduledJob, JobStatus
 from sqlalchemy.orm import selectinload
 from src.database.config import get_session
+from src.database.cache import PlayerCache
+from src.services.matchmaker import MatchMaker
+from src.services.rating import RatingEngine, Rating
+from src.services.draft import DraftState, DraftPhase
+from src.services.metrics import registry, timed_repository, Family
 from datetime import datetime
 
 
+# Cache de jogadores compartilhado (invalidado por todos os mutadores do PlayerRepository)
+player_cache = PlayerCache()
+rating_engine = RatingEngine()
+
+
+def _collect_cache_metrics() -> list:
+    return [
+        Family("player_cache_requests_total", "counter", "Leituras do cache de jogadores por resultado")
+        .add(player_cache.hits, result="hit").add(player_cache.misses, result="miss"),
+        Family("player_cache_entries", "gauge", "Snapshots de jogador em cache").add(len(player_cache)),
+    ]
+
+
+registry.add_collector(_collect_cache_metrics)
+
+
+# Quantas partidas em comum cada dupla guarda para o .h2h
+PAIR_RECENT_LIMIT = 5
+
+
+def pair_key(a: int, b: int) -> tuple:
+    """Chave canônica de uma dupla (menor id primeiro)."""
+    return (a, b) if a < b else (b, a)
+
+
 # --- REPOSITÓRIO DA GUILDA ---
+@timed_repository
 class GuildRepository:
     @staticmethod
     async def set_tracking_channel(guild_id: int, channel_id: int):
@@ -52,13 +82,23 @@ class GuildRepository:
 
 
 # --- REPOSITÓRIO DE JOGADORES ---
+@timed_repository
 class PlayerRepository:
 
     @staticmethod
     async def get_player_by_discord_id(discord_id: int):
+        cached = player_cache.get(discord_id)
+        if cached is not None:
+            return cached
+
+        generation = player_cache.generation(discord_id)
         async with get_session() as session:
             result = await session.execute(select(Player).where(Player.discord_id == discord_id))
-            return result.scalar_one_or_none()
+            player = result.scalar_one_or_none()
+
+        if player:
+            player_cache.put(discord_id, player, generation)
+        return player
 
     @staticmethod
     async def get_player_by_puuid(puuid: str):
@@ -75,36 +115,42 @@ class PlayerRepository:
     @staticmethod
     async def delete_player(discord_id: int) -> bool:
         """Remove o jogador do banco. Retorna True se existia."""
-        async with get_session() as session:
-            result = await session.execute(select(Player).where(Player.discord_id == discord_id))
-            player = result.scalar_one_or_none()
-            if not player:
-                return False
-            await session.delete(player)
-            return True
+        try:
+            async with get_session() as session:
+                result = await session.execute(select(Player).where(Player.discord_id == discord_id))
+                player = result.scalar_one_or_none()
+                if not player:
+                    return False
+                await session.delete(player)
+                return True
+        finally:
+            player_cache.invalidate(discord_id)
 
     @staticmethod
     async def upsert_player(discord_id: int, riot_data: dict, lane_main: str = None, lane_sec: str = None):
-        async with get_session() as session:
-            result = await session.execute(select(Player).where(Player.discord_id == discord_id))
-            player = result.scalar_one_or_none()
-            if player:
-                player.riot_puuid = riot_data.get('puuid')
-                player.riot_name = f"{riot_data.get('gameName')}#{riot_data.get('tagLine')}"
-                player.riot_icon_id = riot_data.get('profileIconId')
-                if lane_main: player.main_lane = lane_main
-                if lane_sec: player.secondary_lane = lane_sec
-            else:
-                player = Player(
-                    discord_id=discord_id,
-                    riot_puuid=riot_data.get('puuid'),
-                    riot_name=f"{riot_data.get('gameName')}#{riot_data.get('tagLine')}",
-                    riot_icon_id=riot_data.get('profileIconId'),
-                    main_lane=lane_main,
-                    secondary_lane=lane_sec
-                )
-                session.add(player)
-            return player
+        try:
+            async with get_session() as session:
+                result = await session.execute(select(Player).where(Player.discord_id == discord_id))
+                player = result.scalar_one_or_none()
+                if player:
+                    player.riot_puuid = riot_data.get('puuid')
+                    player.riot_name = f"{riot_data.get('gameName')}#{riot_data.get('tagLine')}"
+                    player.riot_icon_id = riot_data.get('profileIconId')
+                    if lane_main: player.main_lane = lane_main
+                    if lane_sec: player.secondary_lane = lane_sec
+                else:
+                    player = Player(
+                        discord_id=discord_id,
+                        riot_puuid=riot_data.get('puuid'),
+                        riot_name=f"{riot_data.get('gameName')}#{riot_data.get('tagLine')}",
+                        riot_icon_id=riot_data.get('profileIconId'),
+                        main_lane=lane_main,
+                        secondary_lane=lane_sec
+                    )
+                    session.add(player)
+                return player
+        finally:
+            player_cache.invalidate(discord_id)
 
     @staticmethod
     async def update_riot_rank(discord_id: int, tier: str, rank: str, lp: int, wins: int = 0, losses: int = 0, calculated_mmr: int = None, queue_type: str = "SOLO"):
@@ -127,58 +173,39 @@ class PlayerRepository:
                 if calculated_mmr is not None:
                     player.mmr = calculated_mmr
                 player.last_rank_update = datetime.utcnow()
+        player_cache.invalidate(discord_id)
 
     @staticmethod
-    async def update_mmr_direct(discord_id: int, new_mmr: int):
-        """Atualiza o MMR interno diretamente (usado após resultado de partida)."""
-        async with get_session() as session:
-            result = await session.execute(select(Player).where(Player.discord_id == discord_id))
-            player = result.scalar_one_or_none()
-            if player:
-                player.mmr = max(0, new_mmr)
-
-    @staticmethod
-    async def update_streak(discord_id: int, won: bool) -> tuple:
+    async def update_riot_ranks(discord_id: int, entries: list, calculated_mmr: int = None):
         """
-        Atualiza a sequência de vitórias/derrotas.
-        Retorna (current_streak, best_streak).
+        Grava Solo/Duo e Flex numa única sessão (entradas no formato da League-V4).
+        Retorna o Player atualizado (desanexado) ou None se não existir.
         """
-        async with get_session() as session:
-            result = await session.execute(select(Player).where(Player.discord_id == discord_id))
-            player = result.scalar_one_or_none()
-            if not player:
-                return 0, 0
-
-            # Garante que campos nunca são None (legado)
-            if player.current_win_streak is None: player.current_win_streak = 0
-            if player.best_win_streak is None: player.best_win_streak = 0
-
-            if won:
-                player.current_win_streak += 1
-                if player.current_win_streak > player.best_win_streak:
-                    player.best_win_streak = player.current_win_streak
-            else:
-                player.current_win_streak = 0
-
-            return player.current_win_streak, player.best_win_streak
-
-    @staticmethod
-    async def increment_mvp(discord_id: int):
-        """Incrementa o contador de MVPs do jogador."""
-        async with get_session() as session:
-            result = await session.execute(select(Player).where(Player.discord_id == discord_id))
-            player = result.scalar_one_or_none()
-            if player:
-                player.mvp_count = (player.mvp_count or 0) + 1
-
-    @staticmethod
-    async def increment_imvp(discord_id: int):
-        """Incrementa o contador de iMVPs do jogador."""
-        async with get_session() as session:
-            result = await session.execute(select(Player).where(Player.discord_id == discord_id))
-            player = result.scalar_one_or_none()
-            if player:
-                player.imvp_count = (player.imvp_count or 0) + 1
+        try:
+            async with get_session() as session:
+                result = await session.execute(select(Player).where(Player.discord_id == discord_id))
+                player = result.scalar_one_or_none()
+                if not player:
+                    return None
+                for entry in entries or []:
+                    if entry.get('queueType') == 'RANKED_SOLO_5x5':
+                        player.solo_tier = entry['tier']
+                        player.solo_rank = entry['rank']
+                        player.solo_lp = entry['leaguePoints']
+                        player.solo_wins = entry['wins']
+                        player.solo_losses = entry['losses']
+                    elif entry.get('queueType') == 'RANKED_FLEX_SR':
+                        player.flex_tier = entry['tier']
+                        player.flex_rank = entry['rank']
+                        player.flex_lp = entry['leaguePoints']
+                        player.flex_wins = entry['wins']
+                        player.flex_losses = entry['losses']
+                if calculated_mmr is not None:
+                    player.mmr = calculated_mmr
+                player.last_rank_update = datetime.utcnow()
+                return player
+        finally:
+            player_cache.invalidate(discord_id)
 
     @staticmethod
     async def get_internal_ranking(limit: int = None):
@@ -190,43 +217,87 @@ class PlayerRepository:
             return result.scalars().all()
 
     @staticmethod
-    async def get_all_players():
-        """Retorna todos os jogadores registrados (para recálculo de MMR em massa)."""
+    async def get_rank_columns():
+        """
+        Apenas as colunas necessárias para o recálculo de MMR em massa (sem montar objetos ORM).
+        Cada linha expõe os mesmos atributos de rank do Player.
+        """
+        async with get_session() as session:
+            result = await session.execute(select(
+                Player.discord_id, Player.riot_name, Player.mmr,
+                Player.solo_tier, Player.solo_rank, Player.solo_lp, Player.solo_wins, Player.solo_losses,
+                Player.flex_tier, Player.flex_rank, Player.flex_lp, Player.flex_wins, Player.flex_losses
+            ))
+            return result.all()
+
+    @staticmethod
+    async def get_lane_preferences() -> dict:
+        """discord_id -> (main_lane, secondary_lane) como strings (None se não definida)."""
+        async with get_session() as session:
+            result = await session.execute(select(Player.discord_id, Player.main_lane, Player.secondary_lane))
+            return {
+                discord_id: (main.value if main else None, secondary.value if secondary else None)
+                for discord_id, main, secondary in result.all()
+            }
+
+    @staticmethod
+    async def bulk_update_mmr(mmr_by_id: dict):
+        """Grava vários MMRs numa única transação (UPDATE em lote pela chave primária)."""
+        if not mmr_by_id:
+            return
+        try:
+            async with get_session() as session:
+                await session.execute(update(Player), [
+                    {'discord_id': discord_id, 'mmr': max(0, mmr)} for discord_id, mmr in mmr_by_id.items()
+                ])
+        finally:
+            for discord_id in mmr_by_id:
+                player_cache.invalidate(discord_id)
+
+    @staticmethod
+    async def prime_cache() -> int:
+        """Pré-carrega o cache com todos os jogadores (entrar na fila não vai ao banco)."""
+        generations = player_cache.generations_snapshot()
         async with get_session() as session:
             result = await session.execute(select(Player))
-            return result.scalars().all()
+            players = result.scalars().all()
+
+        for player in players:
+            player_cache.put(player.discord_id, player, generations.get(player.discord_id, 0))
+        return len(players)
 
 
 # --- REPOSITÓRIO DE PARTIDAS ---
+@timed_repository
 class MatchRepository:
 
     @staticmethod
     async def create_match(guild_id: int, blue_team: list, red_team: list):
         async with get_session() as session:
-            new_match = Match(
-                guild_id=guild_id,
-                status=MatchStatus.IN_PROGRESS,
-                created_at=datetime.utcnow()
-            )
-            session.add(new_match)
-            await session.flush()
+            return await MatchRepository._insert_match(session, guild_id, blue_team, red_team)
 
-            for p in blue_team:
-                session.add(MatchPlayer(
-                    match_id=new_match.id,
-                    player_id=p['id'],
-                    side=TeamSide.BLUE,
-                    mmr_before=p.get('mmr')
-                ))
-            for p in red_team:
+    @staticmethod
+    async def _insert_match(session, guild_id: int, blue_team: list, red_team: list) -> int:
+        """Cria a partida IN_PROGRESS e seus jogadores na sessão recebida (sem commit)."""
+        new_match = Match(
+            guild_id=guild_id,
+            status=MatchStatus.IN_PROGRESS,
+            created_at=datetime.utcnow()
+        )
+        session.add(new_match)
+        await session.flush()
+
+        for side, team in ((TeamSide.BLUE, blue_team), (TeamSide.RED, red_team)):
+            for p in team:
                 session.add(MatchPlayer(
                     match_id=new_match.id,
                     player_id=p['id'],
-                    side=TeamSide.RED,
-                    mmr_before=p.get('mmr')
+                    side=side,
+                    mmr_before=p.get('mmr'),
+                    picked_lane=Lane(p['assigned_lane']) if p.get('assigned_lane') else None
                 ))
 
-            return new_match.id
+        return new_match.id
 
     @staticmethod
     async def get_match_details(match_id: int):
@@ -296,110 +367,223 @@ class MatchRepository:
             }
 
     @staticmethod
-    async def get_player_internal_history(discord_id: int):
-        """Retorna todo o histórico de partidas internas de um jogador."""
+    async def get_player_history_page(discord_id: int, before: tuple = None, limit: int = 10) -> tuple:
+        """
+        Uma página do histórico interno do jogador (mais recentes primeiro), numa única query com join.
+        Paginação por keyset: `before` é o cursor (finished_at, match_id) da última linha da página anterior.
+        Retorna (linhas, cursor_da_próxima_página ou None).
+        """
+        stmt = (
+            select(Match.id, Match.finished_at, Match.winning_side, MatchPlayer.side)
+            .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+            .where(MatchPlayer.player_id == discord_id)
+            .where(Match.status == MatchStatus.FINISHED)
+        )
+        if before:
+            finished_at, match_id = before
+            stmt = stmt.where(or_(
+                Match.finished_at < finished_at,
+                and_(Match.finished_at == finished_at, Match.id < match_id)
+            ))
+        stmt = stmt.order_by(desc(Match.finished_at), desc(Match.id)).limit(limit + 1)
+
         async with get_session() as session:
-            result_mp = await session.execute(
-                select(MatchPlayer)
-                .where(MatchPlayer.player_id == discord_id)
-            )
-            player_entries = result_mp.scalars().all()
-            if not player_entries:
-                return []
+            rows = (await session.execute(stmt)).all()
+
+        history = []
+        for match_id, finished_at, winning_side, p_side in rows[:limit]:
+            history.append({
+                'match_id': match_id,
+                'won': (winning_side == p_side) if winning_side and p_side else None,
+                'side': p_side.value if p_side else None,
+                'finished_at': finished_at,
+            })
+
+        next_cursor = None
+        if len(rows) > limit and history:
+            next_cursor = (history[-1]['finished_at'], history[-1]['match_id'])
+        return history, next_cursor
 
-            match_ids = [mp.match_id for mp in player_entries]
-            player_sides = {mp.match_id: mp.side for mp in player_entries}
+    @staticmethod
+    async def get_h2h_data(discord_id_1: int, discord_id_2: int):
+        """Retorna estatísticas de confronto direto entre dois jogadores (consulta única na tabela de duplas)."""
+        a, b = pair_key(discord_id_1, discord_id_2)
+        async with get_session() as session:
+            stats = await session.get(PlayerPairStats, (a, b))
+
+        if not stats:
+            return {'total': 0, 'as_opponents': 0, 'as_teammates': 0,
+                    'p1_wins': 0, 'p2_wins': 0, 'together_wins': 0, 'together_losses': 0, 'matches': []}
+
+        p1_is_a = discord_id_1 == a
+        match_results = []
+        for match_id, same_team, a_won, finished_at in reversed(json.loads(stats.recent_json or "[]")):
+            p1_won = a_won if p1_is_a or same_team else not a_won
+            match_results.append({
+                'match_id': match_id,
+                'same_team': same_team,
+                'p1_won': p1_won,
+                'p2_won': p1_won if same_team else not p1_won,
+                'finished_at': datetime.fromisoformat(finished_at) if finished_at else None,
+            })
+
+        return {
+            'total': stats.games_together + stats.games_against,
+            'as_opponents': stats.games_against,
+            'as_teammates': stats.games_together,
+            'p1_wins': stats.wins_a_against if p1_is_a else stats.wins_b_against,
+            'p2_wins': stats.wins_b_against if p1_is_a else stats.wins_a_against,
+            'together_wins': stats.wins_together,
+            'together_losses': stats.games_together - stats.wins_together,
+            'matches': match_results,
+        }
 
-            result_matches = await session.execute(
-                select(Match)
-                .where(Match.id.in_(match_ids))
-                .where(Match.status == MatchStatus.FINISHED)
-                .order_by(desc(Match.finished_at))
-            )
-            matches = result_matches.scalars().all()
+    @staticmethod
+    def _apply_pair_result(stats: PlayerPairStats, same_team: bool, a_won: bool, match_id: int, finished_at):
+        """Soma uma partida às estatísticas da dupla (a_won = player_a venceu)."""
+        if same_team:
+            stats.games_together = (stats.games_together or 0) + 1
+            stats.wins_together = (stats.wins_together or 0) + (1 if a_won else 0)
+        else:
+            stats.games_against = (stats.games_against or 0) + 1
+            if a_won:
+                stats.wins_a_against = (stats.wins_a_against or 0) + 1
+            else:
+                stats.wins_b_against = (stats.wins_b_against or 0) + 1
 
-            history = []
-            for match in matches:
-                p_side = player_sides.get(match.id)
-                won = (match.winning_side == p_side) if match.winning_side and p_side else None
-                history.append({
-                    'match_id': match.id,
-                    'won': won,
-                    'side': p_side.value if p_side else None,
-                    'finished_at': match.finished_at,
-                })
-            return history
+        recent = json.loads(stats.recent_json or "[]")
+        recent.append([match_id, same_team, a_won, finished_at.isoformat() if finished_at else None])
+        stats.recent_json = json.dumps(recent[-PAIR_RECENT_LIMIT:])
 
     @staticmethod
-    async def get_h2h_data(discord_id_1: int, discord_id_2: int):
-        """Retorna estatísticas de confronto direto entre dois jogadores."""
-        async with get_session() as session:
-            mp1 = aliased(MatchPlayer)
-            mp2 = aliased(MatchPlayer)
+    def _match_pairs(sides: dict, winning_side: TeamSide):
+        """Gera (a, b, mesmo_time, a_venceu) para todas as duplas de uma partida (sides: id -> TeamSide)."""
+        ids = sorted(sides)
+        for i in range(len(ids)):
+            for j in range(i + 1, len(ids)):
+                a, b = ids[i], ids[j]
+                yield a, b, sides[a] == sides[b], sides[a] == winning_side
 
-            stmt = (
-                select(Match, mp1.side.label('p1_side'), mp2.side.label('p2_side'))
-                .join(mp1, mp1.match_id == Match.id)
-                .join(mp2, mp2.match_id == Match.id)
-                .where(mp1.player_id == discord_id_1)
-                .where(mp2.player_id == discord_id_2)
+    @staticmethod
+    async def _update_pair_stats(session, match: Match, match_players: list):
+        """Atualiza a tabela de duplas com o resultado (dentro da sessão do finish_match)."""
+        sides = {mp.player_id: mp.side for mp in match_players if mp.side}
+        if len(sides) < 2:
+            return
+
+        result = await session.execute(
+            select(PlayerPairStats)
+            .where(PlayerPairStats.player_a.in_(list(sides)))
+            .where(PlayerPairStats.player_b.in_(list(sides)))
+        )
+        existing = {(s.player_a, s.player_b): s for s in result.scalars().all()}
+
+        for a, b, same_team, a_won in MatchRepository._match_pairs(sides, match.winning_side):
+            stats = existing.get((a, b))
+            if stats is None:
+                stats = PlayerPairStats(player_a=a, player_b=b)
+                session.add(stats)
+            MatchRepository._apply_pair_result(stats, same_team, a_won, match.id, match.finished_at)
+
+    @staticmethod
+    async def rebuild_pair_stats() -> int:
+        """Reconstrói a tabela de duplas a partir de todo o histórico (uma transação). Retorna o nº de duplas."""
+        async with get_session() as session:
+            result = await session.execute(
+                select(Match.id, Match.winning_side, Match.finished_at, MatchPlayer.player_id, MatchPlayer.side)
+                .join(MatchPlayer, MatchPlayer.match_id == Match.id)
                 .where(Match.status == MatchStatus.FINISHED)
-                .order_by(desc(Match.finished_at))
+                .order_by(Match.finished_at, Match.id)
             )
-            result = await session.execute(stmt)
-            rows = result.all()
 
-            if not rows:
-                return {'total': 0, 'as_opponents': 0, 'as_teammates': 0,
-                        'p1_wins': 0, 'p2_wins': 0, 'together_wins': 0, 'together_losses': 0, 'matches': []}
+            matches = []
+            for match_id, winning_side, finished_at, player_id, side in result.all():
+                if not matches or matches[-1][0] != match_id:
+                    matches.append((match_id, winning_side, finished_at, {}))
+                if side:
+                    matches[-1][3][player_id] = side
+
+            pairs = {}
+            for match_id, winning_side, finished_at, sides in matches:
+                for a, b, same_team, a_won in MatchRepository._match_pairs(sides, winning_side):
+                    stats = pairs.get((a, b))
+                    if stats is None:
+                        stats = pairs[(a, b)] = PlayerPairStats(player_a=a, player_b=b)
+                    MatchRepository._apply_pair_result(stats, same_team, a_won, match_id, finished_at)
+
+            await session.execute(delete(PlayerPairStats))
+            session.add_all(pairs.values())
+            return len(pairs)
 
-            p1_wins = p2_wins = as_opponents = as_teammates = together_wins = together_losses = 0
-            match_results = []
+    @staticmethod
+    async def ensure_pair_stats() -> int:
+        """
+        Backfill na inicialização: se a tabela de duplas está vazia mas já existem partidas
+        finalizadas (ex.: primeiro deploy após a migração), reconstrói a partir do histórico.
+        Retorna o nº de duplas reconstruídas (0 se não foi preciso).
+        """
+        async with get_session() as session:
+            has_pairs = (await session.execute(select(PlayerPairStats.player_a).limit(1))).first()
+            has_matches = (await session.execute(
+                select(Match.id).where(Match.status == MatchStatus.FINISHED).limit(1)
+            )).first()
+        if has_pairs or not has_matches:
+            return 0
+        return await MatchRepository.rebuild_pair_stats()
 
-            for match, p1_side, p2_side in rows:
-                same_team = (p1_side == p2_side)
-                p1_won = (match.winning_side == p1_side) if match.winning_side else None
-                p2_won = (match.winning_side == p2_side) if match.winning_side else None
+    @staticmethod
+    async def get_best_duos(min_games: int = 3, limit: int = 10) -> list:
+        """Duplas com maior winrate jogando juntas (suavizado), direto da tabela de duplas."""
+        score = (PlayerPairStats.wins_together + 1.0) / (PlayerPairStats.games_together + 2.0)
+        async with get_session() as session:
+            result = await session.execute(
+                select(PlayerPairStats)
+                .where(PlayerPairStats.games_together >= min_games)
+                .order_by(desc(score), desc(PlayerPairStats.games_together))
+                .limit(limit)
+            )
+            return result.scalars().all()
 
-                if same_team:
-                    as_teammates += 1
-                    if p1_won: together_wins += 1
-                    else: together_losses += 1
-                else:
-                    as_opponents += 1
-                    if p1_won: p1_wins += 1
-                    elif p2_won: p2_wins += 1
-
-                match_results.append({
-                    'match_id': match.id,
-                    'same_team': same_team,
-                    'p1_won': p1_won,
-                    'p2_won': p2_won,
-                    'finished_at': match.finished_at,
-                })
+    @staticmethod
+    async def get_rivals(discord_id: int, min_games: int = 2) -> list:
+        """
+        Confrontos do jogador como adversário: [(rival_id, jogos, vitórias, derrotas)]
+        ordenados do pior para o melhor retrospecto (o primeiro é o nêmesis).
+        """
+        async with get_session() as session:
+            result = await session.execute(
+                select(PlayerPairStats)
+                .where(or_(PlayerPairStats.player_a == discord_id, PlayerPairStats.player_b == discord_id))
+                .where(PlayerPairStats.games_against >= min_games)
+            )
+            rows = result.scalars().all()
 
-            return {
-                'total': len(rows),
-                'as_opponents': as_opponents,
-                'as_teammates': as_teammates,
-                'p1_wins': p1_wins,
-                'p2_wins': p2_wins,
-                'together_wins': together_wins,
-                'together_losses': together_losses,
-                'matches': match_results,
-            }
+        rivals = []
+        for s in rows:
+            is_a = s.player_a == discord_id
+            wins = s.wins_a_against if is_a else s.wins_b_against
+            rivals.append((s.player_b if is_a else s.player_a, s.games_against, wins, s.games_against - wins))
+        # Derrotas suavizadas: evita que 1 jogo perdido vire "100% de derrotas"
+        rivals.sort(key=lambda r: ((r[3] + 1) / (r[1] + 2), r[1]), reverse=True)
+        return rivals
 
     @staticmethod
-    async def finish_match(match_id: int, winning_side: str):
+    async def finish_match(match_id: int, winning_side: str) -> tuple:
+        """
+        Registra o resultado numa única transação: V/D, sequências, MMR (rank cached),
+        rating Glicko-2, duplas e agregados de temporada/semana.
+        Retorna (status, streaks) — streaks: discord_id -> sequência atual de vitórias.
+        """
         side_enum = TeamSide.BLUE if winning_side.upper() == 'BLUE' else TeamSide.RED
+        streaks = {}
 
         async with get_session() as session:
             result = await session.execute(select(Match).where(Match.id == match_id))
             match = result.scalar_one_or_none()
 
-            if not match: return "NOT_FOUND"
-            if match.status == MatchStatus.FINISHED: return "ALREADY_FINISHED"
-            if match.status == MatchStatus.CANCELLED: return "ALREADY_CANCELLED"
+            if not match: return "NOT_FOUND", streaks
+            if match.status == MatchStatus.FINISHED: return "ALREADY_FINISHED", streaks
+            if match.status == MatchStatus.CANCELLED: return "ALREADY_CANCELLED", streaks
 
             match.status = MatchStatus.FINISHED
             match.winning_side = side_enum
@@ -408,16 +592,185 @@ class MatchRepository:
             result_players = await session.execute(select(MatchPlayer).where(MatchPlayer.match_id == match_id))
             match_players = result_players.scalars().all()
 
+            player_ids = [mp.player_id for mp in match_players]
+            p_result = await session.execute(select(Player).where(Player.discord_id.in_(player_ids)))
+            players = {p.discord_id: p for p in p_result.scalars().all()}
+
             for mp in match_players:
-                p_result = await session.execute(select(Player).where(Player.discord_id == mp.player_id))
-                player = p_result.scalar_one_or_none()
+                player = players.get(mp.player_id)
                 if player:
+                    streak = player.current_win_streak or 0
                     if mp.side == side_enum:
                         player.wins += 1
+                        streak += 1
+                        player.best_win_streak = max(player.best_win_streak or 0, streak)
                     else:
                         player.losses += 1
+                        streak = 0
+                    player.current_win_streak = streaks[player.discord_id] = streak
 
-            return "SUCCESS"
+                    # MMR recalculado do rank cached (SoloQ, senão Flex); sem rank mantém o atual
+                    new_mmr = MatchMaker.mmr_from_player(player)
+                    if new_mmr is not None:
+                        player.mmr = max(0, new_mmr)
+
+            MatchRepository._apply_ratings(match_players, players, side_enum)
+            await MatchRepository._update_pair_stats(session, match, match_players)
+            await SeasonRepository._update_period_stats(session, match, match_players)
+
+        # V/D alterados: invalida os snapshots após o commit
+        for mp in match_players:
+            player_cache.invalidate(mp.player_id)
+
+        return "SUCCESS", streaks
+
+    @staticmethod
+    def _player_rating(player, mp) -> Rating:
+        """
+        Rating atual do jogador ou, na primeira partida, a semente: o MMR da Riot no momento
+        da partida (mmr_before), igual ao usado pelo replay do histórico.
+        """
+        if player.rating is not None:
+            return Rating(player.rating, player.rating_rd or rating_engine.seed_rd, player.rating_vol or rating_engine.seed_vol)
+        seed = mp.mmr_before
+        if seed is None:
+            seed = MatchMaker.mmr_from_player(player) or player.mmr
+        return rating_engine.seed(seed)
+
+    @staticmethod
+    def _apply_ratings(match_players: list, players: dict, winning_side: TeamSide):
+        """Atualiza o rating Glicko-2 (dentro da sessão do finish_match) e grava os snapshots."""
+        blue = [mp for mp in match_players if mp.side == TeamSide.BLUE and mp.player_id in players]
+        red = [mp for mp in match_players if mp.side == TeamSide.RED and mp.player_id in players]
+        if not blue or not red:
+            return
+
+        before = {mp.player_id: MatchRepository._player_rating(players[mp.player_id], mp) for mp in blue + red}
+        new_blue, new_red = rating_engine.rate_match(
+            [before[mp.player_id] for mp in blue],
+            [before[mp.player_id] for mp in red],
+            blue_won=(winning_side == TeamSide.BLUE)
+        )
+
+        for mp, after in zip(blue + red, new_blue + new_red):
+            old = before[mp.player_id]
+            mp.rating_before = old.rating
+            mp.rating_rd_before = old.rd
+            mp.rating_after = after.rating
+
+            player = players[mp.player_id]
+            player.rating = after.rating
+            player.rating_rd = after.rd
+            player.rating_vol = after.vol
+
+    @staticmethod
+    async def get_rating_history():
+        """
+        Histórico compacto de partidas finalizadas para replay de rating (uma única query).
+        Retorna (matches, seeds, mp_ids):
+        - matches: [(match_id, blue_ids, red_ids, blue_won)] em ordem cronológica
+        - seeds: discord_id -> MMR da primeira partida (mmr_before)
+        - mp_ids: (match_id, discord_id) -> MatchPlayer.id
+        """
+        async with get_session() as session:
+            result = await session.execute(
+                select(
+                    Match.id, Match.winning_side,
+                    MatchPlayer.id, MatchPlayer.player_id, MatchPlayer.side, MatchPlayer.mmr_before
+                )
+                .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+                .where(Match.status == MatchStatus.FINISHED)
+                .order_by(Match.finished_at, Match.id)
+            )
+            rows = result.all()
+
+        matches = []
+        seeds = {}
+        mp_ids = {}
+        current = None
+        for match_id, winning_side, mp_id, player_id, side, mmr_before in rows:
+            if current is None or current[0] != match_id:
+                current = (match_id, [], [], winning_side == TeamSide.BLUE)
+                matches.append(current)
+            (current[1] if side == TeamSide.BLUE else current[2]).append(player_id)
+            mp_ids[(match_id, player_id)] = mp_id
+            if player_id not in seeds and mmr_before is not None:
+                seeds[player_id] = mmr_before
+        return matches, seeds, mp_ids
+
+    @staticmethod
+    async def stream_match_history(batch_size: int = 5000):
+        """
+        Gera lotes de linhas (match_id, blue_won, discord_id, is_blue, mmr_before) de todas as
+        partidas finalizadas em ordem cronológica, sem montar objetos ORM.
+        """
+        async with get_session() as session:
+            result = await session.stream(
+                select(
+                    Match.id, Match.winning_side == TeamSide.BLUE,
+                    MatchPlayer.player_id, MatchPlayer.side == TeamSide.BLUE, MatchPlayer.mmr_before
+                )
+                .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+                .where(Match.status == MatchStatus.FINISHED)
+                .order_by(Match.finished_at, Match.id)
+                .execution_options(yield_per=batch_size)
+            )
+            async for batch in result.partitions():
+                yield batch
+
+    @staticmethod
+    async def apply_rating_replay(ratings: dict, snapshots: dict, mp_ids: dict):
+        """Grava o resultado de um replay completo (jogadores e snapshots) numa única transação."""
+        try:
+            async with get_session() as session:
+                await session.execute(update(Player).values(rating=None, rating_rd=None, rating_vol=None))
+                if ratings:
+                    await session.execute(update(Player), [
+                        {'discord_id': pid, 'rating': r.rating, 'rating_rd': r.rd, 'rating_vol': r.vol}
+                        for pid, r in ratings.items()
+                    ])
+                rows = [
+                    {'id': mp_ids[key], 'rating_before': before, 'rating_rd_before': rd, 'rating_after': after}
+                    for key, (before, rd, after) in snapshots.items() if key in mp_ids
+                ]
+                if rows:
+                    await session.execute(update(MatchPlayer), rows)
+        finally:
+            player_cache.clear()
+
+    @staticmethod
+    async def record_awards(match_id: int, mvp_id: int = None, imvp_id: int = None) -> bool:
+        """
+        Encerra a votação da partida: grava o MVP/iMVP e soma os contadores (jogador,
+        temporada e semana) numa única transação. Idempotente: se a votação já foi
+        encerrada, não faz nada. Retorna True se encerrou agora.
+        """
+        awarded = [pid for pid in (mvp_id, imvp_id) if pid]
+        try:
+            async with get_session() as session:
+                result = await session.execute(select(Match).where(Match.id == match_id))
+                match = result.scalar_one_or_none()
+                if not match or match.poll_closed_at is not None:
+                    return False
+
+                match.poll_closed_at = datetime.utcnow()
+                match.mvp_id = mvp_id
+                match.imvp_id = imvp_id
+                if not awarded:
+                    return True
+                p_result = await session.execute(select(Player).where(Player.discord_id.in_(awarded)))
+                players = {p.discord_id: p for p in p_result.scalars().all()}
+
+                if mvp_id in players:
+                    players[mvp_id].mvp_count = (players[mvp_id].mvp_count or 0) + 1
+                    await SeasonRepository._increment_period_award(session, match_id, mvp_id, "mvps")
+                if imvp_id in players:
+                    players[imvp_id].imvp_count = (players[imvp_id].imvp_count or 0) + 1
+                    await SeasonRepository._increment_period_award(session, match_id, imvp_id, "imvps")
+                return True
+        finally:
+            for pid in awarded:
+                player_cache.invalidate(pid)
 
     @staticmethod
     async def cancel_match(match_id: int):
@@ -433,7 +786,232 @@ class MatchRepository:
             return "SUCCESS"
 
 
+# --- REPOSITÓRIO DE VOTOS (ENQUETES MVP/iMVP) ---
+@timed_repository
+class PollRepository:
+
+    @staticmethod
+    async def set_vote(match_id: int, poll_type: str, voter_id: int, candidate_id: int = None):
+        """Grava (ou troca) o voto do usuário; candidate_id=None remove o voto."""
+        async with get_session() as session:
+            result = await session.execute(
+                select(PollVote).where(
+                    PollVote.match_id == match_id, PollVote.poll_type == poll_type, PollVote.voter_id == voter_id
+                )
+            )
+            vote = result.scalar_one_or_none()
+            if candidate_id is None:
+                if vote:
+                    await session.delete(vote)
+                return
+            if vote is None:
+                vote = PollVote(match_id=match_id, poll_type=poll_type, voter_id=voter_id)
+                session.add(vote)
+            vote.candidate_id = candidate_id
+            vote.voted_at = datetime.utcnow()
+
+    @staticmethod
+    async def get_votes(match_ids: list) -> list:
+        """Votos das partidas: [(match_id, poll_type, voter_id, candidate_id)]."""
+        if not match_ids:
+            return []
+        async with get_session() as session:
+            result = await session.execute(
+                select(PollVote.match_id, PollVote.poll_type, PollVote.voter_id, PollVote.candidate_id)
+                .where(PollVote.match_id.in_(match_ids))
+            )
+            return result.all()
+
+
+# --- REPOSITÓRIO DE TEMPORADAS ---
+@timed_repository
+class SeasonRepository:
+
+    @staticmethod
+    def week_label(when: datetime) -> str:
+        """Semana ISO de uma data (ex.: '2025-W07')."""
+        year, week, _ = when.isocalendar()
+        return f"{year}-W{week:02d}"
+
+    @staticmethod
+    def week_key(guild_id: int, when: datetime) -> str:
+        """period_key da semana, por servidor (ex.: '123456789:2025-W07'). Temporadas já são por servidor pelo id."""
+        return f"{guild_id}:{SeasonRepository.week_label(when)}"
+
+    @staticmethod
+    async def get_active_season(guild_id: int):
+        async with get_session() as session:
+            result = await session.execute(
+                select(Season).where(Season.guild_id == guild_id, Season.ends_at.is_(None))
+                .order_by(desc(Season.id)).limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_seasons(guild_id: int) -> list:
+        async with get_session() as session:
+            result = await session.execute(select(Season).where(Season.guild_id == guild_id).order_by(Season.id))
+            return result.scalars().all()
+
+    @staticmethod
+    async def start_season(guild_id: int, name: str) -> Season:
+        """Encerra a temporada ativa (se houver) e abre uma nova a partir de agora."""
+        now = datetime.utcnow()
+        async with get_session() as session:
+            await session.execute(
+                update(Season).where(Season.guild_id == guild_id, Season.ends_at.is_(None)).values(ends_at=now)
+            )
+            season = Season(guild_id=guild_id, name=name, starts_at=now)
+            session.add(season)
+            await session.flush()
+            return season
+
+    @staticmethod
+    async def _period_keys(session, guild_id: int, when: datetime) -> list:
+        """Períodos [(tipo, chave)] de uma partida finalizada em `when`."""
+        keys = [("week", SeasonRepository.week_key(guild_id, when))]
+        result = await session.execute(
+            select(Season.id)
+            .where(Season.guild_id == guild_id, Season.starts_at <= when)
+            .where(or_(Season.ends_at.is_(None), Season.ends_at > when))
+            .order_by(desc(Season.id)).limit(1)
+        )
+        season_id = result.scalar_one_or_none()
+        if season_id is not None:
+            keys.append(("season", str(season_id)))
+        return keys
+
+    @staticmethod
+    async def _load_period_rows(session, keys: list, player_ids: list) -> dict:
+        """Linhas de PlayerPeriodStats existentes para (períodos x jogadores), criando as que faltam."""
+        rows = {}
+        for period_type, period_key in keys:
+            result = await session.execute(
+                select(PlayerPeriodStats)
+                .where(PlayerPeriodStats.period_type == period_type, PlayerPeriodStats.period_key == period_key)
+                .where(PlayerPeriodStats.player_id.in_(player_ids))
+            )
+            for stats in result.scalars().all():
+                rows[(period_type, period_key, stats.player_id)] = stats
+            for pid in player_ids:
+                if (period_type, period_key, pid) not in rows:
+                    stats = PlayerPeriodStats(period_type=period_type, period_key=period_key, player_id=pid,
+                                              wins=0, losses=0, mvps=0, imvps=0, rating_delta=0.0)
+                    session.add(stats)
+                    rows[(period_type, period_key, pid)] = stats
+        return rows
+
+    @staticmethod
+    def _apply_match(stats: PlayerPeriodStats, won: bool, mp):
+        if won:
+            stats.wins += 1
+        else:
+            stats.losses += 1
+        if mp.rating_before is not None and mp.rating_after is not None:
+            stats.rating_delta += mp.rating_after - mp.rating_before
+
+    @staticmethod
+    async def _update_period_stats(session, match: Match, match_players: list):
+        """Soma o resultado à temporada e à semana de cada jogador (dentro da sessão do finish_match)."""
+        players = [mp for mp in match_players if mp.side]
+        if not players:
+            return
+        keys = await SeasonRepository._period_keys(session, match.guild_id, match.finished_at)
+        rows = await SeasonRepository._load_period_rows(session, keys, [mp.player_id for mp in players])
+        for period_type, period_key in keys:
+            for mp in players:
+                SeasonRepository._apply_match(rows[(period_type, period_key, mp.player_id)], mp.side == match.winning_side, mp)
+
+    @staticmethod
+    async def _increment_period_award(session, match_id: int, discord_id: int, field: str):
+        """Soma um MVP/iMVP ('mvps'/'imvps') aos períodos da partida votada."""
+        result = await session.execute(select(Match.guild_id, Match.finished_at).where(Match.id == match_id))
+        row = result.one_or_none()
+        if not row or not row.finished_at:
+            return
+        keys = await SeasonRepository._period_keys(session, row.guild_id, row.finished_at)
+        rows = await SeasonRepository._load_period_rows(session, keys, [discord_id])
+        for stats in rows.values():
+            setattr(stats, field, (getattr(stats, field) or 0) + 1)
+
+    @staticmethod
+    async def rebuild_period_stats() -> int:
+        """
+        Reconstrói temporadas/semanas a partir do histórico numa única passada (uma transação).
+        MVP/iMVP vêm de matches.mvp_id/imvp_id; partidas antigas não têm esse registro, então
+        cada período fica com o maior valor entre o já contado e o recontado.
+        Retorna o nº de linhas geradas.
+        """
+        async with get_session() as session:
+            seasons = {}
+            for season in (await session.execute(select(Season).order_by(Season.starts_at))).scalars().all():
+                seasons.setdefault(season.guild_id, []).append(season)
+
+            awards = {
+                (s.period_type, s.period_key, s.player_id): (s.mvps or 0, s.imvps or 0)
+                for s in (await session.execute(select(PlayerPeriodStats))).scalars().all()
+            }
+
+            result = await session.execute(
+                select(
+                    Match.guild_id, Match.finished_at, Match.winning_side, Match.mvp_id, Match.imvp_id,
+                    MatchPlayer.player_id, MatchPlayer.side, MatchPlayer.rating_before, MatchPlayer.rating_after
+                )
+                .join(MatchPlayer, MatchPlayer.match_id == Match.id)
+                .where(Match.status == MatchStatus.FINISHED, Match.finished_at.is_not(None))
+                .order_by(Match.finished_at, Match.id)
+            )
+
+            rows = {}
+            for guild_id, finished_at, winning_side, mvp_id, imvp_id, player_id, side, rating_before, rating_after in result.all():
+                if not side:
+                    continue
+                keys = [("week", SeasonRepository.week_key(guild_id, finished_at))]
+                for season in seasons.get(guild_id, []):
+                    if season.starts_at <= finished_at and (season.ends_at is None or season.ends_at > finished_at):
+                        keys.append(("season", str(season.id)))
+                for period_type, period_key in keys:
+                    key = (period_type, period_key, player_id)
+                    stats = rows.get(key)
+                    if stats is None:
+                        stats = rows[key] = PlayerPeriodStats(
+                            period_type=period_type, period_key=period_key, player_id=player_id,
+                            wins=0, losses=0, mvps=0, imvps=0, rating_delta=0.0
+                        )
+                    if side == winning_side:
+                        stats.wins += 1
+                    else:
+                        stats.losses += 1
+                    if rating_before is not None and rating_after is not None:
+                        stats.rating_delta += rating_after - rating_before
+                    stats.mvps += 1 if player_id == mvp_id else 0
+                    stats.imvps += 1 if player_id == imvp_id else 0
+
+            for key, stats in rows.items():
+                mvps, imvps = awards.get(key, (0, 0))
+                stats.mvps = max(stats.mvps, mvps)
+                stats.imvps = max(stats.imvps, imvps)
+
+            await session.execute(delete(PlayerPeriodStats))
+            session.add_all(rows.values())
+            return len(rows)
+
+    @staticmethod
+    async def get_period_ranking(period_type: str, period_key: str, limit: int = 10) -> list:
+        """Top do período pelo índice (period_type, period_key, wins DESC, losses)."""
+        async with get_session() as session:
+            result = await session.execute(
+                select(PlayerPeriodStats, Player.riot_name)
+                .join(Player, Player.discord_id == PlayerPeriodStats.player_id)
+                .where(PlayerPeriodStats.period_type == period_type, PlayerPeriodStats.period_key == period_key)
+                .order_by(desc(PlayerPeriodStats.wins), PlayerPeriodStats.losses)
+                .limit(limit)
+            )
+            return result.all()
+
+
 # --- REPOSITÓRIO DO LOBBY ---
+@timed_repository
 class LobbyRepository:
 
     @staticmethod
@@ -446,9 +1024,10 @@ class LobbyRepository:
             queue_serializable = []
             for p in queue:
                 entry = dict(p)
-                # Garante que main_lane é string serializável
-                if hasattr(entry.get('main_lane'), 'value'):
-                    entry['main_lane'] = entry['main_lane'].value
+                # Garante que as rotas são strings serializáveis
+                for key in ('main_lane', 'secondary_lane'):
+                    if hasattr(entry.get(key), 'value'):
+                        entry[key] = entry[key].value
                 queue_serializable.append(entry)
 
             if state:
@@ -489,7 +1068,147 @@ class LobbyRepository:
                 state.updated_at = datetime.utcnow()
 
 
+
+# --- REPOSITÓRIO DA MONTAGEM DE PARTIDA ---
+@timed_repository
+class SetupRepository:
+
+    @staticmethod
+    async def save(guild_id: int, stage: str, state: dict, channel_id: int = None, message_id: int = None):
+        """Grava a etapa atual da montagem (substitui a anterior do servidor)."""
+        async with get_session() as session:
+            setup = await session.get(MatchSetupState, guild_id)
+            if not setup:
+                setup = MatchSetupState(guild_id=guild_id)
+                session.add(setup)
+            setup.stage = stage
+            setup.state_json = json.dumps(state)
+            if channel_id:
+                setup.channel_id = channel_id
+            if message_id:
+                setup.message_id = message_id
+            setup.updated_at = datetime.utcnow()
+
+    @staticmethod
+    async def get(guild_id: int):
+        async with get_session() as session:
+            setup = await session.get(MatchSetupState, guild_id)
+            if not setup:
+                return None
+            return {
+                'stage': setup.stage,
+                'state': json.loads(setup.state_json or '{}'),
+                'channel_id': setup.channel_id,
+                'message_id': setup.message_id,
+            }
+
+    @staticmethod
+    async def clear(guild_id: int):
+        """Remove a montagem do servidor, incluindo o draft (partida criada ou processo cancelado)."""
+        async with get_session() as session:
+            await SetupRepository._delete(session, guild_id)
+
+    @staticmethod
+    async def _delete(session, guild_id: int):
+        await session.execute(delete(MatchSetupState).where(MatchSetupState.guild_id == guild_id))
+        await session.execute(delete(DraftPlayer).where(DraftPlayer.guild_id == guild_id))
+        await session.execute(delete(DraftSession).where(DraftSession.guild_id == guild_id))
+
+
+# --- REPOSITÓRIO DO DRAFT ---
+@timed_repository
+class DraftRepository:
+    """
+    Persistência do draft por capitães: uma linha em draft_sessions e uma por participante
+    em draft_players. Cada pick é um UPDATE de duas linhas (pick_no do jogador e o contador
+    da sessão), sem regravar o estado inteiro.
+    """
+
+    @staticmethod
+    async def start(guild_id: int, draft: DraftState):
+        """Grava o draft recém-criado (substitui qualquer draft anterior do servidor)."""
+        async with get_session() as session:
+            await session.execute(delete(DraftPlayer).where(DraftPlayer.guild_id == guild_id))
+            await session.execute(delete(DraftSession).where(DraftSession.guild_id == guild_id))
+            session.add(DraftSession(
+                guild_id=guild_id,
+                cap_blue_id=draft.cap_blue_id,
+                cap_red_id=draft.cap_red_id,
+                first_pick_side=draft.first_pick_side,
+                pick_count=len(draft.picks),
+                started_at=datetime.utcnow(),
+                updated_at=datetime.utcnow()
+            ))
+            pick_numbers = {pid: i for i, pid in enumerate(draft.picks)}
+            for slot, p in enumerate(draft.players.values()):
+                session.add(DraftPlayer(
+                    guild_id=guild_id,
+                    discord_id=p['id'],
+                    slot=slot,
+                    name=p['name'],
+                    mmr=p.get('mmr') or 0,
+                    main_lane=p.get('main_lane'),
+                    secondary_lane=p.get('secondary_lane'),
+                    rating=p.get('rating'),
+                    streak=p.get('streak') or 0,
+                    pick_no=pick_numbers.get(p['id'])
+                ))
+
+    @staticmethod
+    async def get(guild_id: int):
+        """Reconstrói o DraftState do servidor (ou None se não houver draft)."""
+        async with get_session() as session:
+            draft = await session.get(DraftSession, guild_id)
+            if not draft:
+                return None
+            result = await session.execute(
+                select(DraftPlayer).where(DraftPlayer.guild_id == guild_id).order_by(DraftPlayer.slot)
+            )
+            rows = result.scalars().all()
+
+        players = [
+            {'id': r.discord_id, 'name': r.name, 'mmr': r.mmr, 'main_lane': r.main_lane,
+             'secondary_lane': r.secondary_lane, 'rating': r.rating, 'streak': r.streak}
+            for r in rows
+        ]
+        picks = [r.discord_id for r in sorted((r for r in rows if r.pick_no is not None), key=lambda r: r.pick_no)]
+        return DraftState(players, draft.cap_blue_id, draft.cap_red_id, draft.first_pick_side, picks)
+
+    @staticmethod
+    async def record_pick(guild_id: int, draft: DraftState):
+        """
+        Grava o último pick aplicado em `draft`. Se ele concluiu o draft, cria a partida e
+        remove a montagem na mesma transação (um restart nunca deixa um draft concluído sem
+        partida, nem uma partida com o draft ainda aberto).
+        Retorna (status, match_id): "PICKED", "COMPLETE" ou "STALE" (pick já gravado por outro clique).
+        """
+        pick_no = len(draft.picks) - 1
+        async with get_session() as session:
+            result = await session.execute(
+                update(DraftSession)
+                .where(DraftSession.guild_id == guild_id, DraftSession.pick_count == pick_no)
+                .values(pick_count=pick_no + 1, updated_at=datetime.utcnow())
+            )
+            if result.rowcount != 1:
+                return "STALE", None
+            await session.execute(
+                update(DraftPlayer)
+                .where(DraftPlayer.guild_id == guild_id, DraftPlayer.discord_id == draft.picks[-1])
+                .values(pick_no=pick_no)
+            )
+
+            if draft.phase is not DraftPhase.COMPLETE:
+                return "PICKED", None
+
+            real_blue = [p for p in draft.team_blue if p['id'] > 0]
+            real_red = [p for p in draft.team_red if p['id'] > 0]
+            match_id = await MatchRepository._insert_match(session, guild_id, real_blue, real_red)
+            await SetupRepository._delete(session, guild_id)
+            return "COMPLETE", match_id
+
+
 # --- REPOSITÓRIO DA COMUNIDADE ---
+@timed_repository
 class CommunityRepository:
 
     @staticmethod
@@ -567,6 +1286,7 @@ class CommunityRepository:
 
 
 # --- REPOSITÓRIO DE EVENTOS AGENDADOS ---
+@timed_repository
 class EventRepository:
 
     @staticmethod
@@ -691,7 +1411,7 @@ class EventRepository:
         async with get_session() as session:
             result = await session.execute(
                 select(ScheduledEvent)
-                .where(ScheduledEvent.status == EventStatus.STARTED)
+                .where(ScheduledEvent.status == EventStatus.OPEN)
                 .options(selectinload(ScheduledEvent.players))
             )
             events = result.scalars().all()
@@ -715,3 +1435,79 @@ class EventRepository:
                     e.notified_24h = True
                 elif notification_type == '30min':
                     e.notified_30min = True
+
+
+# --- REPOSITÓRIO DE TAREFAS AGENDADAS ---
+@timed_repository
+class JobRepository:
+
+    @staticmethod
+    def _to_dict(job: ScheduledJob) -> dict:
+        return {
+            'id': job.id, 'kind': job.kind, 'key': job.key, 'run_at': job.run_at,
+            'payload': json.loads(job.payload_json or '{}'), 'attempts': job.attempts or 0,
+        }
+
+    @staticmethod
+    async def schedule(kind: str, key: str, run_at: datetime, payload: dict = None, ensure: bool = False) -> dict | None:
+        """
+        Agenda (ou reagenda) a tarefa identificada por `key`.
+        Uma tarefa já concluída não é recriada: retorna None nesse caso.
+        Com `ensure`, uma tarefa existente fica como está (tentativas, FAILED/CANCELLED);
+        retorna a linha se ainda estiver pendente, senão None.
+        """
+        async with get_session() as session:
+            result = await session.execute(select(ScheduledJob).where(ScheduledJob.key == key))
+            job = result.scalar_one_or_none()
+            if job and ensure:
+                return JobRepository._to_dict(job) if job.status == JobStatus.PENDING else None
+            if job and job.status == JobStatus.DONE:
+                return None
+            if not job:
+                job = ScheduledJob(key=key)
+                session.add(job)
+            job.kind = kind
+            job.run_at = run_at
+            job.payload_json = json.dumps(payload or {})
+            job.status = JobStatus.PENDING
+            job.attempts = 0
+            job.last_error = None
+            await session.flush()
+            return JobRepository._to_dict(job)
+
+    @staticmethod
+    async def get_pending(kind: str = None) -> list:
+        async with get_session() as session:
+            stmt = select(ScheduledJob).where(ScheduledJob.status == JobStatus.PENDING)
+            if kind:
+                stmt = stmt.where(ScheduledJob.kind == kind)
+            result = await session.execute(stmt.order_by(ScheduledJob.run_at))
+            return [JobRepository._to_dict(job) for job in result.scalars().all()]
+
+    @staticmethod
+    async def complete(job_id: int):
+        async with get_session() as session:
+            await session.execute(update(ScheduledJob).where(ScheduledJob.id == job_id).values(status=JobStatus.DONE))
+
+    @staticmethod
+    async def retry(job_id: int, error: str, run_at: datetime, give_up: bool = False):
+        """Registra a falha; reagenda para `run_at` ou marca como FAILED se `give_up`."""
+        async with get_session() as session:
+            await session.execute(
+                update(ScheduledJob).where(ScheduledJob.id == job_id).values(
+                    attempts=ScheduledJob.attempts + 1,
+                    last_error=error[:500],
+                    run_at=run_at,
+                    status=JobStatus.FAILED if give_up else JobStatus.PENDING,
+                )
+            )
+
+    @staticmethod
+    async def cancel(key: str) -> bool:
+        async with get_session() as session:
+            result = await session.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.key == key, ScheduledJob.status == JobStatus.PENDING)
+                .values(status=JobStatus.CANCELLED)
+            )
+            return result.rowcount > 0
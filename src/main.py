@@ -3,18 +3,33 @@ import os
 import asyncio
 import logging
 import sys # Adicionado para manipulação de encerramento
+import time
 from discord.ext import commands
 from dotenv import load_dotenv
+from src.services.discord_http import http_budget
+from src.services.metrics import registry, metrics_server
+from src.services.watchdog import loop_watchdog
+from src.services.tracing import tracer, install_view_tracing
+from src.utils.log import setup_logging
 
 # Carregamento de variáveis de ambiente
 load_dotenv()
 
 # --- Configuração de Log ---
-logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"),
-                    format='%(levelname)s:%(name)s:%(message)s')
+# Root logger -> fila -> thread do QueueListener (formatação e escrita fora do event loop)
+log_listener = setup_logging()
 logger = logging.getLogger("main")
 # --------------------------
 
+# Endpoint de métricas (formato Prometheus). METRICS_PORT=0 desliga.
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+# Episódios de event loop travado (pilhas amostradas), arquivo rotativo
+WATCHDOG_LOG = os.getenv("WATCHDOG_LOG", "data/slow_callbacks.log")
+
+LISTENER_SECONDS = registry.histogram(
+    "gateway_listener_seconds", "Tempo de cada listener por evento do gateway", ("event", "listener"))
+
 # Configuração de Intents (mantidas e necessárias para on_message e presenças)
 intents = discord.Intents.default()
 intents.message_content = True
@@ -27,8 +42,13 @@ class RobustBot(commands.Bot):
             command_prefix=".",
             intents=intents,
             help_command=None,
-            application_id=os.getenv("APP_ID")
+            application_id=os.getenv("APP_ID"),
+            # Conta cada requisição HTTP real (inclui respostas de interação e 429s)
+            http_trace=http_budget.trace_config()
         )
+        # Latência ponta a ponta por comando (.lentos)
+        self.before_invoke(self._trace_command_start)
+        self.after_invoke(self._trace_command_end)
 
     async def setup_hook(self):
         # NOTA: Importamos a config e o init_db AQUI para evitar problemas de importação circular
@@ -40,9 +60,19 @@ class RobustBot(commands.Bot):
             sys.exit(1) # Sai se não conseguir importar a base de dados
             
         logger.info("--- Iniciando Setup ---")
+        # Métricas e prioridade das chamadas REST (.stats)
+        http_budget.install(self)
+        install_view_tracing()
+        registry.add_collector(http_budget.collect)
         await init_db()
         logger.info("Banco de Dados conectado.")
 
+        # Estatísticas por dupla (.h2h/.duplas/.nemesis): preenche a partir do histórico se ainda vazia
+        from src.database.repositories import MatchRepository
+        rebuilt = await MatchRepository.ensure_pair_stats()
+        if rebuilt:
+            logger.info(f"Estatísticas de duplas reconstruídas do histórico ({rebuilt} dupla(s)).")
+
         # Carregar Cogs
         for filename in os.listdir("./src/cogs"):
             if filename.endswith(".py") and filename != "__init__.py":
@@ -52,8 +82,55 @@ class RobustBot(commands.Bot):
                 except Exception as e:
                     logger.error(f"FALHA ao carregar {filename}: {e}")
 
+        # Agendador persistente: recarrega as tarefas pendentes depois que os cogs registraram seus handlers
+        from src.services.scheduler import scheduler
+        await scheduler.start(self)
+        logger.info(f"Agendador iniciado ({scheduler.pending()} tarefa(s) pendente(s)).")
+        registry.gauge("scheduler_pending_jobs", "Tarefas pendentes no agendador persistente").set_function(scheduler.pending)
+
+        if METRICS_PORT:
+            try:
+                await metrics_server.start(METRICS_HOST, METRICS_PORT)
+                logger.info(f"Métricas em http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+            except OSError as e:
+                logger.error(f"Não foi possível abrir o endpoint de métricas: {e}")
+
+        if loop_watchdog.threshold > 0:
+            loop_watchdog.start(WATCHDOG_LOG)
+            logger.info(f"Vigia do event loop ativa (limite {loop_watchdog.threshold * 1000:.0f}ms, log em {WATCHDOG_LOG}).")
+
         logger.info("--- Setup Finalizado ---")
 
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        # Mede cada listener (on_message do Zoeira, do Comunidade...) separadamente
+        started = time.perf_counter()
+        listener = getattr(coro, "__qualname__", event_name)
+        try:
+            with loop_watchdog.attribute(f"listener:{listener}"):
+                await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            LISTENER_SECONDS.observe(time.perf_counter() - started, event=event_name,
+                                     listener=listener)
+
+    async def invoke(self, ctx):
+        # Atribui travamentos do event loop ao comando em execução
+        label = f"comando:{ctx.command.qualified_name}" if ctx.command else "comando:?"
+        with loop_watchdog.attribute(label):
+            await super().invoke(ctx)
+
+    async def _trace_command_start(self, ctx):
+        ctx.trace_token = tracer.begin(f"comando:{ctx.command.qualified_name}")
+
+    async def _trace_command_end(self, ctx):
+        token = getattr(ctx, "trace_token", None)
+        if token is not None:
+            tracer.end(token, ok=not ctx.command_failed)
+
+    async def close(self):
+        loop_watchdog.stop()
+        await metrics_server.stop()
+        await super().close()
+
     async def on_ready(self):
         logger.info(f'Bot Online! Logado como: {self.user}')
 
@@ -0,0 +1,353 @@
+import heapq
+from bisect import bisect_left
+from itertools import combinations
+
+
+# Rotas jogáveis, na ordem de exibição
+LANES = ('TOP', 'JUNGLE', 'MID', 'ADC', 'SUPPORT')
+
+# Máscaras de rotas agrupadas pela quantidade de bits ligados (usado na DP de atribuição)
+_MASKS_BY_SIZE = [[m for m in range(1 << len(LANES)) if bin(m).count('1') == k] for k in range(len(LANES) + 1)]
+
+
+# --- OBJETIVOS ---
+# Um objetivo recebe (blue, red) e retorna um score: quanto MENOR, mais justo.
+
+def mmr_difference(blue: list, red: list) -> float:
+    """Objetivo padrão: diferença absoluta entre a soma de MMR dos dois times."""
+    return abs(sum(p['mmr'] for p in blue) - sum(p['mmr'] for p in red))
+
+
+def average_difference(blue: list, red: list) -> float:
+    """Diferença entre as médias de MMR (útil quando os times têm tamanhos diferentes)."""
+    avg_blue = sum(p['mmr'] for p in blue) / len(blue) if blue else 0
+    avg_red = sum(p['mmr'] for p in red) / len(red) if red else 0
+    return abs(avg_blue - avg_red)
+
+
+class LaneAwareObjective:
+    """
+    Objetivo conjunto (divisão de times x atribuição de rotas).
+    Score = diferença de MMR + lane_weight * (custo de rotas do Blue + custo do Red),
+    onde o custo de cada time é a atribuição jogador→rota de custo MÍNIMO
+    (main = 0, secundária = 1, FILL = 1, fora das preferências = 3).
+
+    A atribuição ótima é resolvida por DP em bitmask sobre as 5 rotas
+    (~80 transições por time), com cache por time: os 252 times possíveis de um
+    lobby de 10 custam poucos milissegundos no total.
+    """
+
+    MAIN_COST = 0
+    SECONDARY_COST = 1
+    FILL_COST = 1
+    OFF_ROLE_COST = 3
+
+    def __init__(self, lane_weight: int = 100):
+        # 100 pontos de soma de MMR (= 20 de média num 5v5) por ponto de penalidade
+        self.lane_weight = lane_weight
+        self._team_cache = {}
+        self._player_cache = {}
+
+    def __call__(self, blue: list, red: list) -> float:
+        lane_cost = self.team_cost(blue)[0] + self.team_cost(red)[0]
+        return mmr_difference(blue, red) + self.lane_weight * lane_cost
+
+    def player_costs(self, player: dict) -> list:
+        """Custo do jogador em cada rota de LANES."""
+        main = (player.get('main_lane') or 'FILL').upper()
+        secondary = (player.get('secondary_lane') or '').upper()
+        costs = []
+        for lane in LANES:
+            if lane == main:
+                costs.append(self.MAIN_COST)
+            elif lane == secondary:
+                costs.append(self.SECONDARY_COST)
+            elif main == 'FILL' or secondary == 'FILL':
+                costs.append(self.FILL_COST)
+            else:
+                costs.append(self.OFF_ROLE_COST)
+        return costs
+
+    def team_cost(self, team: list) -> tuple:
+        """Retorna (custo_mínimo, {player_id: rota}) para o time (resultado em cache)."""
+        key = frozenset(p['id'] for p in team)
+        cached = self._team_cache.get(key)
+        if cached is None:
+            cached = self._assign(team)
+            self._team_cache[key] = cached
+        return cached
+
+    def assign_lanes(self, team: list) -> dict:
+        return self.team_cost(team)[1]
+
+    def _assign(self, team: list) -> tuple:
+        n = len(team)
+        if n == 0 or n > len(LANES):
+            return 0, {}
+
+        costs = []
+        for p in team:
+            row = self._player_cache.get(p['id'])
+            if row is None:
+                row = self._player_cache[p['id']] = self.player_costs(p)
+            costs.append(row)
+
+        inf = float('inf')
+        # dp[mask] = menor custo atribuindo os primeiros popcount(mask) jogadores às rotas em mask
+        dp = [inf] * (1 << len(LANES))
+        choice = [None] * (1 << len(LANES))
+        dp[0] = 0
+        for i in range(n):
+            row = costs[i]
+            for mask in _MASKS_BY_SIZE[i]:
+                base = dp[mask]
+                for lane_idx in range(len(LANES)):
+                    bit = 1 << lane_idx
+                    if mask & bit:
+                        continue
+                    cost = base + row[lane_idx]
+                    if cost < dp[mask | bit]:
+                        dp[mask | bit] = cost
+                        choice[mask | bit] = lane_idx
+
+        best_mask = min(_MASKS_BY_SIZE[n], key=lambda m: dp[m])
+        assignment = {}
+        mask = best_mask
+        for i in range(n - 1, -1, -1):
+            lane_idx = choice[mask]
+            assignment[team[i]['id']] = LANES[lane_idx]
+            mask &= ~(1 << lane_idx)
+        return dp[best_mask], assignment
+
+
+class TeamBalancer:
+    """
+    Balanceamento exato de times.
+    Com 10 jogadores existem apenas 126 divisões 5x5 distintas, então todas são
+    avaliadas e as `top_k` melhores são retornadas (o admin pode escolher entre elas).
+    O objetivo é plugável. Para pools grandes com o objetivo padrão, a busca
+    usa meet-in-the-middle em vez da enumeração completa.
+    """
+
+    # Acima disso (C(18,9)/2 = 24310 divisões) a enumeração completa fica cara
+    EXHAUSTIVE_LIMIT = 16
+
+    @staticmethod
+    def enumerate_splits(players: list):
+        """
+        Gera todas as divisões distintas em dois times (metade/metade).
+        O jogador de índice 0 fica sempre no Blue, evitando avaliar cada divisão duas vezes (espelho).
+        """
+        n = len(players)
+        team_size = n // 2
+        for combo in combinations(range(1, n), team_size - 1):
+            blue_idx = {0, *combo}
+            blue = [players[i] for i in range(n) if i in blue_idx]
+            red = [players[i] for i in range(n) if i not in blue_idx]
+            yield blue, red
+
+    @staticmethod
+    def best_splits(players: list, top_k: int = 1, objective=None) -> list:
+        """
+        Retorna as `top_k` melhores divisões, ordenadas da mais justa para a menos justa.
+        Cada item: {'blue': [...], 'red': [...], 'score': float, 'avg_diff': int}
+        Se o objetivo atribui rotas (LaneAwareObjective), os jogadores retornados
+        são cópias com a chave 'assigned_lane'.
+        """
+        if len(players) < 2:
+            return [TeamBalancer._option(list(players), [], 0)]
+
+        if objective is None and len(players) > TeamBalancer.EXHAUSTIVE_LIMIT:
+            splits = TeamBalancer._meet_in_the_middle(players, top_k)
+        else:
+            objective = objective or mmr_difference
+            scored = ((objective(blue, red), blue, red) for blue, red in TeamBalancer.enumerate_splits(players))
+            splits = heapq.nsmallest(top_k, scored, key=lambda s: s[0])
+
+        if hasattr(objective, 'assign_lanes'):
+            splits = [
+                (score, TeamBalancer._with_lanes(blue, objective), TeamBalancer._with_lanes(red, objective))
+                for score, blue, red in splits
+            ]
+
+        return [TeamBalancer._option(blue, red, score) for score, blue, red in splits]
+
+    @staticmethod
+    def _with_lanes(team: list, objective) -> list:
+        """Cópias dos jogadores com 'assigned_lane', ordenadas TOP → SUPPORT."""
+        lanes = objective.assign_lanes(team)
+        annotated = [dict(p, assigned_lane=lanes.get(p['id'])) for p in team]
+        return sorted(annotated, key=lambda p: LANES.index(p['assigned_lane']) if p['assigned_lane'] else len(LANES))
+
+    @staticmethod
+    def _option(blue: list, red: list, score: float) -> dict:
+        return {
+            'blue': blue,
+            'red': red,
+            'score': score,
+            'avg_diff': int(round(average_difference(blue, red))),
+        }
+
+    @staticmethod
+    def _meet_in_the_middle(players: list, top_k: int) -> list:
+        """
+        Minimiza |soma(blue) - soma(red)| sem enumerar todas as divisões.
+        Divide os jogadores em duas metades (L e R); para cada subconjunto de L,
+        busca por bisseção em R o complemento cuja soma chega mais perto do alvo.
+        Custo ~ 2^(n/2) * log em vez de C(n, n/2).
+        """
+        n = len(players)
+        team_size = n // 2
+        total = sum(p['mmr'] for p in players)
+        left_idx = list(range(n // 2))
+        right_idx = list(range(n // 2, n))
+
+        # Subconjuntos de R agrupados por tamanho e ordenados pela soma
+        right_by_size = {}
+        for size in range(0, min(team_size, len(right_idx)) + 1):
+            subsets = sorted(
+                (sum(players[i]['mmr'] for i in combo), combo)
+                for combo in combinations(right_idx, size)
+            )
+            right_by_size[size] = ([s for s, _ in subsets], [c for _, c in subsets])
+
+        candidates = []
+        # O índice 0 está em L e fica sempre no Blue (evita espelhos)
+        for size in range(1, min(team_size, len(left_idx)) + 1):
+            needed = team_size - size
+            if needed not in right_by_size:
+                continue
+            sums, combos = right_by_size[needed]
+            for left_combo in combinations(left_idx[1:], size - 1):
+                left_combo = (0, *left_combo)
+                left_sum = sum(players[i]['mmr'] for i in left_combo)
+                target = total / 2 - left_sum
+                pos = bisect_left(sums, target)
+                for j in range(max(0, pos - top_k), min(len(sums), pos + top_k)):
+                    blue_sum = left_sum + sums[j]
+                    score = abs(total - 2 * blue_sum)
+                    candidates.append((score, left_combo + combos[j]))
+
+        best = heapq.nsmallest(top_k, candidates, key=lambda c: c[0])
+        splits = []
+        for score, blue_combo in best:
+            blue_idx = set(blue_combo)
+            blue = [players[i] for i in range(n) if i in blue_idx]
+            red = [players[i] for i in range(n) if i not in blue_idx]
+            splits.append((score, blue, red))
+        return splits
+
+
+class PoolSelector:
+    """
+    Modo pool: escolhe, de uma fila com 12–20 jogadores, os 10 que geram a partida mais justa.
+
+    Score de um grupo = melhor divisão por MMR + penalidade de dispersão de MMR
+    (diferença entre o maior e o menor) + penalidade de cobertura de rotas.
+    Jogadores com 'priority' (ficaram de fora da última partida) entram obrigatoriamente.
+
+    Enumerar C(20,10) = 184756 grupos x 126 divisões é inviável em tempo de interação,
+    então a busca é local: parte de algumas soluções iniciais e aplica trocas
+    (entra/sai) enquanto houver melhora, usando um score rápido só de somas.
+    Os melhores grupos encontrados são reavaliados com o objetivo completo
+    (ex.: LaneAwareObjective) e o melhor é escolhido.
+    """
+
+    def __init__(self, objective=None, match_size: int = 10, spread_weight: float = 0.25,
+                 coverage_weight: int = 300, max_rounds: int = 50, finalists: int = 30):
+        self.objective = objective or mmr_difference
+        self.match_size = match_size
+        self.spread_weight = spread_weight
+        # Cada rota precisa de 2 jogadores (um por time); vaga descoberta ~ um off-role
+        self.coverage_weight = coverage_weight
+        self.max_rounds = max_rounds
+        self.finalists = finalists
+        self._combos = list(combinations(range(1, match_size), match_size // 2 - 1))
+
+    def select(self, pool: list) -> tuple:
+        """Retorna (selecionados, banco), preservando a ordem original da fila em ambos."""
+        if len(pool) <= self.match_size:
+            return list(pool), []
+
+        forced = [i for i, p in enumerate(pool) if p.get('priority')][:self.match_size]
+        free = [i for i in range(len(pool)) if i not in forced]
+        slots = self.match_size - len(forced)
+
+        seen = {}
+        for start in self._initial_groups(pool, forced, free, slots):
+            self._local_search(pool, start, forced, free, seen)
+
+        finalists = heapq.nsmallest(self.finalists, seen.items(), key=lambda item: item[1])
+        best_group = min(
+            (group for group, _ in finalists),
+            key=lambda group: self._full_score(pool, group)
+        )
+        selected = [p for i, p in enumerate(pool) if i in best_group]
+        bench = [p for i, p in enumerate(pool) if i not in best_group]
+        return selected, bench
+
+    def _initial_groups(self, pool, forced, free, slots):
+        # 1. Ordem de chegada (primeiros da fila)
+        yield frozenset(forced + free[:slots])
+        # 2. Mais próximos da mediana de MMR da fila (menor dispersão)
+        mmrs = sorted(p['mmr'] for p in pool)
+        median = mmrs[len(mmrs) // 2]
+        by_median = sorted(free, key=lambda i: abs(pool[i]['mmr'] - median))
+        yield frozenset(forced + by_median[:slots])
+        # 3. Extremos alternados (força a busca a explorar outra região)
+        by_mmr = sorted(free, key=lambda i: pool[i]['mmr'])
+        alternated = [by_mmr[i // 2] if i % 2 == 0 else by_mmr[-(i // 2) - 1] for i in range(len(by_mmr))]
+        yield frozenset(forced + alternated[:slots])
+
+    def _local_search(self, pool, group, forced, free, seen):
+        current_score = self._fast_score(pool, group, seen)
+        for _ in range(self.max_rounds):
+            best_move = None
+            for out_idx in group:
+                if out_idx in forced:
+                    continue
+                for in_idx in free:
+                    if in_idx in group:
+                        continue
+                    candidate = (group - {out_idx}) | {in_idx}
+                    score = self._fast_score(pool, candidate, seen)
+                    if score < current_score and (best_move is None or score < best_move[0]):
+                        best_move = (score, candidate)
+            if best_move is None:
+                return
+            current_score, group = best_move
+
+    def _fast_score(self, pool, group, seen) -> float:
+        if group in seen:
+            return seen[group]
+
+        members = [pool[i] for i in sorted(group)]
+        mmrs = [p['mmr'] for p in members]
+        total = sum(mmrs)
+        first = mmrs[0]
+        best_diff = min(abs(total - 2 * (first + sum(mmrs[j] for j in combo))) for combo in self._combos)
+        spread = max(mmrs) - min(mmrs)
+
+        score = best_diff + self.spread_weight * spread + self.coverage_weight * self._coverage_gap(members)
+        seen[group] = score
+        return score
+
+    def _coverage_gap(self, members: list) -> int:
+        """Quantas vagas de rota (2 por rota) não têm ninguém que jogue main/secundária nelas."""
+        wildcards = 0
+        coverage = dict.fromkeys(LANES, 0)
+        for p in members:
+            main = (p.get('main_lane') or 'FILL').upper()
+            secondary = (p.get('secondary_lane') or '').upper()
+            if main == 'FILL' or secondary == 'FILL':
+                wildcards += 1
+            for lane in {main, secondary} & coverage.keys():
+                coverage[lane] += 1
+        gap = sum(max(0, 2 - count) for count in coverage.values())
+        return max(0, gap - wildcards)
+
+    def _full_score(self, pool, group) -> float:
+        members = [pool[i] for i in sorted(group)]
+        best = TeamBalancer.best_splits(members, top_k=1, objective=self.objective)[0]
+        spread = max(p['mmr'] for p in members) - min(p['mmr'] for p in members)
+        return best['score'] + self.spread_weight * spread
@@ -0,0 +1,225 @@
+import asyncio
+import contextvars
+import enum
+import re
+import time
+from contextlib import contextmanager
+import aiohttp
+from src.services.metrics import Family
+from src.services.tracing import record_span
+
+# Chamadas LOW simultâneas (re-render do lobby, reações decorativas...)
+LOW_CONCURRENCY = 2
+# Depois de um 429, chamadas LOW esperam esse tempo antes de sair
+RATE_LIMIT_COOLDOWN = 5.0
+
+# IDs e tokens na URL viram placeholders para agrupar por rota (chamadas de interação/webhook)
+_ID_SEGMENT = re.compile(r"/\d{15,22}(?=/|$)")
+_TOKEN_SEGMENT = re.compile(r"/[A-Za-z0-9_\-.]{60,}(?=/|$)")
+_API_PREFIX = re.compile(r"^/api/v\d+")
+
+
+class Priority(enum.IntEnum):
+    LOW = 0        # Cosmético: pode esperar
+    NORMAL = 1
+    CRITICAL = 2   # Confirmação de resultado, criação de partida
+
+
+_priority = contextvars.ContextVar("discord_http_priority", default=Priority.NORMAL)
+_route = contextvars.ContextVar("discord_http_route", default=None)
+
+
+@contextmanager
+def http_priority(level: Priority):
+    """Define a prioridade das chamadas REST feitas dentro do bloco (propaga para tasks criadas nele)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def route_from_url(method: str, url) -> str:
+    """'POST /api/v10/interactions/123.../aW50...' -> 'POST /interactions/{id}/{token}'."""
+    path = _API_PREFIX.sub("", getattr(url, "path", str(url)))
+    path = _TOKEN_SEGMENT.sub("/{token}", _ID_SEGMENT.sub("/{id}", path))
+    return f"{method} {path}"
+
+
+class RouteStats:
+    """Números acumulados de uma rota (método + template do path)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.attempts = 0        # Requisições HTTP reais (inclui as repetidas após 429)
+        self.rate_limited = 0    # Respostas 429
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, ok: bool):
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls, 'errors': self.errors, 'attempts': self.attempts,
+            'rate_limited': self.rate_limited, 'avg_ms': round(self.avg_seconds * 1000, 1),
+            'max_ms': round(self.max_seconds * 1000, 1),
+        }
+
+
+class RequestBudget:
+    """
+    Camada central sobre as chamadas REST do Discord.
+
+    - `install(bot)` envolve `bot.http.request`: mede cada chamada lógica (inclusive a espera
+      nos buckets do discord.py) por rota e aplica a prioridade do contexto.
+    - `trace_config()` (passado como `http_trace` ao bot) vê cada requisição HTTP real, inclusive
+      respostas de interação/webhook, e conta as tentativas e os 429.
+
+    Prioridade: chamadas LOW passam por um semáforo pequeno, esperam enquanto houver chamada
+    CRITICAL em andamento e seguram por RATE_LIMIT_COOLDOWN após um 429. NORMAL e CRITICAL
+    nunca esperam aqui (o discord.py continua cuidando dos buckets).
+    """
+
+    def __init__(self, low_concurrency: int = LOW_CONCURRENCY):
+        self.routes = {}                                  # "PATCH /channels/{channel_id}/messages/{message_id}" -> RouteStats
+        self.by_priority = {p.name: 0 for p in Priority}
+        self.deferred = 0                                 # Chamadas LOW que tiveram de esperar
+        self.last_rate_limit = 0.0
+        self.started_at = time.time()
+        self._critical_inflight = 0
+        self._critical_idle = asyncio.Event()
+        self._critical_idle.set()
+        self._low_gate = asyncio.Semaphore(low_concurrency)
+
+    def stats(self, key: str) -> RouteStats:
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        return stats
+
+    def install(self, bot):
+        """Envolve o HTTPClient do bot (chamar uma vez, no setup_hook)."""
+        original = bot.http.request
+        if getattr(original, "__budgeted__", False):
+            return
+
+        async def request(route, **kwargs):
+            return await self._request(original, route, **kwargs)
+
+        request.__budgeted__ = True
+        bot.http.request = request
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_end)
+        return trace
+
+    async def _on_request_start(self, session, context, params):
+        context.started = time.perf_counter()
+
+    async def _on_request_end(self, session, context, params):
+        routed = _route.get()
+        stats = self.stats(routed or route_from_url(params.method, params.url))
+        stats.attempts += 1
+        status = params.response.status
+        if status == 429:
+            stats.rate_limited += 1
+            self.last_rate_limit = time.monotonic()
+        if routed is None:
+            # Interações/webhooks não passam pelo HTTPClient.request: cada requisição conta como chamada
+            seconds = time.perf_counter() - context.started
+            stats.record(seconds, status < 400)
+            record_span("discord", route_from_url(params.method, params.url), seconds)
+
+    async def _wait_turn(self):
+        waited = False
+        if not self._critical_idle.is_set():
+            waited = True
+            await self._critical_idle.wait()
+        cooldown = RATE_LIMIT_COOLDOWN - (time.monotonic() - self.last_rate_limit)
+        if cooldown > 0:
+            waited = True
+            await asyncio.sleep(cooldown)
+        if waited:
+            self.deferred += 1
+
+    async def _request(self, original, route, **kwargs):
+        priority = _priority.get()
+        self.by_priority[priority.name] += 1
+
+        if priority is Priority.LOW:
+            async with self._low_gate:
+                await self._wait_turn()
+                return await self._timed(original, route, **kwargs)
+
+        if priority is Priority.CRITICAL:
+            self._critical_inflight += 1
+            self._critical_idle.clear()
+            try:
+                return await self._timed(original, route, **kwargs)
+            finally:
+                self._critical_inflight -= 1
+                if self._critical_inflight == 0:
+                    self._critical_idle.set()
+
+        return await self._timed(original, route, **kwargs)
+
+    async def _timed(self, original, route, **kwargs):
+        key = route.key
+        token = _route.set(key)
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = await original(route, **kwargs)
+            ok = True
+            return result
+        finally:
+            _route.reset(token)
+            seconds = time.perf_counter() - started
+            self.stats(key).record(seconds, ok)
+            record_span("discord", key, seconds)
+
+    def top_routes(self, limit: int = 10, sort_by: str = "calls") -> list:
+        return sorted(self.routes.items(), key=lambda kv: getattr(kv[1], sort_by), reverse=True)[:limit]
+
+    def collect(self) -> list:
+        """Exporta os números por rota no formato do endpoint de métricas."""
+        calls = Family("discord_http_calls_total", "counter", "Chamadas REST ao Discord por rota")
+        attempts = Family("discord_http_attempts_total", "counter", "Requisições HTTP reais por rota (inclui repetições após 429)")
+        limited = Family("discord_http_rate_limited_total", "counter", "Respostas 429 por rota")
+        errors = Family("discord_http_errors_total", "counter", "Chamadas REST que falharam por rota")
+        seconds = Family("discord_http_seconds_total", "counter", "Tempo acumulado das chamadas por rota")
+        for key, stats in self.routes.items():
+            calls.add(stats.calls, route=key)
+            attempts.add(stats.attempts, route=key)
+            limited.add(stats.rate_limited, route=key)
+            errors.add(stats.errors, route=key)
+            seconds.add(stats.total_seconds, route=key)
+        by_priority = Family("discord_http_priority_total", "counter", "Chamadas REST por prioridade")
+        for name, count in self.by_priority.items():
+            by_priority.add(count, priority=name)
+        deferred = Family("discord_http_deferred_total", "counter", "Chamadas LOW que esperaram a vez").add(self.deferred)
+        return [calls, attempts, limited, errors, seconds, by_priority, deferred]
+
+    def snapshot(self) -> dict:
+        """Dump completo (JSON) para análise fora do Discord."""
+        return {
+            'uptime_seconds': round(time.time() - self.started_at),
+            'by_priority': dict(self.by_priority),
+            'deferred_low': self.deferred,
+            'routes': {key: stats.to_dict() for key, stats in sorted(self.routes.items())},
+        }
+
+
+# Instância compartilhada (instalada no setup_hook)
+http_budget = RequestBudget()
@@ -0,0 +1,91 @@
+import enum
+
+
+class DraftError(Exception):
+    """Transição inválida do draft (draft concluído, jogador fora do pool...)."""
+
+
+class DraftPhase(enum.Enum):
+    PICKING = "picking"
+    COMPLETE = "complete"
+
+
+class DraftState:
+    """
+    Máquina de estados do draft por capitães.
+
+    PICKING --pick--> PICKING ... --último pick--> COMPLETE
+
+    Os picks alternam entre os lados a partir de `first_pick_side`. Vez, pool e times
+    são derivados de (participantes, capitães, first pick, sequência de picks), então
+    persistir só a ordem dos picks basta para retomar o draft exatamente onde parou.
+    """
+
+    SIDES = ('BLUE', 'RED')
+
+    def __init__(self, players: list, cap_blue_id: int, cap_red_id: int, first_pick_side: str, picks: list = ()):
+        if first_pick_side not in self.SIDES:
+            raise DraftError(f"lado inválido: {first_pick_side}")
+        self.players = {p['id']: p for p in players}   # Ordem original: capitães, depois o pool
+        self.cap_blue_id = cap_blue_id
+        self.cap_red_id = cap_red_id
+        self.first_pick_side = first_pick_side
+        self.picks = []
+        self._picked = set()
+        for player_id in picks:
+            self.pick(player_id)
+
+    @property
+    def phase(self) -> DraftPhase:
+        return DraftPhase.COMPLETE if not self.pool else DraftPhase.PICKING
+
+    def side_for(self, pick_no: int) -> str:
+        """Lado que faz o pick de número `pick_no` (0 = primeiro pick)."""
+        second = 'RED' if self.first_pick_side == 'BLUE' else 'BLUE'
+        return self.first_pick_side if pick_no % 2 == 0 else second
+
+    @property
+    def turn(self):
+        return None if self.phase is DraftPhase.COMPLETE else self.side_for(len(self.picks))
+
+    @property
+    def cap_blue(self) -> dict:
+        return self.players[self.cap_blue_id]
+
+    @property
+    def cap_red(self) -> dict:
+        return self.players[self.cap_red_id]
+
+    @property
+    def picker(self):
+        if self.turn is None:
+            return None
+        return self.cap_blue if self.turn == 'BLUE' else self.cap_red
+
+    @property
+    def pool(self) -> list:
+        captains = (self.cap_blue_id, self.cap_red_id)
+        return [p for pid, p in self.players.items() if pid not in captains and pid not in self._picked]
+
+    def team(self, side: str) -> list:
+        captain = self.cap_blue if side == 'BLUE' else self.cap_red
+        return [captain] + [self.players[pid] for i, pid in enumerate(self.picks) if self.side_for(i) == side]
+
+    @property
+    def team_blue(self) -> list:
+        return self.team('BLUE')
+
+    @property
+    def team_red(self) -> list:
+        return self.team('RED')
+
+    def pick(self, player_id: int) -> str:
+        """Aplica o pick do lado da vez. Retorna o lado que escolheu."""
+        if self.phase is DraftPhase.COMPLETE:
+            raise DraftError("o draft já foi concluído")
+        if player_id in (self.cap_blue_id, self.cap_red_id) or player_id in self._picked or player_id not in self.players:
+            raise DraftError(f"jogador {player_id} não está no pool")
+        side = self.turn
+        self.picks.append(player_id)
+        self._picked.add(player_id)
+        return side
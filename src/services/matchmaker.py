@@ -1,3 +1,6 @@
+from src.services.balancer import TeamBalancer
+
+
 class MatchMaker:
     """
     Responsável pela inteligência de cálculo de MMR e Balanceamento.
@@ -27,8 +30,17 @@ class MatchMaker:
         '': 0
     }
 
-    @staticmethod
-    def calculate_adjusted_mmr(tier: str, rank: str, lp: int, wins: int, losses: int, queue_type: str) -> int:
+    # Peso da Flex em relação à SoloQ
+    FLEX_MULTIPLIER = 0.85
+
+    # K-Factor por quantidade de jogos: (limite_exclusivo, k); acima do último limite vale K_FACTOR_MIN
+    K_FACTOR_LADDER = ((50, 20), (100, 12), (150, 8), (200, 4))
+    K_FACTOR_MIN = 2
+
+    # As constantes acima são lidas via `cls`: uma subclasse com valores diferentes
+    # (ex.: o simulador what-if) reaproveita a mesma fórmula.
+    @classmethod
+    def calculate_adjusted_mmr(cls, tier: str, rank: str, lp: int, wins: int, losses: int, queue_type: str) -> int:
         """
         Calcula o MMR Real.
         Fórmula: ((Base + LP) * PesoFila) + (DiffWinrate * FatorIncerteza)
@@ -37,7 +49,7 @@ class MatchMaker:
         rank_upper = rank.upper()
 
         # 1. Base Score (Elo Visual Puro)
-        tier_score = MatchMaker.TIER_VALUES.get(tier_upper, 1000)
+        tier_score = cls.TIER_VALUES.get(tier_upper, 1000)
 
         # Lógica especial para Mestre+ (onde o Rank é sempre 'I' ou vazio, e a pontuação é o Base + LP)
         if tier_upper in ['MASTER', 'GRANDMASTER', 'CHALLENGER']:
@@ -45,13 +57,13 @@ class MatchMaker:
             base_score = tier_score + lp
         else:
             # Para elos normais (Iron a Diamond)
-            rank_score = MatchMaker.RANK_VALUES.get(rank_upper, 0)
+            rank_score = cls.RANK_VALUES.get(rank_upper, 0)
             # Base + Divisão + LP
             base_score = tier_score + rank_score + lp
 
         # 2. Peso da Fila (Nerf na Flex mantido)
         # Se for Flex, vale 85% do MMR de SoloQ na base
-        queue_multiplier = 0.85 if queue_type == 'RANKED_FLEX_SR' else 1.0
+        queue_multiplier = cls.FLEX_MULTIPLIER if queue_type == 'RANKED_FLEX_SR' else 1.0
         
         total_games = wins + losses
         if total_games == 0:
@@ -62,16 +74,13 @@ class MatchMaker:
         wr_diff = winrate - 50 # Ex: 60% WR -> +10 pontos de diferença
 
         # K-Factor: Escada de estabilidade detalhada
-        if total_games < 50:
-            k_factor = 20 # Smurf/Início: Impacto explosivo
-        elif total_games < 100:
-            k_factor = 12 # Subida Rápida
-        elif total_games < 150:
-            k_factor = 8 # Estabilizando
-        elif total_games < 200:
-            k_factor = 4 # Quase travado
-        else:
-            k_factor = 2 # Hardstuck (>200 jogos): Impacto mínimo do WR
+        # <50 Smurf/Início (explosivo) | <100 Subida Rápida | <150 Estabilizando | <200 Quase travado
+        # Hardstuck (>200 jogos): Impacto mínimo do WR
+        k_factor = cls.K_FACTOR_MIN
+        for limit, k in cls.K_FACTOR_LADDER:
+            if total_games < limit:
+                k_factor = k
+                break
 
         # Bônus ou Penalidade calculado
         bonus = wr_diff * k_factor
@@ -81,28 +90,45 @@ class MatchMaker:
         
         return int(max(0, final_mmr))
 
-    # --- NOVA FUNÇÃO: BALANCEAMENTO DE TIMES ---
+    @classmethod
+    def mmr_from_player(cls, player):
+        """MMR a partir dos ranks cached do Player (prioriza SoloQ, fallback Flex). None se unranked."""
+        if player.solo_tier and player.solo_tier.upper() not in ('UNRANKED', ''):
+            return cls.calculate_adjusted_mmr(
+                player.solo_tier, player.solo_rank, player.solo_lp,
+                player.solo_wins, player.solo_losses, 'RANKED_SOLO_5x5'
+            )
+        if player.flex_tier and player.flex_tier.upper() not in ('UNRANKED', ''):
+            return cls.calculate_adjusted_mmr(
+                player.flex_tier, player.flex_rank, player.flex_lp,
+                player.flex_wins, player.flex_losses, 'RANKED_FLEX_SR'
+            )
+        return None
+
+    @classmethod
+    def bulk_mmr(cls, rows) -> tuple:
+        """
+        Recalcula o MMR de várias linhas de rank de uma vez.
+        Retorna (changes, skipped): changes = [(discord_id, nome, mmr_antigo, mmr_novo)] apenas
+        para quem mudou; skipped = quantidade de jogadores sem rank.
+        """
+        changes = []
+        skipped = 0
+        for row in rows:
+            new_mmr = cls.mmr_from_player(row)
+            if new_mmr is None:
+                skipped += 1
+                continue
+            if new_mmr != row.mmr:
+                changes.append((row.discord_id, row.riot_name, row.mmr, new_mmr))
+        return changes, skipped
+
+    # --- BALANCEAMENTO DE TIMES ---
     @staticmethod
-    def balance_teams(players: list):
+    def balance_options(players: list, top_k: int = 3, objective=None) -> list:
         """
-        Recebe uma lista de 10 dicionários {'id': ..., 'mmr': ..., 'name': ...}
-        Retorna (blue_team, red_team) balanceados por MMR.
+        Retorna as `top_k` melhores divisões (da mais justa para a menos justa),
+        para que o admin possa escolher entre alternativas.
+        Cada item: {'blue': [...], 'red': [...], 'score': float, 'avg_diff': int}
         """
-        # 1. Ordena do maior MMR para o menor
-        sorted_players = sorted(players, key=lambda x: x['mmr'], reverse=True)
-        
-        blue = []
-        red = []
-        
-        # 2. Distribuição "Snake" (A-B-B-A-A-B...)
-        # Garante que o 1º (Melhor) fique contra o 2º e 3º.
-        # Padrão de índices para o Blue: 0, 3, 4, 7, 8
-        # Padrão de índices para o Red:  1, 2, 5, 6, 9
-        
-        for i, p in enumerate(sorted_players):
-            if i in [0, 3, 4, 7, 8]:
-                blue.append(p)
-            else:
-                red.append(p)
-                
-        return blue, red
\ No newline at end of file
+        return TeamBalancer.best_splits(players, top_k=top_k, objective=objective)
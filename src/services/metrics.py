@@ -0,0 +1,256 @@
+import functools
+import inspect
+import logging
+import math
+import time
+from contextlib import contextmanager
+from aiohttp import web
+from src.services.tracing import record_span
+
+logger = logging.getLogger("metrics")
+
+# Buckets padrão (segundos): de 1ms a 30s
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class Family:
+    """Métrica já calculada (usada pelos coletores, que leem contadores de outros módulos no scrape)."""
+
+    def __init__(self, name: str, kind: str, help_text: str, samples: list = None):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.samples = samples or []   # [(sufixo, labels, valor)]
+
+    def add(self, value: float, suffix: str = "", **labels):
+        self.samples.append((suffix, labels, value))
+        return self
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}   # tupla de labels -> valor (ou estado do histograma)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    def collect(self) -> Family:
+        family = Family(self.name, self.kind, self.help)
+        for key, value in self._values.items():
+            family.add(value, **self._labels(key))
+        return family
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        super().__init__(name, help_text, labelnames)
+        self._function = None
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        """Valor lido na hora do scrape (ex.: tamanho da fila). Só para gauges sem labels."""
+        self._function = function
+
+    def collect(self) -> Family:
+        if self._function is not None:
+            return Family(self.name, self.kind, self.help).add(self._function())
+        return super().collect()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state['counts'][i] += 1
+                break
+        state['sum'] += value
+        state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> Family:
+        family = Family(self.name, self.kind, self.help)
+        for key, state in self._values.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['counts']):
+                cumulative += count
+                family.add(cumulative, "_bucket", **labels, le=_format_value(bound))
+            family.add(state['sum'], "_sum", **labels)
+            family.add(state['count'], "_count", **labels)
+        return family
+
+
+class Registry:
+    """Métricas do processo + coletores (funções que devolvem Families calculadas no scrape)."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            return self._metrics[metric.name]
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """`collector()` -> lista de Family. Chamado a cada scrape."""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def collect(self) -> list:
+        families = [metric.collect() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning("Coletor %s falhou: %s", getattr(collector, '__qualname__', collector), e)
+        return families
+
+    def render(self) -> str:
+        """Formato de exposição em texto do Prometheus (0.0.4)."""
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for suffix, labels, value in family.samples:
+                lines.append(f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Registro compartilhado do processo
+registry = Registry()
+
+DB_TRANSACTION_SECONDS = registry.histogram(
+    "db_transaction_seconds", "Duração das chamadas aos repositórios (uma sessão/transação cada)", ("method",))
+DB_ERRORS = registry.counter(
+    "db_errors_total", "Chamadas aos repositórios que terminaram em exceção", ("method",))
+
+
+def timed_repository(cls):
+    """
+    Decorator de classe: mede cada método estático assíncrono público do repositório
+    (`db_transaction_seconds{method="PlayerRepository.get_player_by_discord_id"}`). Os
+    helpers `_x(session, ...)` rodam dentro da transação de outro método e não são medidos.
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not isinstance(attr, staticmethod):
+            continue
+        function = attr.__func__
+        if not inspect.iscoroutinefunction(function):
+            continue
+        setattr(cls, name, staticmethod(_timed(function, f"{cls.__name__}.{name}")))
+    return cls
+
+
+def _timed(function, method: str):
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        except Exception:
+            DB_ERRORS.inc(method=method)
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            DB_TRANSACTION_SECONDS.observe(seconds, method=method)
+            record_span("db", method, seconds)
+    return wrapper
+
+
+class MetricsServer:
+    """Endpoint HTTP local (`GET /metrics`) no mesmo event loop do bot."""
+
+    def __init__(self, registry: Registry):
+        self.registry = registry
+        self._runner = None
+
+    async def _handle(self, request):
+        return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    async def start(self, host: str, port: int):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+metrics_server = MetricsServer(registry)
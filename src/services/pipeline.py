@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from collections import namedtuple
+import discord
+from src.services.metrics import Family
+
+logger = logging.getLogger("pipeline")
+
+StageResult = namedtuple("StageResult", ["name", "ok", "attempts", "seconds", "error"])
+
+
+class Stage:
+    """Etapa independente do pipeline: `factory()` cria a coroutine de cada tentativa."""
+
+    def __init__(self, name: str, factory, retries: int = 2, retry_delay: float = 1.0):
+        self.name = name
+        self.factory = factory
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+
+class StageStats:
+    """Tempos acumulados de uma etapa (todas as execuções desde que o bot subiu)."""
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, result: StageResult):
+        self.runs += 1
+        self.failures += 0 if result.ok else 1
+        self.retries += result.attempts - 1
+        self.total_seconds += result.seconds
+        self.max_seconds = max(self.max_seconds, result.seconds)
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.runs if self.runs else 0.0
+
+
+class Pipeline:
+    """
+    Executa etapas independentes em paralelo, cada uma com retry (backoff linear) e
+    medição de tempo. Uma etapa que falha não derruba as outras. Sem permissão
+    (discord.Forbidden) não adianta tentar de novo, então não há retry nesse caso.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = {}   # nome da etapa -> StageStats
+
+    def collect(self) -> list:
+        """Exporta os tempos das etapas no formato do endpoint de métricas."""
+        runs = Family("pipeline_stage_runs_total", "counter", "Execuções de cada etapa do pipeline")
+        failures = Family("pipeline_stage_failures_total", "counter", "Etapas que falharam após os retries")
+        retries = Family("pipeline_stage_retries_total", "counter", "Tentativas extras das etapas")
+        seconds = Family("pipeline_stage_seconds_total", "counter", "Tempo acumulado das etapas (inclui retries)")
+        longest = Family("pipeline_stage_seconds_max", "gauge", "Execução mais longa de cada etapa")
+        for stage, stats in self.stats.items():
+            labels = {'pipeline': self.name, 'stage': stage}
+            runs.add(stats.runs, **labels)
+            failures.add(stats.failures, **labels)
+            retries.add(stats.retries, **labels)
+            seconds.add(stats.total_seconds, **labels)
+            longest.add(stats.max_seconds, **labels)
+        return [runs, failures, retries, seconds, longest]
+
+    async def _run_stage(self, stage: Stage) -> StageResult:
+        started = time.perf_counter()
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                await stage.factory()
+                return StageResult(stage.name, True, attempts, time.perf_counter() - started, None)
+            except Exception as e:
+                if isinstance(e, discord.Forbidden) or attempts > stage.retries:
+                    return StageResult(stage.name, False, attempts, time.perf_counter() - started, e)
+                await asyncio.sleep(stage.retry_delay * attempts)
+
+    async def run(self, stages: list) -> list:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._run_stage(stage) for stage in stages))
+
+        for result in results:
+            self.stats.setdefault(result.name, StageStats()).record(result)
+            if not result.ok:
+                logger.warning("Etapa '%s' falhou após %s tentativa(s): %s", result.name, result.attempts, result.error,
+                               extra={'pipeline': self.name, 'stage': result.name})
+
+        logger.info("Concluído em %.2fs", time.perf_counter() - started,
+                    extra={'pipeline': self.name, **{f"{r.name}_s": round(r.seconds, 2) for r in results}})
+        return results
@@ -0,0 +1,261 @@
+import json
+import logging
+import math
+import os
+from src.services.rating import RatingEngine
+
+logger = logging.getLogger("predictor")
+
+MODEL_PATH = os.getenv("WIN_MODEL_PATH", "data/win_model.json")
+
+FEATURES = ("bias", "rating", "lanes", "streak", "synergy")
+LANES = ("TOP", "JUNGLE", "MID", "ADC", "SUPPORT")
+MAX_STREAK = 5
+MIN_PAIR_GAMES = 3
+
+# Sem modelo treinado: só a diferença de rating, na mesma escala do Elo (10^(diff/400))
+DEFAULT_WEIGHTS = {"bias": 0.0, "rating": math.log(10), "lanes": 0.0, "streak": 0.0, "synergy": 0.0}
+
+
+def pair_key(a: int, b: int) -> tuple:
+    return (a, b) if a < b else (b, a)
+
+
+def pair_synergy(wins: int, games: int) -> float:
+    """Winrate da dupla jogando junta, suavizado (Laplace) e centrado em 0."""
+    if games < MIN_PAIR_GAMES:
+        return 0.0
+    return (wins + 1) / (games + 2) - 0.5
+
+
+def lane_coverage(lanes: list) -> int:
+    """Quantas das 5 rotas o time cobre com main/secundária (cada FILL cobre uma rota faltante)."""
+    covered = set()
+    fills = 0
+    for main, secondary in lanes:
+        if main == "FILL" or main is None:
+            fills += 1
+            continue
+        covered.add(main)
+        if secondary and secondary != "FILL":
+            covered.add(secondary)
+    return min(len(LANES), len(covered & set(LANES)) + fills)
+
+
+class WinPredictor:
+    """
+    Probabilidade de vitória do Time Azul a partir de duas escalações.
+
+    Regressão logística sobre diferenças entre os times (Azul − Vermelho):
+    - rating: média de rating (Glicko-2 se existir, senão MMR) / 400
+    - lanes: cobertura de rotas por main/secundária / 5
+    - streak: soma das sequências de vitória (limitadas a 5) / 5
+    - synergy: soma da sinergia das duplas do time (histórico jogando juntos)
+
+    Os pesos e a tabela de sinergia vêm de um arquivo JSON gerado offline
+    (`train_predictor.py`); a inferência é só um produto escalar e ~20 consultas
+    a dicionário, barata o bastante para servir de objetivo do balanceador.
+    """
+
+    def __init__(self, weights: dict = None, pairs: dict = None, trained_on: int = 0, log_loss: float = None):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(weights or {})
+        self.pairs = pairs or {}   # (id_menor, id_maior) -> sinergia
+        self.trained_on = trained_on
+        self.log_loss = log_loss   # log-loss no histórico de treino (0.693 = cara ou coroa)
+
+    # --- PERSISTÊNCIA ---
+    @classmethod
+    def load(cls, path: str = MODEL_PATH):
+        """Carrega o modelo salvo; sem arquivo (ou inválido) usa os pesos padrão."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            pairs = {pair_key(a, b): value for a, b, value in data.get("pairs", [])}
+            return cls(data.get("weights"), pairs, data.get("trained_on", 0), data.get("log_loss"))
+        except FileNotFoundError:
+            return cls()
+        except Exception as e:
+            logger.warning("Modelo inválido em %s: %s. Usando pesos padrão.", path, e)
+            return cls()
+
+    def update_from(self, other: "WinPredictor"):
+        """Troca pesos e sinergias pelos de outro modelo (mantém a instância compartilhada)."""
+        self.weights = dict(other.weights)
+        self.pairs = dict(other.pairs)
+        self.trained_on = other.trained_on
+        self.log_loss = other.log_loss
+
+    def save(self, path: str = MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {
+            "weights": self.weights,
+            "trained_on": self.trained_on,
+            "log_loss": self.log_loss,
+            "pairs": [[a, b, round(value, 4)] for (a, b), value in self.pairs.items()],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    # --- INFERÊNCIA ---
+    @staticmethod
+    def _rating(p: dict) -> float:
+        rating = p.get('rating')
+        return rating if rating is not None else p.get('mmr', 0)
+
+    def _team_synergy(self, team: list) -> float:
+        ids = [p['id'] for p in team if p['id'] > 0]
+        total = 0.0
+        for i in range(len(ids)):
+            for j in range(i + 1, len(ids)):
+                total += self.pairs.get(pair_key(ids[i], ids[j]), 0.0)
+        return total
+
+    def features(self, blue: list, red: list) -> tuple:
+        rating = (sum(map(self._rating, blue)) / len(blue) - sum(map(self._rating, red)) / len(red)) / 400.0
+        lanes = (
+            lane_coverage([(p.get('main_lane'), p.get('secondary_lane')) for p in blue])
+            - lane_coverage([(p.get('main_lane'), p.get('secondary_lane')) for p in red])
+        ) / len(LANES)
+        streak = (
+            sum(min(MAX_STREAK, p.get('streak') or 0) for p in blue)
+            - sum(min(MAX_STREAK, p.get('streak') or 0) for p in red)
+        ) / MAX_STREAK
+        synergy = self._team_synergy(blue) - self._team_synergy(red)
+        return (1.0, rating, lanes, streak, synergy)
+
+    def predict_features(self, x: tuple) -> float:
+        z = sum(self.weights[name] * value for name, value in zip(FEATURES, x))
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def predict(self, blue: list, red: list) -> float:
+        """P(Time Azul vence)."""
+        return self.predict_features(self.features(blue, red))
+
+    def objective(self, blue: list, red: list) -> float:
+        """Objetivo para o TeamBalancer: distância de 50% (menor = mais equilibrado)."""
+        return abs(self.predict(blue, red) - 0.5)
+
+
+# --- TREINO OFFLINE ---
+
+def build_training_set(dataset, lanes_by_id: dict, engine: RatingEngine = None) -> tuple:
+    """
+    Percorre o histórico (ReplayDataset) em ordem cronológica e gera, para cada partida,
+    o vetor de features com o estado ANTERIOR a ela (rating Glicko-2 reprocessado,
+    streaks e sinergia das duplas), sem vazar o resultado.
+    Retorna (X, y, pair_stats) — pair_stats: (a, b) -> [vitórias, jogos] ao final.
+    """
+    engine = engine or RatingEngine()
+    ratings, streaks, pair_stats = {}, {}, {}
+    X, y = [], []
+    player_ids = dataset.player_ids
+    model = WinPredictor()
+
+    for k in range(len(dataset)):
+        blue_pos, red_pos = dataset.teams(k)
+        if not blue_pos or not red_pos:
+            continue
+        blue_won = bool(dataset.blue_won[k])
+
+        rosters = []
+        for positions in (blue_pos, red_pos):
+            team = []
+            for pos in positions:
+                pid = player_ids[dataset.players[pos]]
+                if pid not in ratings:
+                    mmr = dataset.mmr_before[pos]
+                    ratings[pid] = engine.seed(engine.center if math.isnan(mmr) else mmr)
+                main, secondary = lanes_by_id.get(pid, (None, None))
+                team.append({'id': pid, 'rating': ratings[pid].rating, 'streak': streaks.get(pid, 0),
+                             'main_lane': main, 'secondary_lane': secondary})
+            rosters.append(team)
+        blue, red = rosters
+
+        X.append(model.features(blue, red))
+        y.append(1.0 if blue_won else 0.0)
+
+        new_blue, new_red = engine.rate_match(
+            [ratings[p['id']] for p in blue], [ratings[p['id']] for p in red], blue_won
+        )
+        for team, new_ratings, won in ((blue, new_blue, blue_won), (red, new_red, not blue_won)):
+            ids = [p['id'] for p in team]
+            for pid, r in zip(ids, new_ratings):
+                ratings[pid] = r
+                streaks[pid] = streaks.get(pid, 0) + 1 if won else 0
+            for i in range(len(ids)):
+                for j in range(i + 1, len(ids)):
+                    key = pair_key(ids[i], ids[j])
+                    stats = pair_stats.setdefault(key, [0, 0])
+                    stats[0] += 1 if won else 0
+                    stats[1] += 1
+                    if stats[1] >= MIN_PAIR_GAMES:
+                        model.pairs[key] = pair_synergy(*stats)
+
+    return X, y, pair_stats
+
+
+def fit_logistic(X: list, y: list, l2: float = 1.0, iterations: int = 25) -> dict:
+    """Regressão logística por Newton-Raphson (IRLS) com regularização L2 (exceto no bias)."""
+    n = len(FEATURES)
+    w = [DEFAULT_WEIGHTS[name] for name in FEATURES]
+
+    for _ in range(iterations):
+        grad = [0.0] * n
+        hess = [[0.0] * n for _ in range(n)]
+        for x, target in zip(X, y):
+            z = sum(wi * xi for wi, xi in zip(w, x))
+            p = 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+            s = p * (1.0 - p)
+            for i in range(n):
+                grad[i] += (p - target) * x[i]
+                for j in range(i, n):
+                    hess[i][j] += s * x[i] * x[j]
+        for i in range(n):
+            for j in range(i):
+                hess[i][j] = hess[j][i]
+            if i > 0:
+                grad[i] += l2 * w[i]
+                hess[i][i] += l2
+            hess[i][i] += 1e-9
+
+        step = _solve(hess, grad)
+        w = [wi - si for wi, si in zip(w, step)]
+        if max(abs(si) for si in step) < 1e-6:
+            break
+
+    return dict(zip(FEATURES, w))
+
+
+def _solve(a: list, b: list) -> list:
+    """Resolve a·x = b por eliminação gaussiana (sistemas pequenos)."""
+    n = len(b)
+    m = [row[:] + [b[i]] for i, row in enumerate(a)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(n):
+            if r != col and m[r][col]:
+                factor = m[r][col] / m[col][col]
+                m[r] = [rv - factor * cv for rv, cv in zip(m[r], m[col])]
+    return [m[i][n] / m[i][i] for i in range(n)]
+
+
+def train(dataset, lanes_by_id: dict, engine: RatingEngine = None) -> WinPredictor:
+    """Treina um WinPredictor a partir do histórico completo."""
+    X, y, pair_stats = build_training_set(dataset, lanes_by_id, engine)
+    weights = fit_logistic(X, y) if X else dict(DEFAULT_WEIGHTS)
+    pairs = {key: pair_synergy(w, g) for key, (w, g) in pair_stats.items() if g >= MIN_PAIR_GAMES}
+    model = WinPredictor(weights, pairs, trained_on=len(X))
+
+    if X:
+        eps = 1e-12
+        model.log_loss = -sum(
+            t * math.log(max(eps, p)) + (1 - t) * math.log(max(eps, 1 - p))
+            for t, p in ((t, model.predict_features(x)) for x, t in zip(X, y))
+        ) / len(X)
+    return model
+
+
+# Instância compartilhada, carregada na inicialização do bot
+win_predictor = WinPredictor.load()
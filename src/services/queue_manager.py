@@ -0,0 +1,131 @@
+import asyncio
+import logging
+
+logger = logging.getLogger("queue_manager")
+
+
+class SnapshotWriter:
+    """
+    Escritor único dos snapshots da fila.
+
+    Os snapshots entram numa asyncio.Queue de tamanho 1: um snapshot novo descarta o que
+    ainda não foi salvo (só o estado mais recente importa). Uma única task consome a fila,
+    então os saves chegam ao banco na ordem em que as mutações aconteceram.
+    """
+
+    def __init__(self):
+        self._queue = asyncio.Queue(maxsize=1)
+        self._task = None
+
+    def submit(self, persist, snapshot: list):
+        """Enfileira (sem await) o save de `snapshot` via `persist(snapshot)`."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self._queue.task_done()
+        self._queue.put_nowait((persist, snapshot))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="queue-snapshot-writer")
+
+    async def _run(self):
+        while True:
+            persist, snapshot = await self._queue.get()
+            try:
+                await persist(snapshot)
+            except Exception as e:
+                logger.exception("Erro ao salvar a fila: %s", e)
+            finally:
+                self._queue.task_done()
+
+    async def flush(self):
+        """Espera o último snapshot enfileirado chegar ao banco."""
+        await self._queue.join()
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+class QueueManager:
+    """
+    Estado da fila de partidas (lobby).
+    Todas as mutações passam por um asyncio.Lock: checagem de limite, checagem de
+    duplicidade e inserção acontecem como uma operação única, então cliques
+    simultâneos não conseguem estourar o limite nem disparar o "Lobby Pronto" duas vezes.
+    O lock só protege a memória: o snapshot é entregue ao SnapshotWriter dentro do lock
+    (sem await) e salvo depois, fora da seção crítica.
+    """
+
+    def __init__(self, limit: int = 10):
+        self.players = []
+        self.limit = limit
+        self.lock = asyncio.Lock()
+        self.writer = SnapshotWriter()
+
+    def is_full(self) -> bool:
+        return len(self.players) >= self.limit
+
+    def contains(self, discord_id: int) -> bool:
+        return any(p['id'] == discord_id for p in self.players)
+
+    def snapshot(self) -> list:
+        return list(self.players)
+
+    async def join(self, entry: dict, persist=None) -> str:
+        """
+        Adiciona um jogador à fila.
+        `persist` (opcional) é uma coroutine function que recebe o snapshot da fila;
+        ela roda no SnapshotWriter, fora do lock, na mesma ordem das mutações.
+        Retorna 'FULL', 'ALREADY_IN', 'JOINED' ou 'FILLED' (este último apenas para
+        o clique que completou a fila).
+        """
+        async with self.lock:
+            if self.is_full():
+                return "FULL"
+            if self.contains(entry['id']):
+                return "ALREADY_IN"
+
+            self.players.append(entry)
+            status = "FILLED" if self.is_full() else "JOINED"
+
+            if persist:
+                self.writer.submit(persist, self.snapshot())
+            return status
+
+    async def leave(self, discord_id: int, persist=None) -> bool:
+        """Remove um jogador da fila. Retorna True se ele estava nela."""
+        async with self.lock:
+            before = len(self.players)
+            self.players = [p for p in self.players if p['id'] != discord_id]
+            removed = len(self.players) != before
+
+            if persist:
+                self.writer.submit(persist, self.snapshot())
+            return removed
+
+    async def extract(self, choose, persist=None) -> list:
+        """
+        Separa parte da fila de forma atômica (modo pool).
+        `choose(players)` retorna (selecionados, restantes); a fila passa a ser `restantes`.
+        Retorna os selecionados.
+        """
+        async with self.lock:
+            selected, remaining = choose(self.snapshot())
+            self.players = list(remaining)
+
+            if persist:
+                self.writer.submit(persist, self.snapshot())
+            return selected
+
+    async def restore(self, players: list):
+        """Substitui a fila (usado ao recuperar o estado persistido)."""
+        async with self.lock:
+            self.players = list(players)
+
+    async def flush(self):
+        """Espera os saves pendentes (antes de limpar a fila persistida, por exemplo)."""
+        await self.writer.flush()
+
+    async def clear(self):
+        async with self.lock:
+            self.players = []
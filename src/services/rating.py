@@ -0,0 +1,133 @@
+import math
+from collections import namedtuple
+
+# Estado de rating de um jogador na escala de MMR (rating, desvio e volatilidade)
+Rating = namedtuple("Rating", ["rating", "rd", "vol"])
+
+# Fator de conversão entre a escala Glicko (1500 ± 350) e a escala interna do Glicko-2
+GLICKO2_SCALE = 173.7178
+
+
+class RatingEngine:
+    """
+    Glicko-2 adaptado para partidas 5x5 (variante "média dos times").
+
+    Cada partida é tratada como um único período de rating: a expectativa de
+    vitória vem da diferença entre a média de rating dos dois times, ponderada
+    pela incerteza combinada do time adversário. Todos os jogadores de um time
+    recebem o mesmo resultado esperado, mas o tamanho do ajuste depende do desvio
+    (rd) individual — jogadores novos se movem mais rápido que veteranos.
+
+    O rating inicial vem do MMR calculado pela Riot (`calculate_adjusted_mmr`),
+    então `seed_rd` pode ser menor que o padrão do Glicko (350).
+    """
+
+    def __init__(self, tau: float = 0.5, seed_rd: float = 200.0, seed_vol: float = 0.06,
+                 min_rd: float = 30.0, max_rd: float = 350.0, center: float = 1200.0):
+        self.tau = tau
+        self.seed_rd = seed_rd
+        self.seed_vol = seed_vol
+        self.min_rd = min_rd
+        self.max_rd = max_rd
+        # Centro da escala: o MMR médio dos jogadores (Ouro IV ≈ 1200)
+        self.center = center
+
+    def seed(self, mmr: float) -> Rating:
+        """Rating inicial de um jogador sem partidas internas."""
+        return Rating(float(mmr), self.seed_rd, self.seed_vol)
+
+    @staticmethod
+    def _g(phi: float) -> float:
+        return 1.0 / math.sqrt(1.0 + 3.0 * phi * phi / (math.pi * math.pi))
+
+    def expected_score(self, team: list, opponents: list) -> float:
+        """Probabilidade de `team` vencer `opponents` (listas de Rating)."""
+        mu_a = sum(r.rating for r in team) / len(team)
+        mu_b = sum(r.rating for r in opponents) / len(opponents)
+        phi_b = math.sqrt(sum(r.rd * r.rd for r in opponents) / len(opponents)) / GLICKO2_SCALE
+        return 1.0 / (1.0 + math.exp(-self._g(phi_b) * (mu_a - mu_b) / GLICKO2_SCALE))
+
+    def _new_volatility(self, phi: float, sigma: float, delta: float, v: float) -> float:
+        """Passo 5 do Glicko-2 (algoritmo de Illinois)."""
+        a = math.log(sigma * sigma)
+        tau2 = self.tau * self.tau
+        phi2 = phi * phi
+        delta2 = delta * delta
+
+        def f(x):
+            ex = math.exp(x)
+            return (ex * (delta2 - phi2 - v - ex)) / (2.0 * (phi2 + v + ex) ** 2) - (x - a) / tau2
+
+        big_a = a
+        if delta2 > phi2 + v:
+            big_b = math.log(delta2 - phi2 - v)
+        else:
+            k = 1
+            while f(a - k * self.tau) < 0:
+                k += 1
+            big_b = a - k * self.tau
+
+        f_a, f_b = f(big_a), f(big_b)
+        while abs(big_b - big_a) > 1e-6:
+            big_c = big_a + (big_a - big_b) * f_a / (f_b - f_a)
+            f_c = f(big_c)
+            if f_c * f_b <= 0:
+                big_a, f_a = big_b, f_b
+            else:
+                f_a /= 2.0
+            big_b, f_b = big_c, f_c
+        return math.exp(big_a / 2.0)
+
+    def _update_player(self, r: Rating, expected: float, g: float, score: float) -> Rating:
+        phi = r.rd / GLICKO2_SCALE
+        v = 1.0 / (g * g * expected * (1.0 - expected))
+        delta = v * g * (score - expected)
+
+        sigma = self._new_volatility(phi, r.vol, delta, v)
+        phi_star = math.sqrt(phi * phi + sigma * sigma)
+        new_phi = 1.0 / math.sqrt(1.0 / (phi_star * phi_star) + 1.0 / v)
+        new_mu = (r.rating - self.center) / GLICKO2_SCALE + new_phi * new_phi * g * (score - expected)
+
+        new_rd = min(self.max_rd, max(self.min_rd, new_phi * GLICKO2_SCALE))
+        return Rating(new_mu * GLICKO2_SCALE + self.center, new_rd, sigma)
+
+    def rate_match(self, blue: list, red: list, blue_won: bool) -> tuple:
+        """
+        Atualiza os ratings de uma partida.
+        Recebe duas listas de Rating e retorna (novos_blue, novos_red) na mesma ordem.
+        """
+        e_blue = self.expected_score(blue, red)
+        e_red = 1.0 - e_blue
+        g_vs_red = self._g(math.sqrt(sum(r.rd * r.rd for r in red) / len(red)) / GLICKO2_SCALE)
+        g_vs_blue = self._g(math.sqrt(sum(r.rd * r.rd for r in blue) / len(blue)) / GLICKO2_SCALE)
+
+        s_blue = 1.0 if blue_won else 0.0
+        new_blue = [self._update_player(r, e_blue, g_vs_red, s_blue) for r in blue]
+        new_red = [self._update_player(r, e_red, g_vs_blue, 1.0 - s_blue) for r in red]
+        return new_blue, new_red
+
+    def replay(self, matches: list, seeds: dict) -> tuple:
+        """
+        Reprocessa o histórico completo em memória.
+        `matches`: lista ordenada de (match_id, blue_ids, red_ids, blue_won).
+        `seeds`: discord_id -> MMR inicial (jogadores ausentes entram com `center`).
+        Retorna (ratings_finais, snapshots), onde snapshots é
+        {(match_id, discord_id): (rating_antes, rd_antes, rating_depois)}.
+        """
+        ratings = {}
+        snapshots = {}
+        for match_id, blue_ids, red_ids, blue_won in matches:
+            if not blue_ids or not red_ids:
+                continue
+            for pid in blue_ids + red_ids:
+                if pid not in ratings:
+                    ratings[pid] = self.seed(seeds.get(pid, self.center))
+
+            blue = [ratings[pid] for pid in blue_ids]
+            red = [ratings[pid] for pid in red_ids]
+            new_blue, new_red = self.rate_match(blue, red, blue_won)
+
+            for pid, before, after in zip(blue_ids + red_ids, blue + red, new_blue + new_red):
+                snapshots[(match_id, pid)] = (before.rating, before.rd, after.rating)
+                ratings[pid] = after
+        return ratings, snapshots
@@ -1,7 +1,28 @@
 import aiohttp
 import os
 import asyncio
-from urllib.parse import quote
+import time
+import logging
+from urllib.parse import quote, urlsplit
+from src.services.metrics import registry
+from src.services.tracing import record_span
+
+logger = logging.getLogger("riot")
+
+RIOT_REQUESTS = registry.counter(
+    "riot_requests_total", "Requisições à Riot API por endpoint e status HTTP", ("endpoint", "status"))
+RIOT_LATENCY = registry.histogram(
+    "riot_request_seconds", "Tempo até a resposta da Riot API (cabeçalhos) por endpoint", ("endpoint",))
+
+
+def riot_endpoint(url: str) -> str:
+    """'https://br1.api.riotgames.com/lol/league/v4/entries/by-puuid/abc' -> '/lol/league/v4/entries/by-puuid'."""
+    parts = urlsplit(url).path.strip("/").split("/")
+    # /{jogo}/{serviço}/{versão}/{recurso}[/by-xxx]: o resto são ids
+    endpoint = parts[:4]
+    if len(parts) > 4 and parts[4].startswith("by-"):
+        endpoint.append(parts[4])
+    return "/" + "/".join(endpoint)
 
 class RiotAPI:
     def __init__(self):
@@ -18,48 +39,56 @@ class RiotAPI:
         headers = {"X-Riot-Token": self.api_key}
         timeout = aiohttp.ClientTimeout(total=15)
 
-        print(f"[RIOT API] GET -> {url}")
-
+        endpoint = riot_endpoint(url)
+        # Uma linha por requisição: DEBUG amostrado (ver LOG_DEBUG_SAMPLE_EVERY)
+        logger.debug("GET %s", url, extra={'endpoint': endpoint})
         async with self.semaphore:
+            started = time.perf_counter()
             try:
                 async with aiohttp.ClientSession(timeout=timeout) as session:
                     async with session.get(url, headers=headers) as response:
+                        RIOT_REQUESTS.inc(endpoint=endpoint, status=response.status)
+                        RIOT_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+                        record_span("riot", endpoint, time.perf_counter() - started)
 
                         if response.status == 200:
                             return await response.json()
 
                         elif response.status == 429:
                             retry_after = int(response.headers.get("Retry-After", 5))
-                            print(f"⚠️ Rate Limit (429)! Esperando {retry_after}s...")
+                            logger.warning("Rate limit (429), esperando %ss", retry_after, extra={'endpoint': endpoint})
                             await asyncio.sleep(retry_after)
                             return await self._request(url, _retries)
 
                         elif response.status == 403:
-                            print(f"⛔ ERRO 403: API Key expirada ou sem permissão. URL: {url}")
+                            logger.error("403: API key expirada ou sem permissão", extra={'endpoint': endpoint, 'url': url})
                             return None
 
                         elif response.status == 404:
-                            print(f"⚠️ ERRO 404: Recurso não encontrado. URL: {url}")
+                            logger.info("404: recurso não encontrado", extra={'endpoint': endpoint, 'url': url})
                             return None
 
                         elif response.status in (500, 502, 503, 504):
                             if _retries > 0:
-                                print(f"⚠️ Erro {response.status} — tentando novamente em 3s... ({_retries} restante(s))")
+                                logger.warning("Erro %s, tentando novamente em 3s (%s restante(s))", response.status, _retries, extra={'endpoint': endpoint})
                                 await asyncio.sleep(3)
                                 return await self._request(url, _retries - 1)
-                            print(f"⛔ Erro {response.status} após retries (servidor Riot instável): {url}")
+                            logger.error("Erro %s após retries (servidor Riot instável)", response.status, extra={'endpoint': endpoint, 'url': url})
                             return "RIOT_SERVER_ERROR"
 
                         else:
-                            print(f"⚠️ Erro {response.status}: {url}")
+                            logger.warning("Erro %s", response.status, extra={'endpoint': endpoint, 'url': url})
                             return None
 
             except asyncio.TimeoutError:
+                RIOT_REQUESTS.inc(endpoint=endpoint, status="timeout")
+                RIOT_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+                record_span("riot", endpoint, time.perf_counter() - started)
                 if _retries > 0:
-                    print(f"⚠️ Timeout na requisição — tentando novamente... ({_retries} restante(s)) URL: {url}")
+                    logger.warning("Timeout, tentando novamente (%s restante(s))", _retries, extra={'endpoint': endpoint})
                     await asyncio.sleep(3)
                     return await self._request(url, _retries - 1)
-                print(f"⛔ Timeout após retries: {url}")
+                logger.error("Timeout após retries", extra={'endpoint': endpoint, 'url': url})
                 return "RIOT_SERVER_ERROR"
 
     # --- MÉTODOS DE CONTA E SUMMONER (Mantidos) ---
@@ -82,7 +111,7 @@ class RiotAPI:
         )
         result = await self._request(url)
         if result is None:
-            print(f"[Summoner] Retornou None para PUUID {puuid[:20]}... — verifique se a API key está válida ou se a conta nunca jogou LoL.")
+            logger.warning("Summoner retornou None para PUUID %s... (API key inválida ou conta que nunca jogou LoL?)", puuid[:20])
         return result
 
     async def get_rank_by_puuid(self, puuid: str):
@@ -92,10 +121,7 @@ class RiotAPI:
         )
 
         data = await self._request(url)
-        if data:
-            print(f"✅ RANK ENCONTRADO: {data}")
-        else:
-            print("⚠️ Nenhuma entrada de rank encontrada.")
+        logger.debug("Rank: %s entrada(s)", len(data) if isinstance(data, list) else 0)
         return data
 
     async def get_top_mastery(self, puuid: str, count: int = 3):
@@ -142,7 +168,7 @@ class RiotAPI:
                         versions = await resp.json()
                         self.ddragon_version = versions[0]
         except Exception as e:
-            print(f"Erro ao atualizar versão DataDragon: {e}")
+            logger.warning("Erro ao atualizar versão DataDragon: %s", e)
 
     async def get_all_champions_data(self):
         """Baixa o JSON gigante com todos os campeões (para busca de nome)"""
@@ -155,7 +181,7 @@ class RiotAPI:
                     if resp.status == 200:
                         return await resp.json()
         except Exception as e:
-            print(f"Erro ao baixar lista de campeões: {e}")
+            logger.warning("Erro ao baixar lista de campeões: %s", e)
         return None
 
     async def get_champion_detail(self, champion_id_name: str):
@@ -170,7 +196,7 @@ class RiotAPI:
                         data = await resp.json()
                         return data['data'][champion_id_name]
         except Exception as e:
-            print(f"Erro ao baixar detalhes do campeão {champion_id_name}: {e}")
+            logger.warning("Erro ao baixar detalhes do campeão %s: %s", champion_id_name, e)
         return None
 
     async def get_champion_name(self, champ_id: int):
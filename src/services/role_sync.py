@@ -0,0 +1,53 @@
+import asyncio
+import discord
+
+# Edições simultâneas de membros. O discord.py ainda respeita os buckets de rate limit
+# da rota (PATCH /guilds/{id}/members/{id}) e espera sozinho em caso de 429.
+ROLE_SYNC_CONCURRENCY = 5
+
+
+class RoleSync:
+    """
+    Sincroniza um conjunto de cargos "gerenciados" (ex.: vencedor/perdedor) nos membros.
+
+    Para cada membro calcula o conjunto final de cargos (cargos atuais − gerenciados +
+    o cargo desejado) e aplica com um único `member.edit(roles=...)`; membros que já
+    estão no estado certo não geram chamada. As edições rodam em paralelo, limitadas
+    por um semáforo.
+    """
+
+    def __init__(self, managed_roles: list, concurrency: int = ROLE_SYNC_CONCURRENCY):
+        self.managed_ids = {r.id for r in managed_roles if r}
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    def desired_roles(self, member: discord.Member, target: discord.Role = None) -> list:
+        # roles[0] é o @everyone, que não pode ser enviado no PATCH
+        roles = [r for r in member.roles[1:] if r.id not in self.managed_ids]
+        if target:
+            roles.append(target)
+        return roles
+
+    async def _apply(self, member: discord.Member, target: discord.Role, reason: str):
+        desired = self.desired_roles(member, target)
+        if {r.id for r in desired} == {r.id for r in member.roles[1:]}:
+            return member, None
+        async with self.semaphore:
+            try:
+                await member.edit(roles=desired, reason=reason)
+                return member, None
+            except discord.Forbidden as e:
+                return member, e
+            except discord.HTTPException as e:
+                return member, e
+
+    async def apply(self, assignments: dict, reason: str = None) -> tuple:
+        """
+        `assignments`: discord.Member -> cargo desejado (ou None para só remover os gerenciados).
+        Retorna (ok, falhas): membros sincronizados e [(membro, erro)].
+        """
+        results = await asyncio.gather(*(
+            self._apply(member, target, reason) for member, target in assignments.items()
+        ))
+        ok = [member for member, error in results if error is None]
+        failed = [(member, error) for member, error in results if error is not None]
+        return ok, failed
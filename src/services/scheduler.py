@@ -0,0 +1,127 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta
+from src.database.repositories import JobRepository
+
+logger = logging.getLogger("scheduler")
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+
+
+class JobScheduler:
+    """
+    Agendador de tarefas persistente.
+
+    Cada tarefa é uma linha em `scheduled_jobs` (kind, key, run_at, payload) e uma
+    entrada no heap em memória ordenado por run_at; o loop dorme exatamente até a
+    próxima tarefa vencer (ou até alguém agendar uma mais próxima). Na inicialização
+    as tarefas pendentes são recarregadas do banco, e as vencidas durante o restart
+    rodam imediatamente.
+
+    Execução "at-least-once": a linha só é marcada como concluída depois que o
+    handler termina. Se o bot cair no meio, a tarefa roda de novo no próximo start,
+    então os handlers precisam ser idempotentes. Falhas são reagendadas com backoff
+    exponencial até MAX_ATTEMPTS.
+    """
+
+    def __init__(self):
+        self.handlers = {}       # kind -> coroutine(payload)
+        self._heap = []          # (run_at, seq, tarefa)
+        # key -> seq do push vigente. Reagendar mantém o id da linha, então é o seq (e não o
+        # job_id) que distingue a entrada atual das antigas, que ficam no heap e são ignoradas
+        self._current = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._running = set()
+
+    def register(self, kind: str, handler):
+        """Associa um tipo de tarefa a uma coroutine `handler(payload: dict)`."""
+        self.handlers[kind] = handler
+
+    def _push(self, job: dict):
+        seq = next(self._seq)
+        self._current[job['key']] = seq
+        heapq.heappush(self._heap, (job['run_at'], seq, job))
+        self._wakeup.set()
+
+    async def schedule(self, kind: str, key: str, run_at: datetime, payload: dict = None, ensure: bool = False) -> bool:
+        """
+        Persiste e agenda a tarefa (reagenda se `key` já existir). Retorna False se já foi concluída.
+        Com `ensure`, só cria a tarefa se ela não existir: uma existente não é alterada (nem volta
+        de FAILED/CANCELLED) — para garantir tarefas na inicialização sem zerar tentativas.
+        """
+        job = await JobRepository.schedule(kind, key, run_at, payload, ensure=ensure)
+        if job is None:
+            return False
+        self._push(job)
+        return True
+
+    async def cancel(self, key: str) -> bool:
+        self._current.pop(key, None)
+        return await JobRepository.cancel(key)
+
+    def pending(self) -> int:
+        return len(self._current)
+
+    async def start(self, bot):
+        """Recarrega as tarefas pendentes e inicia o loop (que aguarda o bot ficar pronto)."""
+        if self._task:
+            return
+        for job in await JobRepository.get_pending():
+            if job['key'] not in self._current:
+                self._push(job)
+        self._task = asyncio.create_task(self._run(bot))
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, bot):
+        await bot.wait_until_ready()
+        while True:
+            self._wakeup.clear()
+            now = datetime.utcnow()
+
+            while self._heap and self._heap[0][0] <= now:
+                _, seq, job = heapq.heappop(self._heap)
+                if self._current.get(job['key']) != seq:
+                    continue  # Reagendada ou cancelada depois de entrar no heap
+                del self._current[job['key']]
+                task = asyncio.create_task(self._execute(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: dict):
+        handler = self.handlers.get(job['kind'])
+        try:
+            if handler is None:
+                raise RuntimeError(f"nenhum handler registrado para '{job['kind']}'")
+            await handler(job['payload'])
+        except Exception as e:
+            attempts = job['attempts'] + 1
+            give_up = attempts >= MAX_ATTEMPTS
+            retry_at = datetime.utcnow() + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            logger.warning("%s falhou (tentativa %s/%s): %s", job['key'], attempts, MAX_ATTEMPTS, e,
+                           extra={'job_kind': job['kind'], 'give_up': give_up})
+            await JobRepository.retry(job['id'], str(e), retry_at, give_up=give_up)
+            if not give_up and job['key'] not in self._current:
+                self._push(dict(job, run_at=retry_at, attempts=attempts))
+            return
+
+        if job['key'] not in self._current:  # Reagendada durante a execução: mantém pendente
+            await JobRepository.complete(job['id'])
+
+
+# Instância compartilhada (handlers registrados pelos cogs, iniciada no setup_hook)
+scheduler = JobScheduler()
@@ -0,0 +1,226 @@
+import math
+from array import array
+from src.services.matchmaker import MatchMaker
+from src.services.rating import RatingEngine, Rating
+
+
+class ReplayDataset:
+    """
+    Histórico de partidas em arrays compactos (sem objetos ORM).
+    Os jogadores da partida k ocupam as posições [offsets[k], offsets[k + 1]) de
+    `players`, `sides` e `mmr_before`; jogadores são índices em `player_ids`.
+    """
+
+    def __init__(self):
+        self.match_ids = array('i')
+        self.blue_won = array('b')
+        self.offsets = array('i', [0])
+        self.players = array('i')
+        self.sides = array('b')          # 1 = Blue, 0 = Red
+        self.mmr_before = array('d')     # NaN quando não há snapshot
+        self.player_ids = []             # índice -> discord_id
+        self._index = {}                 # discord_id -> índice
+
+    def __len__(self):
+        return len(self.match_ids)
+
+    def player_index(self, discord_id: int) -> int:
+        idx = self._index.get(discord_id)
+        if idx is None:
+            idx = len(self.player_ids)
+            self._index[discord_id] = idx
+            self.player_ids.append(discord_id)
+        return idx
+
+    def add_row(self, match_id: int, blue_won: bool, discord_id: int, is_blue: bool, mmr_before):
+        """Adiciona uma linha (partida, jogador). As linhas devem vir agrupadas por partida."""
+        if not self.match_ids or self.match_ids[-1] != match_id:
+            if self.match_ids:
+                self.offsets.append(len(self.players))
+            self.match_ids.append(match_id)
+            self.blue_won.append(1 if blue_won else 0)
+        self.players.append(self.player_index(discord_id))
+        self.sides.append(1 if is_blue else 0)
+        self.mmr_before.append(float(mmr_before) if mmr_before is not None else math.nan)
+
+    def finalize(self):
+        """Fecha o offset da última partida (chamar após a última linha)."""
+        if len(self.offsets) == len(self.match_ids):
+            self.offsets.append(len(self.players))
+        return self
+
+    @classmethod
+    async def from_stream(cls, batches):
+        """
+        Monta o dataset a partir de um iterável assíncrono de lotes de linhas
+        (match_id, blue_won, discord_id, is_blue, mmr_before).
+        """
+        dataset = cls()
+        async for batch in batches:
+            for row in batch:
+                dataset.add_row(*row)
+        return dataset.finalize()
+
+    def teams(self, k: int) -> tuple:
+        """Posições (no array plano) dos jogadores Blue e Red da partida k."""
+        start, end = self.offsets[k], self.offsets[k + 1]
+        blue = [i for i in range(start, end) if self.sides[i]]
+        red = [i for i in range(start, end) if not self.sides[i]]
+        return blue, red
+
+
+# --- MODELOS DE RATING ---
+
+class SnapshotModel:
+    """Linha de base: prevê pelo MMR gravado no momento da partida (mmr_before), sem atualizar nada."""
+
+    name = "MMR da partida"
+
+    def __init__(self, scale: float = 400.0):
+        self.scale = scale
+
+    def start(self, dataset: ReplayDataset):
+        self.dataset = dataset
+        self.fallback = MatchMaker.TIER_VALUES['UNRANKED']
+
+    def _value(self, pos: int) -> float:
+        mmr = self.dataset.mmr_before[pos]
+        return self.fallback if math.isnan(mmr) else mmr
+
+    def predict(self, blue: list, red: list) -> float:
+        diff = sum(map(self._value, blue)) / len(blue) - sum(map(self._value, red)) / len(red)
+        return 1.0 / (1.0 + 10 ** (-diff / self.scale))
+
+    def update(self, blue: list, red: list, blue_won: bool):
+        pass
+
+    def rating(self, pos: int) -> float:
+        return self._value(pos)
+
+
+class FormulaModel(SnapshotModel):
+    """
+    What-if das constantes do MatchMaker: recalcula o MMR de cada jogador com uma
+    fórmula alternativa (subclasse de MatchMaker) a partir dos ranks cached.
+    O banco não guarda o histórico de rank, então o rank atual é usado como proxy;
+    jogadores sem rank caem no mmr_before da partida.
+    """
+
+    name = "Fórmula what-if"
+
+    def __init__(self, formula, rank_rows, scale: float = 400.0):
+        super().__init__(scale)
+        self.formula = formula
+        self.rank_rows = rank_rows
+
+    def start(self, dataset: ReplayDataset):
+        super().start(dataset)
+        self.static = {}
+        for row in self.rank_rows:
+            idx = dataset._index.get(row.discord_id)
+            if idx is None:
+                continue
+            mmr = self.formula.mmr_from_player(row)
+            if mmr is not None:
+                self.static[idx] = float(mmr)
+
+    def _value(self, pos: int) -> float:
+        mmr = self.static.get(self.dataset.players[pos])
+        return mmr if mmr is not None else super()._value(pos)
+
+
+class GlickoModel:
+    """Rating Glicko-2 sequencial (RatingEngine), semeado pelo mmr_before da primeira partida."""
+
+    name = "Glicko-2"
+
+    def __init__(self, engine: RatingEngine = None):
+        self.engine = engine or RatingEngine()
+
+    def start(self, dataset: ReplayDataset):
+        self.dataset = dataset
+        self.ratings = {}
+
+    def _get(self, pos: int) -> Rating:
+        idx = self.dataset.players[pos]
+        r = self.ratings.get(idx)
+        if r is None:
+            mmr = self.dataset.mmr_before[pos]
+            r = self.engine.seed(self.engine.center if math.isnan(mmr) else mmr)
+            self.ratings[idx] = r
+        return r
+
+    def predict(self, blue: list, red: list) -> float:
+        return self.engine.expected_score([self._get(p) for p in blue], [self._get(p) for p in red])
+
+    def update(self, blue: list, red: list, blue_won: bool):
+        new_blue, new_red = self.engine.rate_match(
+            [self._get(p) for p in blue], [self._get(p) for p in red], blue_won
+        )
+        for pos, r in zip(blue + red, new_blue + new_red):
+            self.ratings[self.dataset.players[pos]] = r
+
+    def rating(self, pos: int) -> float:
+        return self._get(pos).rating
+
+
+def formula_with(**overrides):
+    """Cria uma subclasse de MatchMaker com constantes alteradas (ex.: FLEX_MULTIPLIER=0.9)."""
+    return type("WhatIfFormula", (MatchMaker,), overrides)
+
+
+# --- SIMULAÇÃO ---
+
+class SimulationReport:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.matches = 0
+        self.log_loss = 0.0
+        self.brier = 0.0
+        self.accuracy = 0.0
+        self.trajectories = {}   # discord_id -> [(match_id, rating_após)]
+
+
+def simulate(dataset: ReplayDataset, model, track: set = None) -> SimulationReport:
+    """
+    Reaplica `model` sobre o histórico em ordem cronológica.
+    Antes de cada partida o modelo prevê P(Blue vence); depois recebe o resultado.
+    `track` limita as trajetórias a alguns discord_ids (None = todos).
+    """
+    report = SimulationReport(model.name)
+    model.start(dataset)
+    players = dataset.players
+    player_ids = dataset.player_ids
+    eps = 1e-12
+
+    log_loss = brier = 0.0
+    correct = 0
+    counted = 0
+    for k in range(len(dataset)):
+        blue, red = dataset.teams(k)
+        if not blue or not red:
+            continue
+        won = bool(dataset.blue_won[k])
+
+        p = model.predict(blue, red)
+        p = min(1.0 - eps, max(eps, p))
+        outcome = 1.0 if won else 0.0
+        log_loss -= outcome * math.log(p) + (1.0 - outcome) * math.log(1.0 - p)
+        brier += (p - outcome) ** 2
+        correct += (p > 0.5) == won
+        counted += 1
+
+        model.update(blue, red, won)
+
+        match_id = dataset.match_ids[k]
+        for pos in blue + red:
+            discord_id = player_ids[players[pos]]
+            if track is None or discord_id in track:
+                report.trajectories.setdefault(discord_id, []).append((match_id, model.rating(pos)))
+
+    if counted:
+        report.matches = counted
+        report.log_loss = log_loss / counted
+        report.brier = brier / counted
+        report.accuracy = correct / counted
+    return report
@@ -0,0 +1,163 @@
+import collections
+import contextvars
+import functools
+import math
+import time
+from contextlib import contextmanager
+
+# Janelas dos percentis (.lentos) e quanto histórico cada comando guarda
+WINDOWS = {'5m': 300, '1h': 3600}
+MAX_SAMPLES = 2000
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+def _percentile(values: list, pct: float) -> float:
+    """Nearest-rank sobre uma lista já ordenada."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+class Trace:
+    """Execução de um comando/callback: duração total + spans (DB, Riot, REST do Discord) dentro dela."""
+
+    __slots__ = ("name", "started", "spans", "closed")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = {}     # "db:PlayerRepository.get_player_by_discord_id" -> [chamadas, segundos]
+        self.closed = False
+
+    def add(self, kind: str, name: str, seconds: float):
+        # Tasks criadas pelo comando herdam o trace e podem terminar depois dele
+        if self.closed:
+            return
+        span = self.spans.get(f"{kind}:{name}")
+        if span is None:
+            span = self.spans[f"{kind}:{name}"] = [0, 0.0]
+        span[0] += 1
+        span[1] += seconds
+
+
+def record_span(kind: str, name: str, seconds: float):
+    """Soma um span ao trace do contexto atual (sem trace ativo, não faz nada)."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(kind, name, seconds)
+
+
+class Tracer:
+    """
+    Latência ponta a ponta por comando e por callback de view.
+
+    `begin(name)` abre um trace no contexto da task (contextvar: tasks criadas dentro do
+    comando herdam o trace); `record_span` — chamado pelos repositórios, pela Riot API e pela
+    camada REST do Discord — acumula os spans; `end(token)` guarda a amostra. Os percentis
+    são calculados sob demanda sobre as amostras da janela.
+    """
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.samples = {}   # nome -> deque[(timestamp, segundos, ok, spans)]
+
+    def begin(self, name: str):
+        return _current.set(Trace(name))
+
+    def end(self, token, ok: bool = True):
+        trace = _current.get()
+        _current.reset(token)
+        if trace is None:
+            return
+        trace.closed = True
+        seconds = time.perf_counter() - trace.started
+        samples = self.samples.get(trace.name)
+        if samples is None:
+            samples = self.samples[trace.name] = collections.deque(maxlen=self.max_samples)
+        samples.append((time.time(), seconds, ok, trace.spans))
+
+    @contextmanager
+    def trace(self, name: str):
+        token = self.begin(name)
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.end(token, ok)
+
+    def summary(self, window: int) -> list:
+        """Por comando na janela (segundos): contagem, erros, p50/p95/p99, máx e tempo médio por span."""
+        cutoff = time.time() - window
+        rows = []
+        for name, samples in self.samples.items():
+            recent = [s for s in samples if s[0] >= cutoff]
+            if not recent:
+                continue
+            durations = sorted(s[1] for s in recent)
+            spans = {}
+            for _, _, _, trace_spans in recent:
+                for key, (calls, seconds) in trace_spans.items():
+                    entry = spans.setdefault(key, [0, 0.0])
+                    entry[0] += calls
+                    entry[1] += seconds
+            count = len(recent)
+            avg = sum(durations) / count
+            by_kind = collections.Counter()
+            for key, (_, seconds) in spans.items():
+                by_kind[key.split(":", 1)[0]] += seconds / count
+            rows.append({
+                'name': name,
+                'count': count,
+                'errors': sum(1 for s in recent if not s[2]),
+                'p50': _percentile(durations, 50),
+                'p95': _percentile(durations, 95),
+                'p99': _percentile(durations, 99),
+                'max': durations[-1],
+                'avg': avg,
+                # Tempo médio por chamada do comando; spans paralelos podem somar mais que o total
+                'by_kind': dict(by_kind),
+                'other': max(0.0, avg - sum(by_kind.values())),
+                'spans': sorted(
+                    ((key, calls / count, seconds / count) for key, (calls, seconds) in spans.items()),
+                    key=lambda span: span[2], reverse=True
+                ),
+            })
+        return sorted(rows, key=lambda row: row['p95'], reverse=True)
+
+    def snapshot(self) -> dict:
+        """Dump (JSON) das duas janelas, com todos os spans."""
+        return {label: self.summary(seconds) for label, seconds in WINDOWS.items()}
+
+
+def item_name(view, item) -> str:
+    """'LobbyView.join_queue' (botões decorados) ou 'DraftView.PlayerSelect' (itens com callback próprio)."""
+    callback = getattr(item.callback, "callback", item.callback)
+    name = getattr(callback, "__name__", "callback")
+    if name == "callback":
+        name = type(item).__name__
+    return f"{type(view).__name__}.{name}"
+
+
+def install_view_tracing():
+    """Envolve o despacho de callbacks de todas as views (persistentes ou não)."""
+    from discord.ui.view import BaseView
+    from src.services.watchdog import loop_watchdog
+
+    original = BaseView._scheduled_task
+    if getattr(original, "__traced__", False):
+        return
+
+    @functools.wraps(original)
+    async def _scheduled_task(view, item, interaction):
+        label = f"view:{item_name(view, item)}"
+        with tracer.trace(label), loop_watchdog.attribute(label):
+            return await original(view, item, interaction)
+
+    _scheduled_task.__traced__ = True
+    BaseView._scheduled_task = _scheduled_task
+
+
+# Instância compartilhada
+tracer = Tracer()
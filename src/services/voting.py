@@ -0,0 +1,39 @@
+class PollTally:
+    """
+    Apuração em memória de uma enquete MVP/iMVP: um voto por usuário.
+    Votar em outro candidato move o voto; a contagem é mantida incrementalmente,
+    então o resultado parcial sai a qualquer momento sem consultar o Discord.
+    """
+
+    def __init__(self, candidates: list):
+        self.candidates = list(candidates)      # discord_ids na ordem da enquete
+        self.votes = {}                         # voter_id -> candidate_id
+        self.counts = {c: 0 for c in self.candidates}
+
+    def cast(self, voter_id: int, candidate_id: int):
+        """Registra o voto. Retorna o candidato anterior do usuário (ou None)."""
+        if candidate_id not in self.counts:
+            raise ValueError(f"candidato inválido: {candidate_id}")
+        previous = self.votes.get(voter_id)
+        if previous == candidate_id:
+            return previous
+        if previous is not None:
+            self.counts[previous] -= 1
+        self.votes[voter_id] = candidate_id
+        self.counts[candidate_id] += 1
+        return previous
+
+    def retract(self, voter_id: int, candidate_id: int) -> bool:
+        """Remove o voto do usuário se ele ainda estiver em `candidate_id`."""
+        if self.votes.get(voter_id) != candidate_id:
+            return False
+        del self.votes[voter_id]
+        self.counts[candidate_id] -= 1
+        return True
+
+    def leaders(self) -> tuple:
+        """(votos do líder, [candidatos empatados na liderança, na ordem da enquete])."""
+        top = max(self.counts.values(), default=0)
+        if top <= 0:
+            return 0, []
+        return top, [c for c in self.candidates if self.counts[c] == top]
@@ -0,0 +1,225 @@
+import asyncio
+import collections
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+from src.services.metrics import registry
+
+logger = logging.getLogger("watchdog")
+
+# Intervalo do heartbeat no event loop e da amostragem da thread de monitoramento (segundos)
+BEAT_INTERVAL = 0.1
+SAMPLE_INTERVAL = 0.05
+# Quantos episódios de travamento ficam em memória para o .lag
+RECENT_EVENTS = 50
+
+_SRC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))   # .../src
+_PROJECT_ROOT = os.path.dirname(_SRC_ROOT)
+
+LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "Atraso do heartbeat do event loop em relação ao agendado",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+LOOP_BLOCKED = registry.counter(
+    "event_loop_blocked_total", "Episódios em que o event loop ficou travado acima do limite", ("label",))
+LOOP_BLOCKED_SECONDS = registry.counter(
+    "event_loop_blocked_seconds_total", "Tempo total de event loop travado por responsável", ("label",))
+
+
+def _frame_line(frame) -> str:
+    path = frame.f_code.co_filename
+    if path.startswith(_PROJECT_ROOT):
+        path = os.path.relpath(path, _PROJECT_ROOT)
+    return f"{path}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def _stack(frame, limit: int = 30) -> tuple:
+    """Pilha da thread do loop, do frame mais externo para o mais interno."""
+    lines = []
+    while frame is not None and len(lines) < limit:
+        lines.append((frame.f_code.co_filename, _frame_line(frame)))
+        frame = frame.f_back
+    return tuple(reversed(lines))
+
+
+def _culprit(stack: tuple) -> str:
+    """Frame mais interno do próprio projeto (cog/serviço); sem ele, o mais interno de todos."""
+    for filename, line in reversed(stack):
+        if filename.startswith(_SRC_ROOT):
+            return line
+    return stack[-1][1] if stack else "?"
+
+
+class SlowEvent:
+    """Um episódio de loop travado: quem estava rodando e onde (amostras da pilha)."""
+
+    def __init__(self, started: float, label: str, task_name: str):
+        self.started = started
+        self.at = datetime.now()
+        self.label = label
+        self.task_name = task_name
+        self.duration = 0.0
+        self.samples = collections.Counter()   # pilha (tupla de linhas) -> nº de amostras
+        self.culprits = collections.Counter()
+
+    def add_sample(self, stack: tuple):
+        self.samples[tuple(line for _, line in stack)] += 1
+        self.culprits[_culprit(stack)] += 1
+
+    @property
+    def culprit(self) -> str:
+        return self.culprits.most_common(1)[0][0] if self.culprits else "?"
+
+    def format(self) -> str:
+        lines = [f"{self.at:%Y-%m-%d %H:%M:%S} travado {self.duration * 1000:.0f}ms "
+                 f"label={self.label} task={self.task_name} culpado={self.culprit}"]
+        for stack, count in self.samples.most_common(3):
+            lines.append(f"  {count} amostra(s):")
+            lines.extend(f"    {line}" for line in stack)
+        return "\n".join(lines)
+
+
+class LoopWatchdog:
+    """
+    Vigia do event loop.
+
+    - Um heartbeat no loop acorda a cada BEAT_INTERVAL; o atraso em relação ao agendado é o lag.
+    - Uma thread separada olha o último heartbeat. Se ele passou do limite, o loop está preso num
+      callback: a thread tira amostras da pilha da thread do loop (`sys._current_frames`) até o
+      heartbeat voltar e registra o episódio.
+    - Atribuição: o rótulo da task em execução (`attribute()`: comando, listener, view) ou,
+      sem rótulo, o nome da task; o "culpado" é o frame mais interno de `src/` nas amostras.
+
+    Cada episódio vai para um arquivo rotativo (fora do event loop, escrito pela própria thread).
+    """
+
+    def __init__(self, threshold: float = 0.25):
+        self.threshold = threshold
+        self.recent = collections.deque(maxlen=RECENT_EVENTS)
+        self.by_label = {}                      # label -> [episódios, segundos, pior]
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.started_at = time.time()
+        self._labels = weakref.WeakKeyDictionary()   # task -> rótulo
+        self._loop = None
+        self._loop_thread_id = None
+        self._beat = 0.0
+        self._beat_task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._file = None
+
+    # --- ATRIBUIÇÃO ---
+    @contextmanager
+    def attribute(self, label: str):
+        """Marca a task atual (ex.: 'comando:perfil') enquanto o bloco roda."""
+        task = asyncio.current_task()
+        if task is None:
+            yield
+            return
+        previous = self._labels.get(task)
+        self._labels[task] = label
+        try:
+            yield
+        finally:
+            if previous is None:
+                self._labels.pop(task, None)
+            else:
+                self._labels[task] = previous
+
+    def _running_task(self):
+        # Lido de outra thread: só um dict.get (o loop está preso, o valor não muda durante a amostra)
+        current = getattr(asyncio.tasks, "_current_tasks", {})
+        return current.get(self._loop)
+
+    # --- CICLO DE VIDA ---
+    def start(self, log_path: str = None):
+        """Chamar de dentro do event loop (setup_hook)."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        if log_path:
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            self._file = logging.handlers.RotatingFileHandler(log_path, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+        self._beat = time.monotonic()
+        self._beat_task = self._loop.create_task(self._heartbeat(), name="watchdog-heartbeat")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._beat_task:
+            self._beat_task.cancel()
+            self._beat_task = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + BEAT_INTERVAL
+            await asyncio.sleep(BEAT_INTERVAL)
+            now = time.monotonic()
+            self.last_lag = max(0.0, now - expected)
+            self.max_lag = max(self.max_lag, self.last_lag)
+            LOOP_LAG.observe(self.last_lag)
+            self._beat = now
+
+    # --- THREAD DE MONITORAMENTO ---
+    def _monitor(self):
+        event = None
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            beat = self._beat
+            stalled = time.monotonic() - beat - BEAT_INTERVAL
+            if stalled >= self.threshold:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                if event is None or event.started != beat:
+                    if event is not None:
+                        self._finish(event, None)
+                    task = self._running_task()
+                    label = self._labels.get(task) if task is not None else None
+                    task_name = task.get_name() if task is not None else "callback"
+                    event = SlowEvent(beat, label or task_name, task_name)
+                event.add_sample(_stack(frame))
+                event.duration = stalled
+            elif event is not None:
+                self._finish(event, beat)
+                event = None
+
+    def _finish(self, event: SlowEvent, resumed_at: float):
+        if resumed_at is not None:
+            event.duration = max(event.duration, resumed_at - event.started - BEAT_INTERVAL)
+        self.recent.append(event)
+        entry = self.by_label.setdefault(event.label, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += event.duration
+        entry[2] = max(entry[2], event.duration)
+        LOOP_BLOCKED.inc(label=event.label)
+        LOOP_BLOCKED_SECONDS.inc(event.duration, label=event.label)
+        logger.warning("Event loop travado por %.0fms", event.duration * 1000,
+                       extra={'label': event.label, 'culprit': event.culprit})
+        if self._file:
+            self._file.handle(logging.makeLogRecord({'msg': event.format(), 'levelno': logging.WARNING}))
+
+    # --- CONSULTA ---
+    def top_labels(self, limit: int = 10) -> list:
+        """[(label, episódios, segundos, pior)] pelo tempo total travado."""
+        rows = [(label, count, seconds, worst) for label, (count, seconds, worst) in self.by_label.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)[:limit]
+
+
+# Instância compartilhada (iniciada no setup_hook). WATCHDOG_THRESHOLD_MS=0 desliga a vigia,
+# mas `attribute()` continua podendo ser usado sem custo.
+loop_watchdog = LoopWatchdog(int(os.getenv("WATCHDOG_THRESHOLD_MS", "250")) / 1000)
@@ -0,0 +1,105 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+# Atributos padrão do LogRecord: o que sobra veio de `extra=` e vira campo estruturado
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def record_fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS and not k.startswith("_")}
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    `LOG_FORMAT=text` (padrão): "2026-01-01 12:00:00 INFO lobby: mensagem chave=valor ..."
+    `LOG_FORMAT=json`: uma linha JSON por registro, com os campos de `extra=` no topo.
+    """
+
+    def __init__(self, mode: str = "text"):
+        super().__init__()
+        self.mode = mode
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = record_fields(record)
+        message = record.getMessage()
+        if self.mode == "json":
+            entry = {
+                'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+                'level': record.levelname,
+                'logger': record.name,
+                'msg': message,
+                **fields,
+            }
+            if record.exc_info:
+                entry['exc'] = self.formatException(record.exc_info)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+        line = f"{self.formatTime(record, '%Y-%m-%d %H:%M:%S')} {record.levelname} {record.name}: {message}"
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class DebugSampler(logging.Filter):
+    """
+    Amostragem de DEBUG por ponto de chamada (logger + linha): passa 1 a cada `every`
+    registros e marca o registro com `sampled=every`. Níveis INFO+ nunca são descartados.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        key = (record.name, record.lineno)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.every:
+            return False
+        record.sampled = self.every
+        return True
+
+
+class LoopQueueHandler(logging.handlers.QueueHandler):
+    """
+    Só resolve a mensagem (`msg % args`) no event loop; formatação (timestamp, JSON,
+    traceback) e escrita ficam com a thread do QueueListener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(level: str = None) -> logging.handlers.QueueListener:
+    """Liga o root logger à fila. Chamar uma vez, antes de criar o bot."""
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    formatter = StructuredFormatter(os.getenv("LOG_FORMAT", "text").lower())
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    handler = LoopQueueHandler(log_queue)
+    handler.addFilter(DebugSampler(int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "20"))))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
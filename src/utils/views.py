@@ -1,5 +1,8 @@
 import discord
 import asyncio
+import logging
+
+logger = logging.getLogger("views")
 
 class BaseInteractiveView(discord.ui.View):
     """
@@ -32,4 +35,4 @@ class BaseInteractiveView(discord.ui.View):
             except discord.NotFound:
                 pass # Ignora se a mensagem foi deletada
             except Exception as e:
-                print(f"Erro ao editar mensagem expirada: {e}")
\ No newline at end of file
+                logger.warning("Erro ao editar mensagem expirada: %s", e)
\ No newline at end of file
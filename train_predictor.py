@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Treina o preditor de chance de vitória a partir do histórico de partidas.
+Uso: python train_predictor.py [caminho_do_modelo]
+
+Gera um JSON pequeno (pesos + sinergia das duplas) que o bot carrega na
+inicialização. Depois de treinar, reinicie o bot ou use .recarregar_preditor.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Adiciona o diretório raiz ao path para importar src/
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.database.repositories import MatchRepository, PlayerRepository
+from src.services.simulator import ReplayDataset
+from src.services.predictor import MODEL_PATH, train, FEATURES
+
+
+async def main(path: str):
+    started = time.perf_counter()
+    dataset = await ReplayDataset.from_stream(MatchRepository.stream_match_history())
+    lanes = await PlayerRepository.get_lane_preferences()
+    print(f"📥 {len(dataset)} partidas carregadas em {time.perf_counter() - started:.2f}s")
+
+    if not len(dataset):
+        print("❌ Nenhuma partida finalizada para treinar.")
+        return
+
+    model = train(dataset, lanes)
+    model.save(path)
+
+    print("✅ Modelo salvo em", path)
+    for name in FEATURES:
+        print(f"   {name:>8}: {model.weights[name]:+.4f}")
+    print(f"   duplas com sinergia: {len(model.pairs)}")
+    print(f"   log-loss: {model.log_loss:.4f} ({model.trained_on} partidas, {time.perf_counter() - started:.2f}s)")
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH))
@@ -43,6 +43,17 @@ def migrate():
         add_column(cursor, "players", "mvp_count", "INTEGER", default=0)
         add_column(cursor, "players", "imvp_count", "INTEGER", default=0)
 
+        # Rating Glicko-2 das partidas internas
+        for col in ("rating", "rating_rd", "rating_vol"):
+            add_column(cursor, "players", col, "FLOAT")
+        for col in ("rating_before", "rating_rd_before", "rating_after"):
+            add_column(cursor, "match_players", col, "FLOAT")
+
+        # Resultado da votação MVP/iMVP por partida
+        add_column(cursor, "matches", "mvp_id", "BIGINT")
+        add_column(cursor, "matches", "imvp_id", "BIGINT")
+        add_column(cursor, "matches", "poll_closed_at", "DATETIME")
+
         # Nova tabela: estado da fila persistida
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS lobby_states (
@@ -54,6 +65,137 @@ def migrate():
         """)
         print("  [+] Tabela lobby_states verificada/criada.")
 
+        # Etapa em andamento da montagem de times (views persistentes de lado/draft)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS match_setup_states (
+                guild_id INTEGER PRIMARY KEY,
+                stage VARCHAR NOT NULL,
+                state_json TEXT DEFAULT '{}',
+                channel_id INTEGER,
+                message_id INTEGER,
+                updated_at DATETIME
+            )
+        """)
+        print("  [+] Tabela match_setup_states verificada/criada.")
+
+        # Draft por capitães: sessão + participantes (cada pick grava só pick_no)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS draft_sessions (
+                guild_id INTEGER PRIMARY KEY,
+                cap_blue_id BIGINT NOT NULL,
+                cap_red_id BIGINT NOT NULL,
+                first_pick_side VARCHAR NOT NULL,
+                pick_count INTEGER DEFAULT 0,
+                started_at DATETIME,
+                updated_at DATETIME
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS draft_players (
+                guild_id BIGINT NOT NULL,
+                discord_id BIGINT NOT NULL,
+                slot INTEGER NOT NULL,
+                name VARCHAR NOT NULL,
+                mmr INTEGER DEFAULT 0,
+                main_lane VARCHAR,
+                secondary_lane VARCHAR,
+                rating FLOAT,
+                streak INTEGER DEFAULT 0,
+                pick_no INTEGER,
+                PRIMARY KEY (guild_id, discord_id)
+            )
+        """)
+        print("  [+] Tabelas draft_sessions/draft_players verificadas/criadas.")
+
+        # Índices do histórico paginado (keyset por finished_at, id)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_match_players_player_id ON match_players (player_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_match_players_match_id ON match_players (match_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_matches_finished_at_id ON matches (finished_at, id)")
+        print("  [+] Índices de histórico verificados/criados.")
+
+        # Estatísticas por dupla (h2h, melhores duplas, nêmesis)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS player_pair_stats (
+                player_a BIGINT NOT NULL,
+                player_b BIGINT NOT NULL,
+                games_together INTEGER DEFAULT 0,
+                wins_together INTEGER DEFAULT 0,
+                games_against INTEGER DEFAULT 0,
+                wins_a_against INTEGER DEFAULT 0,
+                wins_b_against INTEGER DEFAULT 0,
+                recent_json TEXT DEFAULT '[]',
+                PRIMARY KEY (player_a, player_b)
+            )
+        """)
+        print("  [+] Tabela player_pair_stats verificada/criada.")
+        # O preenchimento a partir do histórico é feito pelo bot na inicialização (tabela vazia + partidas finalizadas)
+
+        # Temporadas e agregados por temporada/semana
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS seasons (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id BIGINT NOT NULL,
+                name VARCHAR NOT NULL,
+                starts_at DATETIME,
+                ends_at DATETIME
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_seasons_guild_id ON seasons (guild_id)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS player_period_stats (
+                period_type VARCHAR NOT NULL,
+                period_key VARCHAR NOT NULL,
+                player_id BIGINT NOT NULL,
+                wins INTEGER DEFAULT 0,
+                losses INTEGER DEFAULT 0,
+                mvps INTEGER DEFAULT 0,
+                imvps INTEGER DEFAULT 0,
+                rating_delta FLOAT DEFAULT 0,
+                PRIMARY KEY (period_type, period_key, player_id)
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_period_stats_ranking "
+            "ON player_period_stats (period_type, period_key, wins DESC, losses)"
+        )
+        print("  [+] Tabelas seasons/player_period_stats verificadas/criadas.")
+
+        # Semanas passaram a ser por servidor ('<guild_id>:AAAA-Wss'): as linhas antigas misturavam
+        # servidores e não têm como ser separadas; são apagadas e refeitas pelo .recalcular_temporadas
+        cursor.execute("DELETE FROM player_period_stats WHERE period_type = 'week' AND period_key NOT LIKE '%:%'")
+        if cursor.rowcount:
+            print(f"  [~] {cursor.rowcount} agregado(s) semanal(is) sem servidor removido(s). Rode .recalcular_temporadas.")
+
+        # Votos das enquetes MVP/iMVP (um por usuário por enquete)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS poll_votes (
+                match_id INTEGER NOT NULL,
+                poll_type VARCHAR NOT NULL,
+                voter_id BIGINT NOT NULL,
+                candidate_id BIGINT NOT NULL,
+                voted_at DATETIME,
+                PRIMARY KEY (match_id, poll_type, voter_id)
+            )
+        """)
+        print("  [+] Tabela poll_votes verificada/criada.")
+
+        # Agendador persistente (enquetes, lembretes)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind VARCHAR NOT NULL,
+                key VARCHAR NOT NULL UNIQUE,
+                run_at DATETIME NOT NULL,
+                payload_json TEXT DEFAULT '{}',
+                status VARCHAR DEFAULT 'PENDING',
+                attempts INTEGER DEFAULT 0,
+                last_error VARCHAR,
+                created_at DATETIME
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_scheduled_jobs_status_run_at ON scheduled_jobs (status, run_at)")
+        print("  [+] Tabela scheduled_jobs verificada/criada.")
+
         # Tabelas de agenda (v4)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS scheduled_events (